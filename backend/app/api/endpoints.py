@@ -1,9 +1,23 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from fastapi.responses import Response
-from app.core.schemas import AnalyzeRequest, ResumeSchema
-from app.services.llm import analyze_profiles
-from app.services.pdf import generate_resume_pdf
-from app.services.github import fetch_github_data
+import asyncio
+import json
+import os
+from typing import BinaryIO, Callable, Optional, Tuple, Union
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Header
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from app.core.schemas import AnalyzeRequest, BatchAnalyzeRequest, PrefetchRequest, RefineRequest, ResumeSchema
+from app.services.llm import llm_cache, stream_profiles
+from app.services.analysis import analyze_request, fetch_github_for_request
+from app.services.batch import build_zip, stream_ndjson
+from app.services.jobs import job_queue
+from app.services.render_pool import render_pool
+from app.services.resume_store import resume_store
+from app.services.pdf import PDF_PRESETS
+from app.services.pdf_cache import pdf_cache
+from app.services.github_cache import github_cache
+from app.services.github_prefetch import github_prefetcher
+from app.services.refine import refine_resume
+from app.services.preview import PREVIEW_FORMATS, png_available, preview_cache, preview_key, render_preview
+from app.services.profiling import SamplingProfiler, profile_store, profiling_interval, should_profile
 from app.core.config import settings
 
 router = APIRouter()
@@ -11,46 +25,464 @@ router = APIRouter()
 # Mock Data for initial testing (since we don't have real scrapers yet)
 MOCK_GITHUB = "Top Repo: resume-gen-ai using Python, FastAPI."
 
+def _resume_headers(resume_id: str, version: int) -> dict:
+    return {"X-Resume-Id": resume_id, "X-Resume-Version": str(version)}
+
+async def _save_profile(name: str, samples: dict) -> str:
+    return await asyncio.to_thread(profile_store.save, name, samples)
+
+@router.post("/github/prefetch", status_code=202)
+async def github_prefetch_endpoint(request: PrefetchRequest):
+    """
+    Starts fetching a GitHub profile in the background as soon as the URL is entered, so /analyze
+    finds it ready (or joins the fetch). Idempotent: repeat calls never start a second fetch.
+    """
+    github_url = str(request.github_url)
+    status = github_prefetcher.prefetch(github_url)
+    if status == "busy":
+        raise HTTPException(status_code=503, detail="Too many GitHub fetches in progress", headers={"Retry-After": "2"})
+    return {"username": github_prefetcher.key(github_url), "status": status}
+
 @router.post("/analyze", response_model=ResumeSchema)
-async def analyze_profiles_endpoint(request: AnalyzeRequest):
-    try:
-        if not request.github_url and not request.manual_experience:
-             raise HTTPException(status_code=400, detail="At least one input source (GitHub or Manual Experience) is required")
-
-        # GitHub Data
-        github_data = ""
-        if request.github_url:
-             try:
-                github_data = await fetch_github_data(str(request.github_url))
-             except Exception as e:
-                print(f"GitHub Error: {e}")
-                
-        if not github_data and not request.manual_experience:
-             raise HTTPException(status_code=400, detail="Could not fetch data from GitHub and no manual experience provided.")
-
-        resume = await analyze_profiles(
-            github_data,
-            request.manual_experience,
-            request.manual_education,
-            request.manual_highlights,
-            request.is_student,
-            request.linkedin_url,
-            request.email,
-            request.phone
-        )
+async def analyze_profiles_endpoint(request: AnalyzeRequest, response: Response, x_profile: Optional[str] = Header(None)):
+    try:
+        if should_profile(x_profile):
+            # Samples the event loop thread: concurrent requests show up in the profile too
+            with SamplingProfiler(profiling_interval()) as profiler:
+                resume = await analyze_request(request)
+            response.headers["X-Profile-Id"] = await _save_profile("POST /analyze", profiler.samples)
+        else:
+            resume = await analyze_request(request)
+        # Keep it server-side so later renders can reference it by id
+        resume_id, version = await resume_store.create(resume)
+        response.headers.update(_resume_headers(resume_id, version))
         return resume
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in analyze_profiles_endpoint: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.post("/analyze/stream")
+async def analyze_stream_endpoint(request: AnalyzeRequest):
+    """
+    Server-Sent Events variant of /analyze:
+    - `section` events ({"section", "data"}) as each top-level resume field is generated,
+    - a `stored` event ({"id", "version"}) once the result is in the resume store,
+    - a final `resume` event with the validated, truncated ResumeSchema,
+    - or an `error` event ({"status", "detail"}).
+    """
+    async def events():
+        try:
+            yield _sse("status", {"stage": "github"})
+            github_data = await fetch_github_for_request(request)
+
+            yield _sse("status", {"stage": "llm"})
+            async for kind, name, value in stream_profiles(
+                github_data,
+                request.manual_experience,
+                request.manual_education,
+                request.manual_highlights,
+                request.is_student,
+                request.linkedin_url,
+                request.email,
+                request.phone
+            ):
+                if kind == "section":
+                    yield _sse("section", {"section": name, "data": value})
+                else:
+                    resume_id, version = await resume_store.create(value)
+                    yield _sse("stored", {"id": resume_id, "version": version})
+                    yield _sse("resume", value.model_dump(mode="json"))
+        except HTTPException as e:
+            yield _sse("error", {"status": e.status_code, "detail": e.detail})
+        except Exception as e:
+            print(f"Error in analyze_stream_endpoint: {e}")
+            yield _sse("error", {"status": 500, "detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.post("/analyze_batch")
+async def analyze_batch_endpoint(batch: BatchAnalyzeRequest):
+    """
+    Analyzes many requests in one call. Results stream back as NDJSON in completion order
+    ({"index", "status": "ok", "resume"} or {"index", "status": "error", "status_code", "error"}).
+    With render_pdf, returns a zip of results.ndjson plus resume_<index>.pdf files instead.
+    """
+    if not batch.items:
+        raise HTTPException(status_code=400, detail="Batch is empty")
+    if len(batch.items) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch too large (max {settings.BATCH_MAX_ITEMS} items)")
+
+    if batch.render_pdf:
+        archive = await build_zip(batch.items)
+
+        async def chunks():
+            try:
+                while chunk := await asyncio.to_thread(archive.read, PDF_CHUNK_SIZE):
+                    yield chunk
+            finally:
+                archive.close()
+
+        return StreamingResponse(
+            chunks(),
+            media_type="application/zip",
+            headers={"Content-Disposition": "attachment; filename=resumes.zip"}
+        )
+
+    return StreamingResponse(stream_ndjson(batch.items), media_type="application/x-ndjson")
+
+@router.post("/jobs", status_code=202)
+async def submit_job_endpoint(request: AnalyzeRequest):
+    """Queues analyze + PDF render in the background; poll /jobs/{job_id} for progress."""
+    job_id = await job_queue.submit(request)
+    return {"job_id": job_id, "status": "queued"}
+
+async def _get_job(job_id: str, with_pdf: bool = False):
+    job = await job_queue.get(job_id, with_pdf)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+def _require_done(job):
+    if job["status"] == "failed":
+        raise HTTPException(status_code=409, detail=f"Job failed: {job['error']}")
+    if job["status"] != "done":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}", headers={"Retry-After": "2"})
+
+@router.get("/jobs/{job_id}")
+async def job_status_endpoint(job_id: str):
+    job = await _get_job(job_id)
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "error": job["error"],
+        "timings": json.loads(job["timings"]) if job["timings"] else {},
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+    }
+
+@router.get("/jobs/{job_id}/result", response_model=ResumeSchema)
+async def job_result_endpoint(job_id: str):
+    job = await _get_job(job_id)
+    _require_done(job)
+    return Response(content=job["result"], media_type="application/json")
+
+@router.get("/jobs/{job_id}/pdf")
+async def job_pdf_endpoint(job_id: str, range: Optional[str] = Header(None)):
+    job = await _get_job(job_id, with_pdf=True)
+    _require_done(job)
+    return _pdf_stream(job["pdf"], {"Content-Disposition": "attachment; filename=resume.pdf"}, range)
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [c.strip().removeprefix("W/") for c in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+# PDFs go out in chunks of this size rather than as one body
+PDF_CHUNK_SIZE = 64 * 1024
+
+def _byte_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Inclusive (start, end) of a single `bytes=` range, or None to send the whole body
+    (no header, multiple ranges or a malformed one). Unsatisfiable ranges are a 416.
+    """
+    if not range_header or not range_header.startswith("bytes=") or "," in range_header:
+        return None
+    start, _, end = range_header[len("bytes="):].strip().partition("-")
+    try:
+        if start:
+            first = int(start)
+            last = int(end) if end else size - 1
+            if end and last < first:
+                return None
+        else:
+            # Suffix range: the last N bytes ("bytes=-500"); "bytes=-0" selects nothing
+            length = int(end)
+            first, last = (max(size - length, 0) if length > 0 else size), size - 1
+    except ValueError:
+        return None
+    if first >= size:
+        raise HTTPException(status_code=416, detail="Range not satisfiable", headers={"Content-Range": f"bytes */{size}"})
+    return first, min(last, size - 1)
+
+def _pdf_stream(pdf: Union[bytes, BinaryIO], headers: dict, range_header: Optional[str] = None, if_range: Optional[str] = None) -> StreamingResponse:
+    """
+    Streams a PDF (bytes, or an open file that is closed once sent) in PDF_CHUNK_SIZE pieces
+    with an exact Content-Length. A single Range (resumed or partial downloads) gets a 206,
+    unless If-Range names a different version.
+    """
+    in_memory = isinstance(pdf, bytes)
+    size = len(pdf) if in_memory else os.fstat(pdf.fileno()).st_size
+    byte_range = None
+    try:
+        if if_range is None or if_range == headers.get("ETag"):
+            byte_range = _byte_range(range_header, size)
+    except HTTPException:
+        if not in_memory:
+            pdf.close()
+        raise
+    start, end = byte_range or (0, size - 1)
+
+    headers = {**headers, "Accept-Ranges": "bytes", "Content-Length": str(end - start + 1)}
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    async def chunks():
+        if in_memory:
+            for offset in range(start, end + 1, PDF_CHUNK_SIZE):
+                yield pdf[offset:min(offset + PDF_CHUNK_SIZE, end + 1)]
+            return
+        try:
+            pdf.seek(start)
+            left = end - start + 1
+            while left > 0:
+                chunk = await asyncio.to_thread(pdf.read, min(PDF_CHUNK_SIZE, left))
+                if not chunk:
+                    break
+                left -= len(chunk)
+                yield chunk
+        finally:
+            pdf.close()
+
+    return StreamingResponse(
+        chunks(),
+        status_code=206 if byte_range else 200,
+        media_type="application/pdf",
+        headers=headers
+    )
+
+def _pdf_preset(preset: Optional[str]) -> str:
+    preset = preset or settings.PDF_DEFAULT_PRESET
+    if preset not in PDF_PRESETS:
+        raise HTTPException(status_code=400, detail=f"preset must be one of {', '.join(PDF_PRESETS)}")
+    return preset
+
+async def _render_to_cache(cache_key: str, resume: ResumeSchema, preset: str, profile: Optional[dict] = None) -> BinaryIO:
+    """
+    Renders into a spool file that the cache then takes over, and returns it open for
+    streaming: the PDF never sits in this process's memory as a whole.
+    """
+    path = await asyncio.to_thread(pdf_cache.spool_path)
+    try:
+        await render_pool.render(resume, profile=profile, preset=preset, target=path)
+        pdf_file = open(path, "rb")
+    except BaseException:
+        os.remove(path)
+        raise
+    try:
+        await pdf_cache.adopt(cache_key, path)
+    except BaseException:
+        pdf_file.close()
+        raise
+    return pdf_file
+
+async def _pdf_response(cache_key: str, load_resume: Callable[[], ResumeSchema], preset: str, if_none_match: Optional[str], x_profile: Optional[str] = None, range_header: Optional[str] = None, if_range: Optional[str] = None) -> Response:
+    """
+    Serves a PDF by cache key (which covers `preset`): 304 if the client has it, else cached
+    bytes, else renders `load_resume()` into a spool file. Either way the body is streamed
+    (see _pdf_stream). Only GET routes pass `if_none_match`: a 304 answers a conditional
+    GET, never a POST.
+    """
+    etag = f'"{cache_key}"'
+    headers = {
+        "Content-Disposition": "attachment; filename=resume.pdf",
+        "ETag": etag,
+    }
+
+    # A profiled request always renders, bypassing both the client's and our cache
+    if should_profile(x_profile):
+        samples = {}
+        pdf_file = await _render_to_cache(cache_key, load_resume(), preset, profile=samples)
+        headers["X-Profile-Id"] = await _save_profile("PDF render", samples)
+        return _pdf_stream(pdf_file, headers)
+
+    # Client already holds this exact PDF
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    pdf = await pdf_cache.get(cache_key)
+    if pdf is None:
+        pdf = await _render_to_cache(cache_key, load_resume(), preset)
+
+    return _pdf_stream(pdf, headers, range_header, if_range)
+
 @router.post("/generate_pdf")
-async def generate_pdf_endpoint(resume_data: ResumeSchema):
+async def generate_pdf_endpoint(resume_data: ResumeSchema, preset: Optional[str] = None, x_profile: Optional[str] = Header(None)):
+    """?preset=fast|small|archival picks the output options (see pdf.PDF_PRESETS)."""
+    preset = _pdf_preset(preset)
     try:
-        pdf_bytes = generate_resume_pdf(resume_data)
-        return Response(
-            content=pdf_bytes,
-            media_type="application/pdf",
-            headers={"Content-Disposition": "attachment; filename=resume.pdf"}
+        return await _pdf_response(pdf_cache.key_for(resume_data, preset), lambda: resume_data, preset, None, x_profile)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"PDF Generation failed: {str(e)}")
+
+# The HTML preview only needs its own inline styles: no scripts, no external loads
+PREVIEW_SECURITY_HEADERS = {
+    "Content-Security-Policy": "default-src 'none'; style-src 'unsafe-inline'; base-uri 'none'; form-action 'none'",
+    "X-Content-Type-Options": "nosniff",
+}
+
+async def _preview_response(pdf_key: str, load_resume: Callable[[], ResumeSchema], format: str, width: Optional[int], if_none_match: Optional[str]) -> Response:
+    """
+    HTML (Jinja only) or page-one PNG preview, cached and ETagged by resume content.
+    Like _pdf_response, only GET routes pass `if_none_match`.
+    """
+    if format not in PREVIEW_FORMATS:
+        raise HTTPException(status_code=400, detail="format must be 'html' or 'png'")
+    width = width or settings.PREVIEW_PNG_WIDTH
+    if not 100 <= width <= 2000:
+        raise HTTPException(status_code=400, detail="width must be between 100 and 2000")
+    if format == "png" and not png_available():
+        raise HTTPException(status_code=501, detail="PNG previews need the pypdfium2 package")
+
+    etag = f'"{preview_key(pdf_key, format, width)}"'
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    content = await render_preview(pdf_key, load_resume, format, width)
+    return Response(content=content, media_type=PREVIEW_FORMATS[format], headers={"ETag": etag, **PREVIEW_SECURITY_HEADERS})
+
+@router.post("/preview")
+async def preview_endpoint(resume_data: ResumeSchema, format: str = "html", width: Optional[int] = None):
+    """
+    Live preview while editing: ?format=html returns resume.html with the stylesheet inlined,
+    ?format=png a `width`-pixel PNG of the PDF's first page. Re-posting unchanged content is a cache hit.
+    """
+    try:
+        return await _preview_response(pdf_cache.key_for(resume_data), lambda: resume_data, format, width, None)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Preview failed: {str(e)}")
+
+# --- Stored resumes (referenced by id + version instead of posting the full JSON) ---
+
+async def _get_stored_resume(resume_id: str, version: Optional[int]):
+    row = await resume_store.get(resume_id, version)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    return row
+
+@router.post("/resumes", status_code=201)
+async def create_resume_endpoint(resume_data: ResumeSchema, response: Response):
+    resume_id, version = await resume_store.create(resume_data)
+    response.headers.update(_resume_headers(resume_id, version))
+    return {"id": resume_id, "version": version}
+
+@router.put("/resumes/{resume_id}")
+async def update_resume_endpoint(resume_id: str, resume_data: ResumeSchema, response: Response):
+    """Saves an edit as a new version."""
+    saved = await resume_store.add_version(resume_id, resume_data)
+    if saved is None:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    response.headers.update(_resume_headers(*saved))
+    return {"id": saved[0], "version": saved[1]}
+
+@router.get("/resumes/{resume_id}", response_model=ResumeSchema)
+async def get_resume_endpoint(resume_id: str, version: Optional[int] = None):
+    row = await _get_stored_resume(resume_id, version)
+    # Stored JSON was validated on write; return it as-is
+    return Response(
+        content=row["data"],
+        media_type="application/json",
+        headers=_resume_headers(row["id"], row["version"])
+    )
+
+@router.get("/resumes/{resume_id}/pdf")
+async def stored_resume_pdf_endpoint(resume_id: str, version: Optional[int] = None, preset: Optional[str] = None, if_none_match: Optional[str] = Header(None), x_profile: Optional[str] = Header(None), range: Optional[str] = Header(None), if_range: Optional[str] = Header(None)):
+    """
+    Renders a stored resume (latest version unless given). The cache key comes from the stored hash, so hits never parse the JSON.
+    Supports Range requests for resumed downloads and ?preset= like /generate_pdf.
+    """
+    preset = _pdf_preset(preset)
+    row = await _get_stored_resume(resume_id, version)
+    try:
+        response = await _pdf_response(
+            pdf_cache.key_for_hash(row["content_hash"], preset),
+            lambda: ResumeSchema.model_validate_json(row["data"]),
+            preset,
+            if_none_match,
+            x_profile,
+            range,
+            if_range
         )
+        response.headers.update(_resume_headers(row["id"], row["version"]))
+        return response
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"PDF Generation failed: {str(e)}")
+
+@router.get("/resumes/{resume_id}/preview")
+async def stored_resume_preview_endpoint(resume_id: str, version: Optional[int] = None, format: str = "html", width: Optional[int] = None, if_none_match: Optional[str] = Header(None)):
+    row = await _get_stored_resume(resume_id, version)
+    try:
+        response = await _preview_response(
+            pdf_cache.key_for_hash(row["content_hash"]),
+            lambda: ResumeSchema.model_validate_json(row["data"]),
+            format,
+            width,
+            if_none_match
+        )
+        response.headers.update(_resume_headers(row["id"], row["version"]))
+        return response
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Preview failed: {str(e)}")
+
+@router.post("/refine", response_model=ResumeSchema)
+async def refine_endpoint(request: RefineRequest, response: Response):
+    """
+    Regenerates one section or item (`path`, e.g. "summary" or "experience[1]") of an
+    inline or stored resume. Stored resumes get the result as a new version.
+    """
+    if (request.resume is None) == (request.resume_id is None):
+        raise HTTPException(status_code=400, detail="Provide exactly one of resume or resume_id")
+    try:
+        if request.resume_id is not None:
+            row = await _get_stored_resume(request.resume_id, request.version)
+            resume = await refine_resume(ResumeSchema.model_validate_json(row["data"]), request.path, request.instructions, request.temperature)
+            saved = await resume_store.add_version(request.resume_id, resume)
+        else:
+            resume = await refine_resume(request.resume, request.path, request.instructions, request.temperature)
+            saved = await resume_store.create(resume)
+        response.headers.update(_resume_headers(*saved))
+        return resume
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error in refine_endpoint: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/cache/stats")
+async def cache_stats_endpoint():
+    return {
+        "pdf": pdf_cache.stats(),
+        "github": github_cache.stats(),
+        "github_prefetch": github_prefetcher.stats(),
+        "llm": llm_cache.stats(),
+        "preview": preview_cache.stats(),
+    }
+
+@router.get("/profiles/{profile_id}")
+async def get_profile_endpoint(profile_id: str, format: str = "speedscope"):
+    """A stored request profile: speedscope JSON (default) or collapsed stacks (?format=collapsed)."""
+    if format not in ("speedscope", "collapsed"):
+        raise HTTPException(status_code=400, detail="format must be 'speedscope' or 'collapsed'")
+    path = profile_store.path(profile_id, format) if settings.PROFILING_ENABLED else None
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    media_type = "application/json" if format == "speedscope" else "text/plain"
+    return FileResponse(path, media_type=media_type)
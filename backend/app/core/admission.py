@@ -0,0 +1,153 @@
+"""
+Admission control and request deadlines.
+
+AdmissionControlMiddleware caps how many requests of each expensive route group run at
+once, lets a bounded number wait up to `max_queue_wait` for a slot, and sheds everything
+else with an immediate 503 + Retry-After. Routes outside the groups (/, /ready, /metrics,
+lookups) are never queued.
+
+Clients may send a budget as X-Request-Timeout (seconds) or X-Request-Deadline (unix
+epoch seconds). It's kept in a contextvar for the rest of the request so the Gemini
+gateway and the render pool can drop work whose caller has already given up.
+"""
+import asyncio
+import math
+import re
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+from fastapi import HTTPException
+from starlette.responses import JSONResponse
+from app.core.metrics import ADMISSION_REJECTED, track_in_flight
+
+# time.monotonic() by which the current request must be answered
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current request's budget, or None if it has none."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def bounded_timeout(timeout: float) -> float:
+    """`timeout`, shortened to what's left of the request budget."""
+    left = remaining()
+    return timeout if left is None else max(0.0, min(timeout, left))
+
+
+def deadline_exceeded(stage: str) -> HTTPException:
+    ADMISSION_REJECTED.labels(stage, "deadline").inc()
+    return HTTPException(
+        status_code=503,
+        detail=f"Request deadline exceeded before {stage}",
+        headers={"Retry-After": "1"},
+    )
+
+
+def check_deadline(stage: str):
+    """Raises 503 if the current request's budget is already spent."""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise deadline_exceeded(stage)
+
+
+def _parse_deadline(headers: Dict[str, str], default_timeout: float) -> Optional[float]:
+    try:
+        if "x-request-deadline" in headers:
+            return time.monotonic() + float(headers["x-request-deadline"]) - time.time()
+        if "x-request-timeout" in headers:
+            return time.monotonic() + float(headers["x-request-timeout"])
+    except ValueError:
+        pass
+    return time.monotonic() + default_timeout if default_timeout > 0 else None
+
+
+class RouteGroup:
+    """Up to `concurrency` requests run; `queue` more wait at most `max_queue_wait` seconds."""
+
+    def __init__(self, name: str, patterns: List[str], concurrency: int, queue: int, max_queue_wait: float):
+        self.name = name
+        self.patterns = [re.compile(p) for p in patterns]
+        self.concurrency = concurrency
+        self.queue = queue
+        self.max_queue_wait = max_queue_wait
+        self.waiting = 0
+        self._semaphore = None
+
+    def matches(self, path: str) -> bool:
+        return any(p.match(path) for p in self.patterns)
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the running loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+
+class AdmissionControlMiddleware:
+    def __init__(self, app, groups: List[RouteGroup], default_timeout: float = 0):
+        self.app = app
+        self.groups = groups
+        self.default_timeout = default_timeout
+
+    def _group(self, path: str) -> Optional[RouteGroup]:
+        for group in self.groups:
+            if group.matches(path):
+                return group
+        return None
+
+    async def _reject(self, scope, receive, send, group: RouteGroup, reason: str, detail: str, retry_after: float):
+        ADMISSION_REJECTED.labels(group.name, reason).inc()
+        response = JSONResponse(
+            {"detail": detail},
+            status_code=503,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+        await response(scope, receive, send)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]}
+        deadline = _parse_deadline(headers, self.default_timeout)
+        group = self._group(scope["path"])
+        if group is None or scope["method"] == "OPTIONS":
+            token = _deadline.set(deadline)
+            try:
+                return await self.app(scope, receive, send)
+            finally:
+                _deadline.reset(token)
+
+        if deadline is not None and deadline <= time.monotonic():
+            return await self._reject(scope, receive, send, group, "deadline", "Request deadline already exceeded", 1)
+
+        semaphore = group.semaphore
+        if semaphore.locked():
+            if group.waiting >= group.queue:
+                return await self._reject(scope, receive, send, group, "queue_full", f"Too many {group.name} requests, please retry shortly", group.max_queue_wait)
+
+            wait = group.max_queue_wait
+            if deadline is not None:
+                wait = min(wait, deadline - time.monotonic())
+            group.waiting += 1
+            try:
+                await asyncio.wait_for(semaphore.acquire(), timeout=max(wait, 0))
+            except asyncio.TimeoutError:
+                reason = "queue_timeout" if wait == group.max_queue_wait else "deadline"
+                return await self._reject(scope, receive, send, group, reason, f"Timed out waiting for a {group.name} slot", group.max_queue_wait)
+            finally:
+                group.waiting -= 1
+        else:
+            await semaphore.acquire()
+
+        token = _deadline.set(deadline)
+        try:
+            with track_in_flight(f"http_{group.name}"):
+                await self.app(scope, receive, send)
+        finally:
+            _deadline.reset(token)
+            semaphore.release()
+
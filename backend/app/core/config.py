@@ -6,6 +6,114 @@ class Settings(BaseSettings):
     USE_REAL_GITHUB: bool = os.getenv("USE_REAL_GITHUB", "False").lower() == "true"
     GITHUB_TOKEN: str = os.getenv("GITHUB_TOKEN", "")
     DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
+
+    # Memoized LLM results (TTL in seconds)
+    LLM_CACHE_TTL: float = float(os.getenv("LLM_CACHE_TTL", "3600"))
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "256"))
+
+    # Prompt input budget in estimated tokens (0 = unlimited)
+    PROMPT_TOKEN_BUDGET: int = int(os.getenv("PROMPT_TOKEN_BUDGET", "3000"))
+    PROMPT_MAX_MANUAL_CHARS: int = int(os.getenv("PROMPT_MAX_MANUAL_CHARS", "600"))
+
+    # Gemini gateway: concurrency, rate limits (0 = unlimited), fail-fast wait and backoff (seconds)
+    LLM_MAX_IN_FLIGHT: int = int(os.getenv("LLM_MAX_IN_FLIGHT", "8"))
+    LLM_REQUESTS_PER_MINUTE: float = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "60"))
+    LLM_TOKENS_PER_MINUTE: float = float(os.getenv("LLM_TOKENS_PER_MINUTE", "250000"))
+    LLM_EXPECTED_OUTPUT_TOKENS: int = int(os.getenv("LLM_EXPECTED_OUTPUT_TOKENS", "1500"))
+    LLM_ACQUIRE_TIMEOUT: float = float(os.getenv("LLM_ACQUIRE_TIMEOUT", "10"))
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "3"))
+    LLM_BACKOFF_BASE: float = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+    LLM_BACKOFF_MAX: float = float(os.getenv("LLM_BACKOFF_MAX", "20"))
+
+    # Model ladder (comma-separated, primary first) and hedging: if the primary hasn't answered
+    # after LLM_HEDGE_AFTER seconds, the next model is tried too (0 disables); hedges are capped
+    # at LLM_HEDGE_BUDGET extra calls per primary call
+    LLM_MODELS: str = os.getenv("LLM_MODELS", "gemini-2.5-flash,gemini-2.5-flash-lite")
+    LLM_HEDGE_AFTER: float = float(os.getenv("LLM_HEDGE_AFTER", "12"))
+    LLM_HEDGE_BUDGET: float = float(os.getenv("LLM_HEDGE_BUDGET", "0.05"))
+
+    # Sampling temperature for /refine when the request doesn't set one; high enough that
+    # refining the same part again gives a different rewrite
+    REFINE_TEMPERATURE: float = float(os.getenv("REFINE_TEMPERATURE", "0.9"))
+
+    # Shared GitHub HTTP client (timeouts in seconds)
+    GITHUB_HTTP2: bool = os.getenv("GITHUB_HTTP2", "True").lower() == "true"
+    GITHUB_MAX_CONNECTIONS: int = int(os.getenv("GITHUB_MAX_CONNECTIONS", "20"))
+    GITHUB_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("GITHUB_MAX_KEEPALIVE_CONNECTIONS", "10"))
+    GITHUB_KEEPALIVE_EXPIRY: float = float(os.getenv("GITHUB_KEEPALIVE_EXPIRY", "60"))
+    GITHUB_CONNECT_TIMEOUT: float = float(os.getenv("GITHUB_CONNECT_TIMEOUT", "5"))
+    GITHUB_READ_TIMEOUT: float = float(os.getenv("GITHUB_READ_TIMEOUT", "10"))
+
+    # GitHub response cache (TTL in seconds before a conditional revalidation)
+    GITHUB_CACHE_TTL: float = float(os.getenv("GITHUB_CACHE_TTL", "300"))
+    GITHUB_CACHE_MAX_ENTRIES: int = int(os.getenv("GITHUB_CACHE_MAX_ENTRIES", "512"))
+
+    # Formatted summaries from /github/prefetch, picked up by /analyze
+    GITHUB_PREFETCH_TTL: float = float(os.getenv("GITHUB_PREFETCH_TTL", "120"))
+    GITHUB_PREFETCH_MAX_ENTRIES: int = int(os.getenv("GITHUB_PREFETCH_MAX_ENTRIES", "256"))
+    # Background prefetches running at once; more are turned away with 503
+    GITHUB_PREFETCH_MAX_IN_FLIGHT: int = int(os.getenv("GITHUB_PREFETCH_MAX_IN_FLIGHT", "16"))
+
+    # /analyze_batch limits
+    BATCH_MAX_ITEMS: int = int(os.getenv("BATCH_MAX_ITEMS", "500"))
+    BATCH_GITHUB_CONCURRENCY: int = int(os.getenv("BATCH_GITHUB_CONCURRENCY", "8"))
+    BATCH_LLM_CONCURRENCY: int = int(os.getenv("BATCH_LLM_CONCURRENCY", "4"))
+
+    # Background analyze+render jobs (SQLite-backed)
+    JOBS_DB_PATH: str = os.getenv("JOBS_DB_PATH", "data/jobs.db")
+    JOBS_WORKERS: int = int(os.getenv("JOBS_WORKERS", "2"))
+    JOBS_POLL_INTERVAL: float = float(os.getenv("JOBS_POLL_INTERVAL", "2"))
+    JOBS_RETENTION_HOURS: float = float(os.getenv("JOBS_RETENTION_HOURS", "24"))
+    # Busy/rate-limited (503/429) jobs are retried with doubling backoff, up to JOBS_MAX_ATTEMPTS runs
+    JOBS_MAX_ATTEMPTS: int = int(os.getenv("JOBS_MAX_ATTEMPTS", "5"))
+    JOBS_RETRY_BACKOFF: float = float(os.getenv("JOBS_RETRY_BACKOFF", "5"))
+    # Running jobs whose owner hasn't heartbeated for JOBS_STALE_AFTER seconds are requeued
+    JOBS_HEARTBEAT_INTERVAL: float = float(os.getenv("JOBS_HEARTBEAT_INTERVAL", "10"))
+    JOBS_STALE_AFTER: float = float(os.getenv("JOBS_STALE_AFTER", "60"))
+
+    # Versioned resume store (SQLite)
+    RESUMES_DB_PATH: str = os.getenv("RESUMES_DB_PATH", "data/resumes.db")
+    # Versions kept per resume; older ones are pruned on save (0 = keep all)
+    RESUMES_MAX_VERSIONS: int = int(os.getenv("RESUMES_MAX_VERSIONS", "20"))
+
+    # PDF rendering worker pool (0 workers = render in a thread, no subprocesses)
+    PDF_WORKERS: int = int(os.getenv("PDF_WORKERS", "2"))
+    PDF_QUEUE_SIZE: int = int(os.getenv("PDF_QUEUE_SIZE", "16"))
+    PDF_JOB_TIMEOUT: float = float(os.getenv("PDF_JOB_TIMEOUT", "30"))
+    PDF_MAX_JOBS_PER_WORKER: int = int(os.getenv("PDF_MAX_JOBS_PER_WORKER", "50"))
+    # Extra memory one render may allocate in a worker before it fails with 413 (0 = unlimited)
+    PDF_RENDER_MAX_MB: int = int(os.getenv("PDF_RENDER_MAX_MB", "512"))
+    # Tighten spacing/type and drop low-priority bullets until the PDF fits on one page
+    PDF_FIT_ONE_PAGE: bool = os.getenv("PDF_FIT_ONE_PAGE", "True").lower() == "true"
+    # Output preset when ?preset= isn't given: fast | small | archival
+    PDF_DEFAULT_PRESET: str = os.getenv("PDF_DEFAULT_PRESET", "fast")
+
+    # Rendered PDF cache (empty PDF_CACHE_DIR disables the disk tier)
+    PDF_CACHE_MEMORY_ITEMS: int = int(os.getenv("PDF_CACHE_MEMORY_ITEMS", "128"))
+    PDF_CACHE_DIR: str = os.getenv("PDF_CACHE_DIR", "")
+    PDF_CACHE_DISK_MAX_MB: int = int(os.getenv("PDF_CACHE_DISK_MAX_MB", "256"))
+
+    # Live previews (PNG needs the optional pypdfium2 package)
+    PREVIEW_CACHE_ITEMS: int = int(os.getenv("PREVIEW_CACHE_ITEMS", "256"))
+    PREVIEW_PNG_WIDTH: int = int(os.getenv("PREVIEW_PNG_WIDTH", "800"))
+
+    # Admission control: per-route concurrency caps, bounded queues, deadline propagation
+    ADMISSION_ANALYZE_CONCURRENCY: int = int(os.getenv("ADMISSION_ANALYZE_CONCURRENCY", "16"))
+    ADMISSION_ANALYZE_QUEUE: int = int(os.getenv("ADMISSION_ANALYZE_QUEUE", "32"))
+    ADMISSION_PDF_CONCURRENCY: int = int(os.getenv("ADMISSION_PDF_CONCURRENCY", "8"))
+    ADMISSION_PDF_QUEUE: int = int(os.getenv("ADMISSION_PDF_QUEUE", "16"))
+    ADMISSION_PREFETCH_CONCURRENCY: int = int(os.getenv("ADMISSION_PREFETCH_CONCURRENCY", "16"))
+    ADMISSION_PREFETCH_QUEUE: int = int(os.getenv("ADMISSION_PREFETCH_QUEUE", "16"))
+    ADMISSION_MAX_QUEUE_WAIT: float = float(os.getenv("ADMISSION_MAX_QUEUE_WAIT", "5"))
+    # Budget for requests that send neither X-Request-Deadline nor X-Request-Timeout (0 = none)
+    REQUEST_DEFAULT_TIMEOUT: float = float(os.getenv("REQUEST_DEFAULT_TIMEOUT", "0"))
+
+    # Opt-in request profiling: send "X-Profile: 1" or sample a fraction of requests
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "False").lower() == "true"
+    PROFILING_SAMPLE_RATE: float = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+    PROFILING_INTERVAL_MS: float = float(os.getenv("PROFILING_INTERVAL_MS", "2"))
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "data/profiles")
+    PROFILE_MAX_FILES: int = int(os.getenv("PROFILE_MAX_FILES", "50"))
     
     class Config:
         env_file = ".env"
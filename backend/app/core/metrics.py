@@ -0,0 +1,159 @@
+"""
+Prometheus metrics for the hot paths (GitHub fetch, Gemini, PDF render), exposed at /metrics.
+
+With several uvicorn workers set PROMETHEUS_MULTIPROC_DIR to an empty, writable directory
+(wiped between deploys): every process then writes its samples there and /metrics aggregates
+them, whichever worker answers the scrape.
+"""
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+
+MULTIPROCESS = bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+PDF_SIZE_BUCKETS = (16e3, 32e3, 64e3, 128e3, 256e3, 512e3, 1e6, 2e6, 5e6)
+RENDER_MEMORY_BUCKETS = (8e6, 16e6, 32e6, 64e6, 128e6, 256e6, 512e6, 1e9)
+
+# stage: github_fetch | llm_request | llm_validate | llm_truncate | pdf_jinja | pdf_parse | pdf_layout | pdf_write | pdf_total
+STAGE_SECONDS = Histogram(
+    "resumegenius_stage_seconds",
+    "Time spent per pipeline stage",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+
+# operation: gemini | gemini_structure
+RETRIES = Counter(
+    "resumegenius_retries_total",
+    "Retried upstream calls",
+    ["operation", "reason"],
+)
+
+# outcome: ok | error | cancelled (lost a hedge race)
+LLM_MODEL_SECONDS = Histogram(
+    "resumegenius_llm_model_seconds",
+    "Gemini call latency per model, validation included",
+    ["model", "outcome"],
+    buckets=STAGE_BUCKETS,
+)
+
+# role: primary | hedge
+LLM_WINS = Counter(
+    "resumegenius_llm_wins_total",
+    "Generations answered, by the model and ladder role that answered first",
+    ["model", "role"],
+)
+
+# outcome: fired | skipped_budget
+LLM_HEDGES = Counter(
+    "resumegenius_llm_hedges_total",
+    "Hedge decisions for calls that outlived LLM_HEDGE_AFTER",
+    ["outcome"],
+)
+
+# route: admission group (analyze | pdf) or the stage a deadline expired before (llm | pdf)
+# reason: queue_full | queue_timeout | deadline
+ADMISSION_REJECTED = Counter(
+    "resumegenius_admission_rejected_total",
+    "Requests shed by admission control or an expired deadline",
+    ["route", "reason"],
+)
+
+IN_FLIGHT = Gauge(
+    "resumegenius_in_flight",
+    "Calls currently in progress",
+    ["operation"],
+    multiprocess_mode="livesum",
+)
+
+GITHUB_RATE_LIMIT_REMAINING = Gauge(
+    "resumegenius_github_rate_limit_remaining",
+    "Remaining GitHub API quota, from X-RateLimit-Remaining",
+    ["resource"],
+    multiprocess_mode="mostrecent",
+)
+
+GITHUB_RATE_LIMIT_LIMIT = Gauge(
+    "resumegenius_github_rate_limit_limit",
+    "GitHub API quota per window, from X-RateLimit-Limit",
+    ["resource"],
+    multiprocess_mode="mostrecent",
+)
+
+# preset: fast | small | archival
+PDF_SIZE_BYTES = Histogram(
+    "resumegenius_pdf_size_bytes",
+    "Size of rendered PDFs",
+    ["preset"],
+    buckets=PDF_SIZE_BUCKETS,
+)
+
+# Peak RSS growth of a render worker over one render (only measured in worker processes)
+PDF_RENDER_MEMORY_BYTES = Histogram(
+    "resumegenius_pdf_render_memory_bytes",
+    "Peak memory used by one PDF render",
+    buckets=RENDER_MEMORY_BUCKETS,
+)
+
+
+@contextmanager
+def time_stage(stage: str, timings: Optional[Dict[str, float]] = None):
+    """
+    Observes the block's duration under `stage`. When `timings` is given the duration is
+    recorded there instead, for code running where it can't be exported (render workers).
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        if timings is not None:
+            # Stages that run more than once per render (layout while fitting) add up
+            timings[stage] = timings.get(stage, 0.0) + elapsed
+        else:
+            STAGE_SECONDS.labels(stage).observe(elapsed)
+
+
+def observe_stages(timings: Dict[str, float]):
+    for stage, elapsed in timings.items():
+        STAGE_SECONDS.labels(stage).observe(elapsed)
+
+
+@contextmanager
+def track_in_flight(operation: str):
+    gauge = IN_FLIGHT.labels(operation)
+    gauge.inc()
+    try:
+        yield
+    finally:
+        gauge.dec()
+
+
+def render_latest() -> bytes:
+    if MULTIPROCESS:
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def mark_process_dead():
+    """Drops this process's live gauges from the shared directory on shutdown."""
+    if MULTIPROCESS:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(os.getpid())
+
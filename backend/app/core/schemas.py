@@ -1,5 +1,5 @@
 from typing import List, Optional
-from pydantic import BaseModel, HttpUrl, EmailStr
+from pydantic import BaseModel, Field, HttpUrl, EmailStr
 
 # --- Input Models ---
 class ManualExperienceItem(BaseModel):
@@ -27,6 +27,13 @@ class AnalyzeRequest(BaseModel):
     manual_highlights: List[str] = []
     is_student: bool = False
 
+class PrefetchRequest(BaseModel):
+    github_url: HttpUrl
+
+class BatchAnalyzeRequest(BaseModel):
+    items: List[AnalyzeRequest]
+    render_pdf: bool = False  # Also render PDFs and return everything as a zip
+
 class PersonalInfo(BaseModel):
     full_name: str
     email: Optional[EmailStr] = None
@@ -58,3 +65,12 @@ class ResumeSchema(BaseModel):
     education: List[EducationItem]
     skills: List[str]
     is_student: bool = False  # Pass through for template rendering
+
+class RefineRequest(BaseModel):
+    # Either an inline resume or a stored one (latest version unless given)
+    resume: Optional[ResumeSchema] = None
+    resume_id: Optional[str] = Field(None, min_length=1)
+    version: Optional[int] = None
+    path: str  # "summary", "skills", "experience[1]", "projects[0]", ...
+    instructions: Optional[str] = None
+    temperature: Optional[float] = Field(None, ge=0, le=2)  # Defaults to REFINE_TEMPERATURE
@@ -1,11 +1,37 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.endpoints import router
+from app.core.admission import AdmissionControlMiddleware, RouteGroup
 from app.core.config import settings
+from app.core.metrics import CONTENT_TYPE_LATEST, mark_process_dead, render_latest
+from app.services.render_pool import render_pool
+from app.services.github import start_github_client, close_github_client
+from app.services.jobs import job_queue
+from app.services.resume_store import resume_store
+from app.services import llm
 
 print("USE_REAL_GITHUB =", settings.USE_REAL_GITHUB)
 
-app = FastAPI(title="ResumeGenius AI Backend")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    render_pool.start()
+    start_github_client()
+    await resume_store.start()
+    await job_queue.start()
+    # Heavy SDK imports happen once the server is already answering; see /ready
+    llm_warm_up = asyncio.create_task(asyncio.to_thread(llm.warm_up))
+    yield
+    if not llm_warm_up.done():
+        llm_warm_up.cancel()
+    await job_queue.stop()
+    await resume_store.stop()
+    await close_github_client()
+    await render_pool.stop()
+    mark_process_dead()
+
+app = FastAPI(title="ResumeGenius AI Backend", lifespan=lifespan)
 
 import os
 
@@ -17,16 +43,65 @@ origins = [
     frontend_url
 ]
 
+# Added before CORS so shed requests still carry CORS headers
+app.add_middleware(
+    AdmissionControlMiddleware,
+    groups=[
+        RouteGroup(
+            "analyze",
+            [r"^/api/v1/analyze(/stream)?$", r"^/api/v1/analyze_batch$", r"^/api/v1/refine$"],
+            settings.ADMISSION_ANALYZE_CONCURRENCY,
+            settings.ADMISSION_ANALYZE_QUEUE,
+            settings.ADMISSION_MAX_QUEUE_WAIT,
+        ),
+        RouteGroup(
+            "pdf",
+            # Previews too: PNG ones render a full PDF through the same pool
+            [r"^/api/v1/generate_pdf$", r"^/api/v1/preview$", r"^/api/v1/resumes/[^/]+/(pdf|preview)$"],
+            settings.ADMISSION_PDF_CONCURRENCY,
+            settings.ADMISSION_PDF_QUEUE,
+            settings.ADMISSION_MAX_QUEUE_WAIT,
+        ),
+        RouteGroup(
+            "prefetch",
+            [r"^/api/v1/github/prefetch$"],
+            settings.ADMISSION_PREFETCH_CONCURRENCY,
+            settings.ADMISSION_PREFETCH_QUEUE,
+            settings.ADMISSION_MAX_QUEUE_WAIT,
+        ),
+    ],
+    default_timeout=settings.REQUEST_DEFAULT_TIMEOUT,
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
-    allow_methods=["GET", "POST", "OPTIONS"],
+    allow_methods=["GET", "POST", "PUT", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Retry-After", "Accept-Ranges", "Content-Range", "X-Resume-Id", "X-Resume-Version", "X-Profile-Id"],
 )
 
 app.include_router(router, prefix="/api/v1")
 
+# async so it's served on the event loop, never queued behind a saturated threadpool
 @app.get("/")
-def health_check():
+async def health_check():
     return {"status": "ok", "service": "ResumeGenius AI"}
+
+@app.get("/ready")
+def readiness_check(response: Response):
+    """Which lazily-loaded subsystems are warm; 503 until all of them are."""
+    subsystems = {
+        "pdf_renderer": render_pool.is_warm(),
+        "llm_client": llm.client_ready(),
+    }
+    ready = all(subsystems.values())
+    if not ready:
+        response.status_code = 503
+    return {"ready": ready, "subsystems": subsystems}
+
+@app.get("/metrics")
+def metrics():
+    # Prometheus text format; aggregated across workers when PROMETHEUS_MULTIPROC_DIR is set
+    return Response(content=render_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -102,3 +102,143 @@ MOCK_PROFILES = {
         "github": ""
     }
 }
+
+# Structured resumes matching MOCK_PROFILES, used to exercise PDF rendering without the LLM
+MOCK_RESUMES = {
+    "strong": {
+        "personal_info": {
+            "full_name": "Alexandra Chen",
+            "email": "alexandra.chen@example.com",
+            "linkedin": "linkedin.com/in/alexandra-chen",
+            "github": "github.com/alexchen-dev"
+        },
+        "summary": "Staff Software Engineer with 10+ years designing scalable backend systems for high-throughput data processing and cloud infrastructure at Google and Amazon.",
+        "highlights": [
+            "Reduced infrastructure costs by $2M/year through resource allocation optimization.",
+            "Maintainer of distributed-kv-store (2.4k stars)."
+        ],
+        "experience": [
+            {
+                "company": "Google",
+                "role": "Staff Software Engineer",
+                "duration": "Jan 2020 - Present",
+                "location": "Mountain View, CA",
+                "bullets": [
+                    "Led the Spanner-based global inventory system handling 500k QPS.",
+                    "Designed a multi-region consistency protocol, reducing cross-region latency by 40%.",
+                    "Mentored 5 senior engineers to promotion."
+                ]
+            },
+            {
+                "company": "Amazon",
+                "role": "Senior Software Engineer",
+                "duration": "June 2016 - Dec 2019",
+                "location": "Seattle, WA",
+                "bullets": [
+                    "Migrated monolith services to a serverless architecture (Lambda/DynamoDB).",
+                    "Improved checkout availability from 99.9% to 99.999% during peak holiday traffic.",
+                    "Built an automated canary testing tool adopted by 40+ teams."
+                ]
+            }
+        ],
+        "projects": [
+            {
+                "name": "distributed-kv-store",
+                "technologies": ["Go"],
+                "description": "High-performance eventually consistent key-value store.",
+                "link": "github.com/alexchen-dev/distributed-kv-store"
+            },
+            {
+                "name": "k8s-autoscaler-plugin",
+                "technologies": ["Python", "Kubernetes"],
+                "description": "Custom HPA logic for ML workloads.",
+                "link": "github.com/alexchen-dev/k8s-autoscaler-plugin"
+            }
+        ],
+        "education": [
+            {"institution": "Stanford University", "degree": "M.S. Computer Science", "duration": "2016"},
+            {"institution": "UC Berkeley", "degree": "B.S. Computer Science", "duration": "2014"}
+        ],
+        "skills": [
+            "Languages: Java, Go, Python, SQL",
+            "Cloud: GCP, AWS, Kubernetes",
+            "Systems: Distributed Systems, System Design"
+        ]
+    },
+    "mid": {
+        "personal_info": {
+            "full_name": "Jordan Smith",
+            "email": "jordan.smith@example.com",
+            "github": "github.com/jsmith-codex"
+        },
+        "summary": "Full stack developer with 3 years of experience building web applications with React and Node.js.",
+        "highlights": [],
+        "experience": [
+            {
+                "company": "StartUp Inc",
+                "role": "Software Engineer",
+                "duration": "Feb 2022 - Present",
+                "location": "Remote",
+                "bullets": [
+                    "Built the main dashboard using React and Redux.",
+                    "Implemented the user login flow using Auth0.",
+                    "Improved page load speed and fixed production bugs."
+                ]
+            },
+            {
+                "company": "Tech Solutions",
+                "role": "Junior Developer",
+                "duration": "Jan 2021 - Jan 2022",
+                "location": "Austin, TX",
+                "bullets": [
+                    "Built client landing pages using HTML, CSS and JavaScript.",
+                    "Automated data entry with Python scripts."
+                ]
+            }
+        ],
+        "projects": [
+            {
+                "name": "portfolio-v2",
+                "technologies": ["JavaScript"],
+                "description": "Personal portfolio website.",
+                "link": "github.com/jsmith-codex/portfolio-v2"
+            },
+            {
+                "name": "weather-app",
+                "technologies": ["React"],
+                "description": "Weather dashboard backed by a public weather API."
+            }
+        ],
+        "education": [
+            {"institution": "Ironhack", "degree": "Web Development Bootcamp", "duration": "2020"},
+            {"institution": "UT Austin", "degree": "B.A. English", "duration": "2019"}
+        ],
+        "skills": [
+            "Languages: JavaScript, HTML, CSS",
+            "Frameworks: React, Node.js",
+            "Tools: Git"
+        ]
+    },
+    "weak": {
+        "personal_info": {"full_name": "Bob"},
+        "summary": "Freelance web developer with Python experience.",
+        "highlights": [],
+        "experience": [
+            {
+                "company": "Freelance",
+                "role": "Web Developer",
+                "duration": "2023 - Present",
+                "bullets": ["Built websites for clients.", "Wrote Python scripts."]
+            },
+            {
+                "company": "Walmart",
+                "role": "Cashier",
+                "duration": "2020 - 2022",
+                "bullets": ["Handled cash transactions."]
+            }
+        ],
+        "projects": [],
+        "education": [],
+        "skills": ["Tools: Python, Word, Excel"]
+    }
+}
@@ -0,0 +1,48 @@
+from typing import Awaitable, Callable
+from fastapi import HTTPException
+from app.core.schemas import AnalyzeRequest, ResumeSchema
+from app.services.github_prefetch import github_prefetcher
+from app.services.llm import analyze_profiles
+
+
+async def fetch_github_for_request(request: AnalyzeRequest, fetch: Callable[[str], Awaitable[str]] = github_prefetcher.get) -> str:
+    """
+    Validates the input sources and returns the GitHub summary (empty if unavailable).
+    By default a summary from /github/prefetch is reused, or its fetch joined if still running.
+    `fetch` lets callers share or de-duplicate fetches (e.g. batches).
+    """
+    if not request.github_url and not request.manual_experience:
+        raise HTTPException(status_code=400, detail="At least one input source (GitHub or Manual Experience) is required")
+
+    # GitHub Data
+    github_data = ""
+    if request.github_url:
+        try:
+            github_data = await fetch(str(request.github_url))
+        except Exception as e:
+            print(f"GitHub Error: {e}")
+
+    if not github_data and not request.manual_experience:
+        raise HTTPException(status_code=400, detail="Could not fetch data from GitHub and no manual experience provided.")
+
+    return github_data
+
+
+async def generate_for_request(request: AnalyzeRequest, github_data: str) -> ResumeSchema:
+    """Gemini generation (with overrides and hard limits) for an already-fetched GitHub summary."""
+    return await analyze_profiles(
+        github_data,
+        request.manual_experience,
+        request.manual_education,
+        request.manual_highlights,
+        request.is_student,
+        request.linkedin_url,
+        request.email,
+        request.phone
+    )
+
+
+async def analyze_request(request: AnalyzeRequest) -> ResumeSchema:
+    """Full /analyze pipeline: GitHub fetch, then Gemini generation."""
+    github_data = await fetch_github_for_request(request)
+    return await generate_for_request(request, github_data)
@@ -0,0 +1,97 @@
+import asyncio
+import json
+import tempfile
+import zipfile
+from typing import AsyncIterator, BinaryIO, Dict, List, Optional, Tuple
+from fastapi import HTTPException
+from app.core.config import settings
+from app.core.schemas import AnalyzeRequest
+from app.services.analysis import fetch_github_for_request, generate_for_request
+from app.services.github import fetch_github_data
+from app.services.render_pool import render_pool
+
+# A batch zip is built in memory up to this size, then in a temp file
+ZIP_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+
+async def run_batch(items: List[AnalyzeRequest], render_pdf: bool = False) -> AsyncIterator[Tuple[dict, Optional[bytes]]]:
+    """
+    Analyzes every item, yielding (result, pdf_bytes) in completion order.
+    GitHub fetches and LLM calls have separate concurrency limits, and each GitHub user
+    is fetched once per batch no matter how many items reference it.
+    """
+    github_slots = asyncio.Semaphore(settings.BATCH_GITHUB_CONCURRENCY)
+    llm_slots = asyncio.Semaphore(settings.BATCH_LLM_CONCURRENCY)
+    # Keep renders within what the pool can run without rejecting
+    pdf_slots = asyncio.Semaphore(max(render_pool.workers, 1))
+    github_fetches: Dict[str, asyncio.Task] = {}
+
+    async def _fetch(github_url: str) -> str:
+        async with github_slots:
+            return await fetch_github_data(github_url)
+
+    def fetch_once(github_url: str):
+        username = github_url.rstrip("/").split("/")[-1].lower()
+        if username not in github_fetches:
+            github_fetches[username] = asyncio.ensure_future(_fetch(github_url))
+        # Shielded: one item being cancelled mustn't cancel the fetch for the others
+        return asyncio.shield(github_fetches[username])
+
+    async def process(index: int, item: AnalyzeRequest) -> Tuple[dict, Optional[bytes]]:
+        try:
+            github_data = await fetch_github_for_request(item, fetch=fetch_once)
+            async with llm_slots:
+                resume = await generate_for_request(item, github_data)
+
+            pdf_bytes = None
+            if render_pdf:
+                async with pdf_slots:
+                    pdf_bytes = await render_pool.render(resume)
+
+            return {"index": index, "status": "ok", "resume": resume.model_dump(mode="json")}, pdf_bytes
+        except HTTPException as e:
+            return {"index": index, "status": "error", "status_code": e.status_code, "error": e.detail}, None
+        except Exception as e:
+            print(f"Error in batch item {index}: {e}")
+            return {"index": index, "status": "error", "status_code": 500, "error": str(e)}, None
+
+    pending = {asyncio.ensure_future(process(i, item)) for i, item in enumerate(items)}
+    try:
+        # Finished tasks are dropped once yielded, so their PDFs don't outlive the consumer's use
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        # Client went away (or we're done): don't leave work running
+        for task in list(pending) + list(github_fetches.values()):
+            task.cancel()
+
+
+async def stream_ndjson(items: List[AnalyzeRequest]) -> AsyncIterator[str]:
+    async for result, _ in run_batch(items):
+        yield json.dumps(result) + "\n"
+
+
+async def build_zip(items: List[AnalyzeRequest]) -> BinaryIO:
+    """
+    Runs the batch with PDF rendering; returns a zip of resume_<index>.pdf files + results.ndjson
+    as a temp file positioned at its start, for the caller to close. Each PDF is written into
+    the zip as soon as its render completes, so memory doesn't grow with the batch.
+    """
+    lines = []
+    spool = tempfile.SpooledTemporaryFile(max_size=ZIP_SPOOL_MAX_SIZE)
+    try:
+        with zipfile.ZipFile(spool, "w") as archive:
+            async for result, pdf_bytes in run_batch(items, render_pdf=True):
+                lines.append(json.dumps(result))
+                if pdf_bytes is not None:
+                    # PDFs are already compressed
+                    await asyncio.to_thread(archive.writestr, f"resume_{result['index']:03d}.pdf", pdf_bytes, compress_type=zipfile.ZIP_STORED)
+                    del pdf_bytes
+            await asyncio.to_thread(archive.writestr, "results.ndjson", "\n".join(lines) + "\n", compress_type=zipfile.ZIP_DEFLATED)
+        spool.seek(0)
+        return spool
+    except BaseException:
+        spool.close()
+        raise
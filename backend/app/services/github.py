@@ -1,102 +1,361 @@
+import asyncio
 import httpx
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from app.core.config import settings
+from app.core.metrics import time_stage, track_in_flight
+from app.services.github_cache import github_cache
 
 logger = logging.getLogger(__name__)
 
-async def fetch_github_data(github_url: str) -> str:
+GITHUB_API = "https://api.github.com"
+REPOS_PER_PAGE = 100
+
+# One round-trip for profile + a page of repos; contributions only on the first page
+GRAPHQL_QUERY = """
+query($login: String!, $cursor: String, $firstPage: Boolean!) {
+  user(login: $login) {
+    login
+    name
+    bio
+    followers { totalCount }
+    contributionsCollection @include(if: $firstPage) {
+      contributionCalendar { totalContributions }
+    }
+    repositories(first: 100, after: $cursor, ownerAffiliations: OWNER, privacy: PUBLIC,
+                 orderBy: {field: PUSHED_AT, direction: DESC}) {
+      totalCount
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        name
+        description
+        url
+        isFork
+        stargazerCount
+        updatedAt
+        primaryLanguage { name }
+      }
+    }
+  }
+}
+"""
+
+# Summaries returned when GitHub couldn't be reached or rate limited us; transient, so not worth keeping around
+FETCH_ERROR_PREFIX = "Error fetching GitHub data"
+RATE_LIMITED_SUMMARY = "GitHub API Rate Limit Exceeded. Using minimal data."
+TRANSIENT_SUMMARIES = (FETCH_ERROR_PREFIX, RATE_LIMITED_SUMMARY)
+
+class GitHubLookupError(Exception):
+    """Terminal lookup outcome (user missing, rate limited); str(e) is the summary handed to the LLM."""
+
+# Shared, pooled client; created/closed by the app lifespan (see app/main.py)
+_client: Optional[httpx.AsyncClient] = None
+
+def create_github_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=settings.GITHUB_HTTP2,
+        limits=httpx.Limits(
+            max_connections=settings.GITHUB_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.GITHUB_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.GITHUB_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(
+            settings.GITHUB_READ_TIMEOUT,
+            connect=settings.GITHUB_CONNECT_TIMEOUT,
+        ),
+    )
+
+def start_github_client():
+    global _client
+    if _client is None:
+        _client = create_github_client()
+
+async def close_github_client():
+    global _client
+    client, _client = _client, None
+    if client:
+        await client.aclose()
+
+def github_username(github_url: str) -> str:
+    return github_url.rstrip("/").split("/")[-1]
+
+async def fetch_github_data(github_url: str, client: Optional[httpx.AsyncClient] = None) -> str:
     """
     Fetches public GitHub data for a given user URL.
     Returns a formatted string summary for the LLM.
+    Uses `client`, else the shared lifespan client, else a one-off client (scripts).
     """
     if not github_url:
         return ""
 
-    username = github_url.rstrip("/").split("/")[-1]
+    username = github_username(github_url)
     headers = {"Accept": "application/vnd.github.v3+json"}
     if settings.GITHUB_TOKEN:
         headers["Authorization"] = f"token {settings.GITHUB_TOKEN}"
 
+    client = client or _client
+    if client is not None:
+        return await _fetch_with_client(client, username, headers)
+
+    async with create_github_client() as client:
+        return await _fetch_with_client(client, username, headers)
+
+async def _fetch_with_client(client: httpx.AsyncClient, username: str, headers: Dict[str, str]) -> str:
+    with track_in_flight("github"), time_stage("github_fetch"):
+        return await _fetch_profile(client, username, headers)
+
+async def _fetch_profile(client: httpx.AsyncClient, username: str, headers: Dict[str, str]) -> str:
+    try:
+        profile = None
+        # GraphQL needs a token; anything unexpected there falls back to REST
+        if settings.GITHUB_TOKEN:
+            try:
+                profile = await _cached_graphql(client, username, headers)
+            except (httpx.HTTPError, ValueError, KeyError, TypeError) as e:
+                logger.warning(f"GitHub GraphQL fetch failed, falling back to REST: {e}")
+
+        if profile is None:
+            profile = await _fetch_rest(client, username, headers)
+
+    except GitHubLookupError as e:
+        return str(e)
+    except httpx.RequestError as e:
+        logger.error(f"GitHub API Connection Error: {e}")
+        return f"{FETCH_ERROR_PREFIX}: {str(e)}"
+
+    user_data, repos = profile
+    return _format_summary(user_data, repos)
+
+async def _cached_get(client: httpx.AsyncClient, username: str, url: str, headers: Dict[str, str], params: Optional[Dict[str, Any]] = None):
+    """
+    GET through the GitHub response cache. Returns an httpx.Response or a CachedResponse.
+    Stale data is served when the quota is exhausted, GitHub rate-limits us, or the request fails.
+    """
+    endpoint = url if not params else f"{url}?{httpx.QueryParams(params)}"
+    key = github_cache.key(username, endpoint)
+    entry = github_cache.lookup(key)
+
+    if entry is not None:
+        if github_cache.is_fresh(entry):
+            github_cache.fresh_hits += 1
+            return entry
+        if github_cache.quota_exhausted():
+            github_cache.stale_served += 1
+            return entry
+
+    try:
+        resp = await client.get(url, params=params, headers={**headers, **github_cache.conditional_headers(entry)})
+    except httpx.RequestError:
+        if entry is not None:
+            github_cache.stale_served += 1
+            return entry
+        raise
+
+    github_cache.update_rate_limit(resp.headers)
+
+    if resp.status_code == 304 and entry is not None:
+        # Not modified: free on the rate limit, just extend the entry's freshness
+        github_cache.touch(entry)
+        github_cache.revalidated += 1
+        return entry
+    if resp.status_code == 200:
+        github_cache.misses += 1
+        return github_cache.store(key, resp.status_code, resp.json(), resp.headers)
+    if resp.status_code in (403, 429) and entry is not None:
+        github_cache.stale_served += 1
+        return entry
+    return resp
+
+async def _cached_graphql(client: httpx.AsyncClient, username: str, headers: Dict[str, str]):
+    """GraphQL has no ETags, so the parsed profile is cached with the TTL and served stale on failure."""
+    key = github_cache.key(username, "graphql")
+    entry = github_cache.lookup(key)
+
+    if entry is not None:
+        if github_cache.is_fresh(entry):
+            github_cache.fresh_hits += 1
+            return entry.body
+        if github_cache.quota_exhausted("graphql"):
+            github_cache.stale_served += 1
+            return entry.body
+
+    try:
+        profile = await _fetch_graphql(client, username, headers)
+    except GitHubLookupError:
+        raise
+    except (httpx.HTTPError, ValueError, KeyError, TypeError):
+        if entry is not None:
+            github_cache.stale_served += 1
+            return entry.body
+        raise
+
+    github_cache.misses += 1
+    github_cache.store(key, 200, profile)
+    return profile
+
+async def _fetch_graphql(client: httpx.AsyncClient, username: str, headers: Dict[str, str]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Profile + every owned public repo via GraphQL, normalized to the REST field names."""
+    user_data = None
+    repos = []
+    cursor = None
+
+    while True:
+        resp = await client.post(
+            f"{GITHUB_API}/graphql",
+            json={"query": GRAPHQL_QUERY, "variables": {"login": username, "cursor": cursor, "firstPage": cursor is None}},
+            headers=headers,
+        )
+        github_cache.update_rate_limit(resp.headers)
+        resp.raise_for_status()
+        payload = resp.json()
+
+        user = (payload.get("data") or {}).get("user")
+        if user is None:
+            if any(err.get("type") == "NOT_FOUND" for err in payload.get("errors", [])):
+                raise GitHubLookupError(f"GitHub User {username} not found.")
+            raise ValueError(f"GraphQL errors: {payload.get('errors')}")
+
+        repo_conn = user["repositories"]
+        if user_data is None:
+            contributions = user.get("contributionsCollection") or {}
+            user_data = {
+                "login": user["login"],
+                "name": user.get("name"),
+                "bio": user.get("bio"),
+                "public_repos": repo_conn["totalCount"],
+                "followers": user["followers"]["totalCount"],
+                "contributions": contributions.get("contributionCalendar", {}).get("totalContributions"),
+            }
+
+        for node in repo_conn["nodes"]:
+            repos.append({
+                "name": node["name"],
+                "description": node.get("description"),
+                "html_url": node["url"],
+                "fork": node["isFork"],
+                "stargazers_count": node["stargazerCount"],
+                "updated_at": node["updatedAt"],
+                "language": (node.get("primaryLanguage") or {}).get("name"),
+            })
+
+        page_info = repo_conn["pageInfo"]
+        if not page_info["hasNextPage"]:
+            return user_data, repos
+        cursor = page_info["endCursor"]
+
+async def _fetch_rest(client: httpx.AsyncClient, username: str, headers: Dict[str, str]) -> Tuple[Optional[Dict[str, Any]], Optional[List[Dict[str, Any]]]]:
+    """Profile and first repo page concurrently, then any remaining pages concurrently."""
+
+    def get_repo_page(page: int):
+        return _cached_get(
+            client, username,
+            f"{GITHUB_API}/users/{username}/repos",
+            headers,
+            params={"sort": "pushed", "per_page": REPOS_PER_PAGE, "type": "owner", "page": page},
+        )
+
+    user_resp, repos_resp = await asyncio.gather(
+        _cached_get(client, username, f"{GITHUB_API}/users/{username}", headers),
+        get_repo_page(1),
+    )
+
+    user_data = None
+    if user_resp.status_code == 200:
+        user_data = user_resp.json()
+    elif user_resp.status_code == 404:
+        raise GitHubLookupError(f"GitHub User {username} not found.")
+    elif user_resp.status_code == 403:
+        raise GitHubLookupError(RATE_LIMITED_SUMMARY)
+
+    if repos_resp.status_code != 200:
+        return user_data, None
+
+    repos = repos_resp.json()
+    if len(repos) < REPOS_PER_PAGE:
+        return user_data, repos
+
+    # public_repos tells us how many pages to fetch in parallel
+    total = (user_data or {}).get("public_repos", 0)
+    last_page = max(2, -(-total // REPOS_PER_PAGE))
+    page_resps = await asyncio.gather(*(get_repo_page(page) for page in range(2, last_page + 1)))
+    page_items = []
+    for resp in page_resps:
+        if resp.status_code != 200:
+            logger.warning(f"GitHub repo page fetch failed for {username}: {resp.status_code}")
+            return user_data, repos
+        page_items = resp.json()
+        repos.extend(page_items)
+
+    # The count can lag behind reality; keep going while pages come back full
+    page = last_page
+    while len(page_items) == REPOS_PER_PAGE:
+        page += 1
+        resp = await get_repo_page(page)
+        if resp.status_code != 200:
+            break
+        page_items = resp.json()
+        repos.extend(page_items)
+
+    return user_data, repos
+
+def _format_summary(user_data: Optional[Dict[str, Any]], repos: Optional[List[Dict[str, Any]]]) -> str:
     summary_parts = []
 
-    async with httpx.AsyncClient() as client:
-        try:
-            # 1. Fetch User Profile
-            user_resp = await client.get(f"https://api.github.com/users/{username}", headers=headers)
-            if user_resp.status_code == 200:
-                user_data = user_resp.json()
-                summary_parts.append(f"User: {user_data.get('login')}")
-                summary_parts.append(f"Name: {user_data.get('name', 'N/A')}")
-                summary_parts.append(f"Bio: {user_data.get('bio', 'N/A')}")
-                summary_parts.append(f"Public Repos: {user_data.get('public_repos', 0)}")
-                summary_parts.append(f"Followers: {user_data.get('followers', 0)}")
-            elif user_resp.status_code == 404:
-                return f"GitHub User {username} not found."
-            elif user_resp.status_code == 403:
-                 return "GitHub API Rate Limit Exceeded. Using minimal data."
-
-            # 2. Fetch Repositories (Fetch up to 100 to allow filtering)
-            repos_resp = await client.get(
-                f"https://api.github.com/users/{username}/repos?sort=pushed&per_page=100&type=owner",
-                headers=headers
-            )
-            
-            if repos_resp.status_code == 200:
-                repos = repos_resp.json()
-                
-                # Filter Logic
-                # 1. Start with non-forks with descriptions
-                high_quality = [
-                    r for r in repos 
-                    if not r.get('fork') and r.get('description')
-                ]
-                
-                # 2. Include forks if they have stars (indicates contribution/notable fork)
-                notable_forks = [
-                    r for r in repos 
-                    if r.get('fork') and r.get('stargazers_count', 0) >= 2
-                ]
-                
-                # 3. Fallback: If we have very few high quality repos, include any non-forks (even w/o desc)
-                # or just recent ones to fill the gap.
-                candidates = high_quality + notable_forks
-                
-                # Deduplicate just in case (though logic separates them)
-                # Sort by stars (primary) and updated_at (secondary)
-                sorted_repos = sorted(
-                    candidates, 
-                    key=lambda x: (x.get('stargazers_count', 0), x.get('updated_at', '')), 
-                    reverse=True
-                )
-                
-                # Selecting top candidates
-                selected_repos = sorted_repos[:8]
-                
-                # FALLBACK: If < 3 selected, grab the most recent pushed repos regardless of stars/fork status
-                # (to ensure we have *something* for the resume)
-                if len(selected_repos) < 3:
-                    remaining = [r for r in repos if r not in selected_repos]
-                    recent_filler = sorted(remaining, key=lambda x: x.get('updated_at', ''), reverse=True)[:(5 - len(selected_repos))]
-                    selected_repos.extend(recent_filler)
-
-                summary_parts.append("\nTop Repositories (Filtered for Quality):")
-                for repo in selected_repos:
-                    name = repo.get('name')
-                    stars = repo.get('stargazers_count', 0)
-                    language = repo.get('language', 'Unknown')
-                    desc = repo.get('description', 'No description')
-                    url = repo.get('html_url')
-                    # Add pushed_at to help LLM know recency
-                    updated = repo.get('updated_at', '').split('T')[0]
-                    summary_parts.append(f"- {name} ({language}): {stars} stars. Updated: {updated}. {desc} [Link: {url}]")
-            
-            # 3. Simple Contribution Proxy (Public Events)
-            # Fetching accurate graph data requires querying /users/{username}/events and aggregating
-            # For this MVP, we will rely on repo activity as a proxy.
-            
-        except httpx.RequestError as e:
-            logger.error(f"GitHub API Connection Error: {e}")
-            return f"Error fetching GitHub data: {str(e)}"
+    if user_data:
+        summary_parts.append(f"User: {user_data.get('login')}")
+        summary_parts.append(f"Name: {user_data.get('name', 'N/A')}")
+        summary_parts.append(f"Bio: {user_data.get('bio', 'N/A')}")
+        summary_parts.append(f"Public Repos: {user_data.get('public_repos', 0)}")
+        summary_parts.append(f"Followers: {user_data.get('followers', 0)}")
+
+    if repos is not None:
+        # Filter Logic
+        # 1. Start with non-forks with descriptions
+        high_quality = [
+            r for r in repos 
+            if not r.get('fork') and r.get('description')
+        ]
+        
+        # 2. Include forks if they have stars (indicates contribution/notable fork)
+        notable_forks = [
+            r for r in repos 
+            if r.get('fork') and r.get('stargazers_count', 0) >= 2
+        ]
+        
+        # 3. Fallback: If we have very few high quality repos, include any non-forks (even w/o desc)
+        # or just recent ones to fill the gap.
+        candidates = high_quality + notable_forks
+        
+        # Deduplicate just in case (though logic separates them)
+        # Sort by stars (primary) and updated_at (secondary)
+        sorted_repos = sorted(
+            candidates, 
+            key=lambda x: (x.get('stargazers_count', 0), x.get('updated_at', '')), 
+            reverse=True
+        )
+        
+        # Selecting top candidates
+        selected_repos = sorted_repos[:8]
+        
+        # FALLBACK: If < 3 selected, grab the most recent pushed repos regardless of stars/fork status
+        # (to ensure we have *something* for the resume)
+        if len(selected_repos) < 3:
+            remaining = [r for r in repos if r not in selected_repos]
+            recent_filler = sorted(remaining, key=lambda x: x.get('updated_at', ''), reverse=True)[:(5 - len(selected_repos))]
+            selected_repos.extend(recent_filler)
+
+        summary_parts.append("\nTop Repositories (Filtered for Quality):")
+        for repo in selected_repos:
+            name = repo.get('name')
+            stars = repo.get('stargazers_count', 0)
+            language = repo.get('language', 'Unknown')
+            desc = repo.get('description', 'No description')
+            url = repo.get('html_url')
+            # Add pushed_at to help LLM know recency
+            updated = repo.get('updated_at', '').split('T')[0]
+            summary_parts.append(f"- {name} ({language}): {stars} stars. Updated: {updated}. {desc} [Link: {url}]")
+
+    # Contribution totals (GraphQL path) are kept on user_data but not yet part of the summary,
+    # so the LLM input format is unchanged.
 
     return "\n".join(summary_parts)
@@ -0,0 +1,107 @@
+import time
+import logging
+from typing import Any, Dict, Hashable, Optional
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.metrics import GITHUB_RATE_LIMIT_LIMIT, GITHUB_RATE_LIMIT_REMAINING
+
+logger = logging.getLogger(__name__)
+
+
+class CachedResponse:
+    """Stored GitHub response; quacks like the bits of httpx.Response the GitHub service reads."""
+
+    def __init__(self, status_code: int, body: Any, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        self.status_code = status_code
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = time.monotonic()
+
+    def json(self) -> Any:
+        return self.body
+
+
+class GitHubCache:
+    """
+    Bounded LRU of GitHub responses keyed by (username, endpoint).
+    - Fresh entries (younger than `ttl`) are served without a request.
+    - Older entries are revalidated with If-None-Match / If-Modified-Since; 304s are free on GitHub's rate limit.
+    - Remaining quota is tracked per X-RateLimit-Resource so stale data can be served once it's exhausted.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.ttl = ttl
+        self._entries = LRUCache(max_entries=max_entries)
+        self._rate_limits: Dict[str, Dict[str, int]] = {}
+        self.fresh_hits = 0
+        self.revalidated = 0
+        self.stale_served = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(username: str, endpoint: str) -> Hashable:
+        # GitHub logins are case-insensitive, and so are the URLs built from them
+        return (username.lower(), endpoint.lower())
+
+    def lookup(self, key: Hashable) -> Optional[CachedResponse]:
+        return self._entries.get(key)
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        return time.monotonic() - entry.fetched_at <= self.ttl
+
+    def conditional_headers(self, entry: Optional[CachedResponse]) -> Dict[str, str]:
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def store(self, key: Hashable, status_code: int, body: Any, headers=None) -> CachedResponse:
+        headers = headers or {}
+        entry = CachedResponse(status_code, body, headers.get("ETag"), headers.get("Last-Modified"))
+        self._entries.set(key, entry)
+        return entry
+
+    def touch(self, entry: CachedResponse):
+        entry.fetched_at = time.monotonic()
+
+    def update_rate_limit(self, headers):
+        remaining = headers.get("X-RateLimit-Remaining")
+        if remaining is None:
+            return
+        resource = headers.get("X-RateLimit-Resource", "core")
+        self._rate_limits[resource] = {
+            "limit": int(headers.get("X-RateLimit-Limit", 0)),
+            "remaining": int(remaining),
+            "reset": int(headers.get("X-RateLimit-Reset", 0)),
+        }
+        GITHUB_RATE_LIMIT_REMAINING.labels(resource).set(int(remaining))
+        GITHUB_RATE_LIMIT_LIMIT.labels(resource).set(self._rate_limits[resource]["limit"])
+        if int(remaining) == 0:
+            logger.warning(f"GitHub rate limit exhausted for '{resource}' until {self._rate_limits[resource]['reset']}")
+
+    def quota_exhausted(self, resource: str = "core") -> bool:
+        state = self._rate_limits.get(resource)
+        return bool(state) and state["remaining"] <= 0 and time.time() < state["reset"]
+
+    def rate_limits(self) -> Dict[str, Dict[str, int]]:
+        return dict(self._rate_limits)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "fresh_hits": self.fresh_hits,
+            "revalidated": self.revalidated,
+            "stale_served": self.stale_served,
+            "misses": self.misses,
+            "rate_limits": self.rate_limits(),
+        }
+
+
+github_cache = GitHubCache(
+    max_entries=settings.GITHUB_CACHE_MAX_ENTRIES,
+    ttl=settings.GITHUB_CACHE_TTL,
+)
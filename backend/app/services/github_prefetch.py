@@ -0,0 +1,73 @@
+import logging
+from app.core.cache import LRUCache, SingleFlight
+from app.core.config import settings
+from app.services.github import TRANSIENT_SUMMARIES, fetch_github_data, github_username
+
+logger = logging.getLogger(__name__)
+
+
+class GitHubPrefetcher:
+    """
+    GitHub summaries fetched ahead of /analyze, e.g. while the user is still filling in the form.
+    - Finished summaries are kept for `ttl` seconds in a bounded LRU, keyed by lowercased username.
+    - A fetch still running is joined, never started twice.
+    - At most `max_in_flight` fetches run at once; prefetches past that are turned away.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, max_in_flight: int):
+        self.summaries = LRUCache(max_entries=max_entries, ttl=ttl)
+        self.max_in_flight = max_in_flight
+        self._inflight = SingleFlight("github")
+        self.started = 0
+        self.joined = 0
+        self.rejected = 0
+
+    @staticmethod
+    def key(github_url: str) -> str:
+        return github_username(github_url).lower()
+
+    def prefetch(self, github_url: str) -> str:
+        """Starts a background fetch if needed; returns "cached", "pending", "started" or "busy"."""
+        key = self.key(github_url)
+        # peek(): a prefetch isn't a cache lookup, keep the hit/miss stats about /analyze
+        if self.summaries.peek(key) is not None:
+            return "cached"
+        if self._inflight.running(key):
+            return "pending"
+        if len(self._inflight) >= self.max_in_flight:
+            self.rejected += 1
+            return "busy"
+        self.started += 1
+        self._inflight.start(key, lambda: self._fetch(github_url, key))
+        return "started"
+
+    async def get(self, github_url: str) -> str:
+        """The summary for `github_url`: a prefetched one, the running fetch's, or a fresh fetch."""
+        key = self.key(github_url)
+        summary = self.summaries.get(key)
+        if summary is not None:
+            return summary
+        if self._inflight.running(key):
+            self.joined += 1
+        return await self._inflight.run(key, lambda: self._fetch(github_url, key))
+
+    async def _fetch(self, github_url: str, key: str) -> str:
+        try:
+            summary = await fetch_github_data(github_url)
+        except Exception as e:
+            # A prefetch may have nobody awaiting it yet
+            logger.warning(f"GitHub fetch for {key} failed: {e}")
+            raise
+        if not summary.startswith(TRANSIENT_SUMMARIES):
+            self.summaries.set(key, summary)
+        return summary
+
+    def stats(self) -> dict:
+        return {**self.summaries.stats(), "started": self.started, "joined": self.joined, "rejected": self.rejected, "in_flight": len(self._inflight)}
+
+
+github_prefetcher = GitHubPrefetcher(
+    max_entries=settings.GITHUB_PREFETCH_MAX_ENTRIES,
+    ttl=settings.GITHUB_PREFETCH_TTL,
+    max_in_flight=settings.GITHUB_PREFETCH_MAX_IN_FLIGHT,
+)
@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, List
+from app.core.config import settings
+from app.core.metrics import LLM_HEDGES, LLM_MODEL_SECONDS, LLM_WINS
+
+logger = logging.getLogger(__name__)
+
+
+def model_ladder() -> List[str]:
+    """Configured models, primary first (settings.LLM_MODELS)."""
+    models = [m.strip() for m in settings.LLM_MODELS.split(",") if m.strip()]
+    return models or ["gemini-2.5-flash"]
+
+
+class HedgeBudget:
+    """
+    Allows a hedge only while hedges stay under `ratio` x primary calls. Both counts are
+    halved every `window` calls, so the budget tracks recent traffic rather than all-time.
+    """
+
+    def __init__(self, ratio: float, window: int = 1000):
+        self.ratio = ratio
+        self.window = window
+        self.calls = 0.0
+        self.hedges = 0.0
+
+    def record_call(self):
+        self.calls += 1
+        if self.calls >= self.window:
+            self.calls /= 2
+            self.hedges /= 2
+
+    def try_acquire(self) -> bool:
+        if self.hedges + 1 > self.ratio * self.calls:
+            return False
+        self.hedges += 1
+        return True
+
+
+async def _timed(model: str, call: Callable[[str], Awaitable[Any]]) -> Any:
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        result = await call(model)
+        outcome = "ok"
+        return result
+    except asyncio.CancelledError:
+        outcome = "cancelled"
+        raise
+    finally:
+        LLM_MODEL_SECONDS.labels(model, outcome).observe(time.perf_counter() - start)
+
+
+async def hedged(call: Callable[[str], Awaitable[Any]], models: List[str], hedge_after: float, budget: HedgeBudget) -> Any:
+    """
+    Runs `call(models[0])`; if it hasn't finished after `hedge_after` seconds and the budget
+    allows, also runs `call(models[1])` (or the primary again with a one-model ladder).
+    The first call to succeed wins and the other is cancelled; if both fail, the primary's
+    error is raised.
+    """
+    primary_model = models[0]
+    hedge_model = models[1] if len(models) > 1 else primary_model
+    budget.record_call()
+
+    primary = asyncio.ensure_future(_timed(primary_model, call))
+    tasks = {primary: ("primary", primary_model)}
+    try:
+        if hedge_after > 0:
+            await asyncio.wait({primary}, timeout=hedge_after)
+        if primary.done() or hedge_after <= 0:
+            result = await primary
+            LLM_WINS.labels(primary_model, "primary").inc()
+            return result
+
+        if not budget.try_acquire():
+            LLM_HEDGES.labels("skipped_budget").inc()
+            result = await primary
+            LLM_WINS.labels(primary_model, "primary").inc()
+            return result
+
+        LLM_HEDGES.labels("fired").inc()
+        logger.info(f"{primary_model} slower than {hedge_after}s, hedging with {hedge_model}")
+        hedge = asyncio.ensure_future(_timed(hedge_model, call))
+        tasks[hedge] = ("hedge", hedge_model)
+
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            # exception() on every finished task, so a losing failure isn't reported as unretrieved
+            succeeded = [task for task in done if task.exception() is None]
+            if succeeded:
+                role, model = tasks[succeeded[0]]
+                LLM_WINS.labels(model, role).inc()
+                return succeeded[0].result()
+        raise primary.exception()
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
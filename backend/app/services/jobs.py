@@ -0,0 +1,332 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Optional
+from fastapi import HTTPException
+from pydantic import ValidationError
+from app.core.config import settings
+from app.core.schemas import AnalyzeRequest
+from app.services.analysis import fetch_github_for_request, generate_for_request
+from app.services.render_pool import render_pool
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,            -- queued | running | done | failed
+    request TEXT NOT NULL,           -- AnalyzeRequest JSON
+    result TEXT,                     -- ResumeSchema JSON
+    pdf BLOB,
+    error TEXT,
+    timings TEXT,                    -- {"github": s, "llm": s, "pdf": s}
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+"""
+
+# Added after the first release; open() adds any that an existing database lacks
+COLUMNS = {
+    "attempts": "INTEGER NOT NULL DEFAULT 0",
+    "run_after": "REAL",                 # queued jobs waiting out a retry backoff
+    "owner": "TEXT",                     # JobQueue instance running the job
+    "heartbeat_at": "REAL",
+}
+
+# Upstream saturation (render pool busy, Gemini gateway full / rate limited): worth retrying
+RETRYABLE_STATUS = {429, 503}
+
+# Longest pause of a worker after repeated database errors (seconds)
+MAX_ERROR_BACKOFF = 30
+
+
+class JobStore:
+    """SQLite persistence for jobs. Methods are blocking; JobQueue calls them via asyncio.to_thread."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        existing = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for name, definition in COLUMNS.items():
+            if name not in existing:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {definition}")
+        self._conn.commit()
+
+    def close(self):
+        if self._conn:
+            self._conn.close()
+            self._conn = None
+
+    def _execute(self, sql: str, params=()) -> sqlite3.Cursor:
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            self._conn.commit()
+            return cursor
+
+    def submit(self, request_json: str) -> str:
+        job_id = uuid.uuid4().hex
+        self._execute(
+            "INSERT INTO jobs (id, status, request, created_at) VALUES (?, 'queued', ?, ?)",
+            (job_id, request_json, time.time()),
+        )
+        return job_id
+
+    def claim(self, owner: str) -> Optional[sqlite3.Row]:
+        """
+        Moves the oldest runnable queued job to running under `owner` and returns it.
+        The UPDATE re-checks the status, so a job another process claimed first is skipped.
+        """
+        with self._lock:
+            while True:
+                now = time.time()
+                row = self._conn.execute(
+                    "SELECT id, request, attempts FROM jobs WHERE status = 'queued' AND (run_after IS NULL OR run_after <= ?)"
+                    " ORDER BY created_at LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is None:
+                    return None
+                claimed = self._conn.execute(
+                    "UPDATE jobs SET status = 'running', owner = ?, started_at = ?, heartbeat_at = ?, attempts = attempts + 1"
+                    " WHERE id = ? AND status = 'queued'",
+                    (owner, now, now, row["id"]),
+                ).rowcount
+                self._conn.commit()
+                if claimed == 1:
+                    return row
+
+    def complete(self, job_id: str, owner: str, result_json: str, pdf_bytes: bytes, timings: dict):
+        self._execute(
+            "UPDATE jobs SET status = 'done', result = ?, pdf = ?, timings = ?, finished_at = ? WHERE id = ? AND owner = ?",
+            (result_json, pdf_bytes, json.dumps(timings), time.time(), job_id, owner),
+        )
+
+    def fail(self, job_id: str, owner: str, error: str, timings: dict):
+        self._execute(
+            "UPDATE jobs SET status = 'failed', error = ?, timings = ?, finished_at = ? WHERE id = ? AND owner = ?",
+            (error, json.dumps(timings), time.time(), job_id, owner),
+        )
+
+    def retry(self, job_id: str, owner: str, error: str, delay: float):
+        """Back to the queue, not claimable for `delay` seconds."""
+        self._execute(
+            "UPDATE jobs SET status = 'queued', error = ?, run_after = ?, owner = NULL, started_at = NULL WHERE id = ? AND owner = ?",
+            (error, time.time() + delay, job_id, owner),
+        )
+
+    def heartbeat(self, owner: str, job_ids) -> int:
+        """
+        Refreshes only the jobs `owner` is actually working on; a job its worker lost track of
+        (e.g. a failed status write) goes stale and is requeued.
+        """
+        job_ids = list(job_ids)
+        if not job_ids:
+            return 0
+        placeholders = ", ".join("?" * len(job_ids))
+        return self._execute(
+            f"UPDATE jobs SET heartbeat_at = ? WHERE status = 'running' AND owner = ? AND id IN ({placeholders})",
+            (time.time(), owner, *job_ids),
+        ).rowcount
+
+    def requeue_stale(self, older_than: float) -> int:
+        """
+        Running jobs whose owner stopped heartbeating (crash/restart) go back to the queue.
+        Jobs of live processes sharing the database keep heartbeating and are left alone.
+        """
+        return self._execute(
+            "UPDATE jobs SET status = 'queued', owner = NULL, started_at = NULL"
+            " WHERE status = 'running' AND (heartbeat_at IS NULL OR heartbeat_at < ?)",
+            (older_than,),
+        ).rowcount
+
+    def purge_finished(self, older_than: float) -> int:
+        return self._execute(
+            "DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished_at < ?", (older_than,)
+        ).rowcount
+
+    def get(self, job_id: str, with_pdf: bool = False) -> Optional[sqlite3.Row]:
+        columns = "*" if with_pdf else "id, status, result, error, timings, created_at, started_at, finished_at"
+        with self._lock:
+            return self._conn.execute(f"SELECT {columns} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+
+class JobQueue:
+    """
+    In-process workers draining the SQLite queue: GitHub fetch -> Gemini -> PDF render.
+    - Queued and interrupted jobs survive restarts; several processes may share the database.
+    - Running jobs are heartbeated; ones whose owner went quiet for `stale_after` are requeued.
+    - 503/429 from a saturated dependency requeues the job with doubling backoff, up to `max_attempts` runs.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        workers: int,
+        poll_interval: float,
+        retention_hours: float,
+        max_attempts: int = 5,
+        retry_backoff: float = 5,
+        heartbeat_interval: float = 10,
+        stale_after: float = 60,
+    ):
+        self.store = store
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.retention_hours = retention_hours
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._tasks = []
+        self._wakeup = None
+        self._running = set()
+
+    async def start(self):
+        await asyncio.to_thread(self.store.open)
+        await self._requeue_stale()
+        if self.retention_hours > 0:
+            await asyncio.to_thread(self.store.purge_finished, time.time() - self.retention_hours * 3600)
+
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._heartbeat()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        # Cancelled jobs stay 'running' and are requeued once their heartbeat goes stale
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await asyncio.to_thread(self.store.close)
+
+    async def submit(self, request: AnalyzeRequest) -> str:
+        job_id = await asyncio.to_thread(self.store.submit, request.model_dump_json())
+        if self._wakeup:
+            self._wakeup.set()
+        return job_id
+
+    async def get(self, job_id: str, with_pdf: bool = False):
+        return await asyncio.to_thread(self.store.get, job_id, with_pdf)
+
+    async def _requeue_stale(self):
+        requeued = await asyncio.to_thread(self.store.requeue_stale, time.time() - self.stale_after)
+        if requeued:
+            logger.info(f"Requeued {requeued} interrupted jobs")
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await asyncio.to_thread(self.store.heartbeat, self.owner, tuple(self._running))
+                await self._requeue_stale()
+            except sqlite3.Error as e:
+                logger.error(f"Job heartbeat failed: {e}")
+
+    async def _worker(self):
+        errors = 0
+        while True:
+            try:
+                await self._next()
+                errors = 0
+            except asyncio.CancelledError:
+                raise
+            except sqlite3.Error as e:
+                # Locked/unavailable database: back off instead of spinning on it
+                errors += 1
+                delay = min(self.poll_interval * 2 ** (errors - 1), MAX_ERROR_BACKOFF)
+                logger.error(f"Job worker database error, pausing {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+            except Exception as e:
+                logger.exception(f"Job worker error: {e}")
+
+    async def _next(self):
+        """Claims and runs one job, or waits up to poll_interval for one to be submitted."""
+        row = await asyncio.to_thread(self.store.claim, self.owner)
+        if row is None:
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            return
+        self._running.add(row["id"])
+        try:
+            await self._run(row["id"], row["request"], row["attempts"] + 1)
+        finally:
+            self._running.discard(row["id"])
+
+    def _retry_delay(self, attempt: int, e: HTTPException) -> float:
+        delay = self.retry_backoff * 2 ** (attempt - 1)
+        try:
+            delay = max(delay, float((e.headers or {}).get("Retry-After", 0)))
+        except ValueError:
+            pass
+        return delay
+
+    async def _run(self, job_id: str, request_json: str, attempt: int = 1):
+        timings = {}
+
+        async def timed(stage, coro):
+            start = time.perf_counter()
+            try:
+                return await coro
+            finally:
+                timings[stage] = round(time.perf_counter() - start, 4)
+
+        try:
+            request = AnalyzeRequest.model_validate_json(request_json)
+        except ValidationError as e:
+            # Stored by an older schema or edited by hand: retrying can't fix it
+            logger.error(f"Job {job_id} has an invalid request: {e}")
+            await asyncio.to_thread(self.store.fail, job_id, self.owner, f"Invalid job request: {e}", timings)
+            return
+
+        try:
+            github_data = await timed("github", fetch_github_for_request(request))
+            resume = await timed("llm", generate_for_request(request, github_data))
+            pdf_bytes = await timed("pdf", render_pool.render(resume))
+            await asyncio.to_thread(self.store.complete, job_id, self.owner, resume.model_dump_json(), pdf_bytes, timings)
+            logger.info(f"Job {job_id} done in {sum(timings.values()):.2f}s {timings}")
+        except asyncio.CancelledError:
+            raise
+        except HTTPException as e:
+            if e.status_code in RETRYABLE_STATUS and attempt < self.max_attempts:
+                delay = self._retry_delay(attempt, e)
+                logger.warning(f"Job {job_id} attempt {attempt} got {e.status_code}, retrying in {delay:.0f}s")
+                await asyncio.to_thread(self.store.retry, job_id, self.owner, str(e.detail), delay)
+            else:
+                await asyncio.to_thread(self.store.fail, job_id, self.owner, str(e.detail), timings)
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}")
+            await asyncio.to_thread(self.store.fail, job_id, self.owner, str(e), timings)
+
+
+job_queue = JobQueue(
+    store=JobStore(settings.JOBS_DB_PATH),
+    workers=settings.JOBS_WORKERS,
+    poll_interval=settings.JOBS_POLL_INTERVAL,
+    retention_hours=settings.JOBS_RETENTION_HOURS,
+    max_attempts=settings.JOBS_MAX_ATTEMPTS,
+    retry_backoff=settings.JOBS_RETRY_BACKOFF,
+    heartbeat_interval=settings.JOBS_HEARTBEAT_INTERVAL,
+    stale_after=settings.JOBS_STALE_AFTER,
+)
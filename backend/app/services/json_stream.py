@@ -0,0 +1,61 @@
+import json
+from typing import Any, List, Tuple
+
+
+class TopLevelMemberParser:
+    """
+    Incrementally scans a streamed JSON object and reports each top-level member
+    as soon as its value is complete, e.g. `"summary": "..."` once the following `,` arrives.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member_start = None
+        self.done = False
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        self.buffer += text
+        members = []
+
+        while self._pos < len(self.buffer) and not self.done:
+            ch = self.buffer[self._pos]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+                if self._depth == 1:
+                    self._member_start = self._pos + 1
+            elif ch in "}]":
+                if self._depth == 1:
+                    members.extend(self._close_member(self._pos))
+                    self.done = True
+                self._depth -= 1
+            elif ch == "," and self._depth == 1:
+                members.extend(self._close_member(self._pos))
+                self._member_start = self._pos + 1
+
+            self._pos += 1
+
+        return members
+
+    def _close_member(self, end: int) -> List[Tuple[str, Any]]:
+        chunk = self.buffer[self._member_start:end].strip()
+        if not chunk:
+            return []
+        try:
+            return list(json.loads("{" + chunk + "}").items())
+        except json.JSONDecodeError:
+            # Malformed member; the final full-document validation will report it
+            return []
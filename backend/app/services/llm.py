@@ -1,16 +1,59 @@
-from google import genai
-from google.genai import types
+from typing import TYPE_CHECKING, Type
 from app.core.config import settings
 from app.core.schemas import ResumeSchema
+from app.core.cache import LRUCache, SingleFlight
+from app.core.metrics import RETRIES, STAGE_SECONDS, time_stage
+from app.services.llm_gateway import llm_gateway, is_rate_limited, retry_hint
+from app.services.hedging import HedgeBudget, hedged, model_ladder
+from app.services.prompt import estimate_tokens, clip, trim_github_summary
+from app.services.json_stream import TopLevelMemberParser
 from fastapi import HTTPException
+import hashlib
+import json
 import logging
-from pydantic import ValidationError
+import time
+from pydantic import BaseModel, ValidationError
+
+if TYPE_CHECKING:
+    from google.genai import types
 
 logger = logging.getLogger(__name__)
 
-# Initialize the new Client
+# google.genai takes ~0.5s to import, so the client is built on first use (or by the
+# background warm-up) instead of at import time, keeping cold starts short.
 # Note: We don't configure the model globally anymore; we pass config per call.
-client = genai.Client(api_key=settings.GEMINI_API_KEY)
+_client = None
+
+def get_client():
+    global _client
+    if _client is None:
+        from google import genai
+        _client = genai.Client(api_key=settings.GEMINI_API_KEY)
+    return _client
+
+def client_ready() -> bool:
+    return _client is not None
+
+def warm_up():
+    """Imports the SDK and builds the client off the request path (run in a thread after startup)."""
+    start = time.perf_counter()
+    # A failed warm-up must not break startup; the first real call will surface the error
+    try:
+        get_client()
+        generation_config()
+    except Exception as e:
+        logger.error(f"Gemini client warm-up failed: {e}")
+        return
+    logger.info(f"Gemini client warmed up in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+# Primary model; the rest of settings.LLM_MODELS are hedge fallbacks (see _generate)
+MODEL_LADDER = model_ladder()
+MODEL_NAME = MODEL_LADDER[0]
+_hedge_budget = HedgeBudget(settings.LLM_HEDGE_BUDGET)
+
+# Validated results keyed by prompt/model/config, and the Gemini calls currently in flight
+llm_cache = LRUCache(max_entries=settings.LLM_CACHE_MAX_ENTRIES, ttl=settings.LLM_CACHE_TTL)
+_inflight = SingleFlight("llm")
 
 SYSTEM_PROMPT = """
 You are an expert Resume Writer. Your Goal: Produce a high-impact, single-page resume.
@@ -30,26 +73,40 @@ CONTENT RULES:
 Output MUST be valid JSON matching the schema.
 """
 
-async def analyze_profiles(github_data: str, manual_experience: list = [], manual_education: list = [], manual_highlights: list = [], is_student: bool = False, linkedin_url: str = None, email: str = None, phone: str = None) -> ResumeSchema:
-    
+# Shortest clip of a manual detail before whole entries are dropped to fit the budget
+MIN_MANUAL_CHARS = 60
+
+def _manual_sections(manual_experience: list, manual_education: list, manual_highlights: list, max_chars: int = None):
+    # max_chars clips free-text details when the manual input alone blows the token budget
+    fit = (lambda text: clip(str(text), max_chars)) if max_chars else (lambda text: text)
+
     manual_exp_str = ""
     if manual_experience:
         manual_exp_str = "MANUAL EXPERIENCE INPUT:\n" + "\n".join(
-            [f"- Company: {m.company}, Role: {m.role}, Duration: {m.duration}, Details: {m.description}" for m in manual_experience]
+            [f"- Company: {m.company}, Role: {m.role}, Duration: {m.duration}, Details: {fit(m.description)}" for m in manual_experience]
         )
 
     manual_edu_str = ""
     if manual_education:
         manual_edu_str = "MANUAL EDUCATION INPUT (Use this heavily, refine wording but keep facts):\n" + "\n".join(
-            [f"- School: {e.institution}, Degree: {e.degree}, Time: {e.duration}, GPA: {e.gpa}, Courses: {e.coursework}, Honors: {e.honors}" for e in manual_education]
+            [f"- School: {e.institution}, Degree: {e.degree}, Time: {e.duration}, GPA: {e.gpa}, Courses: {fit(e.coursework)}, Honors: {fit(e.honors)}" for e in manual_education]
         )
 
     manual_highlights_str = ""
     if manual_highlights:
         manual_highlights_str = "MANUAL HIGHLIGHTS INPUT (Refine clarity, keep to 3-4 bullets):\n" + "\n".join(
-            [f"- {h}" for h in manual_highlights]
+            [f"- {fit(h)}" for h in manual_highlights]
         )
 
+    return manual_exp_str, manual_edu_str, manual_highlights_str
+
+def build_prompt(github_data: str, manual_experience: list = [], manual_education: list = [], manual_highlights: list = [], is_student: bool = False) -> str:
+    """
+    Assembles the user prompt within settings.PROMPT_TOKEN_BUDGET (0 = unlimited).
+    Manual facts take priority; the GitHub summary gets the remaining budget (top repos by stars/recency).
+    """
+    manual_exp_str, manual_edu_str, manual_highlights_str = _manual_sections(manual_experience, manual_education, manual_highlights)
+
     student_focus = ""
     if is_student:
         student_focus = """
@@ -62,9 +119,10 @@ async def analyze_profiles(github_data: str, manual_experience: list = [], manua
     else:
         student_focus = "PROFESSIONAL MODE: Prioritize Work Experience."
 
-    prompt = f"""
+    def assemble(github_block: str) -> str:
+        return f"""
     RAW GITHUB DATA:
-    {github_data}
+    {github_block}
     
     {manual_exp_str}
     {manual_edu_str}
@@ -77,78 +135,293 @@ async def analyze_profiles(github_data: str, manual_experience: list = [], manua
     If manual experience/education/highlights are provided, INTEGRATE them.
     Refine wording for clarity and impact, but DO NOT invent facts or metrics.
     """
+
+    budget = settings.PROMPT_TOKEN_BUDGET
+    if budget <= 0:
+        return assemble(github_data)
+
+    fixed = estimate_tokens(assemble(""))
+    if fixed > budget:
+        logger.warning(f"Manual input alone is ~{fixed} tokens (budget {budget}); clipping long details")
+        # Clip free text ever shorter, then drop whole entries, lowest priority first: highlights,
+        # then education or experience (whichever matters less in this mode), latest entries first
+        max_chars = settings.PROMPT_MAX_MANUAL_CHARS
+        experience, education, highlights = list(manual_experience), list(manual_education), list(manual_highlights)
+        droppable = [highlights, experience, education] if is_student else [highlights, education, experience]
+        while True:
+            manual_exp_str, manual_edu_str, manual_highlights_str = _manual_sections(experience, education, highlights, max_chars=max_chars)
+            fixed = estimate_tokens(assemble(""))
+            if fixed <= budget:
+                break
+            if max_chars > MIN_MANUAL_CHARS:
+                max_chars = max(MIN_MANUAL_CHARS, max_chars // 2)
+            elif any(droppable):
+                next(entries for entries in droppable if entries).pop()
+            else:
+                break
+        dropped = len(manual_experience) + len(manual_education) + len(manual_highlights) - len(experience) - len(education) - len(highlights)
+        if dropped:
+            logger.warning(f"Dropped {dropped} manual entries to fit the prompt budget ({budget} tokens)")
+
+    github_block = trim_github_summary(github_data, budget - fixed)
+    prompt = assemble(github_block)
+    if estimate_tokens(prompt) > budget:
+        # Only the instructions are left; nothing more to cut
+        logger.warning(f"Prompt is ~{estimate_tokens(prompt)} tokens, over the {budget} token budget with all input cut")
+    logger.info(
+        f"Prompt ~{estimate_tokens(prompt)} tokens (budget {budget}); "
+        f"GitHub data ~{estimate_tokens(github_data) if github_data else 0} -> ~{estimate_tokens(github_block) if github_block else 0} tokens"
+    )
+    return prompt
+
+def generation_config(system_instruction: str = SYSTEM_PROMPT, response_schema: Type[BaseModel] = ResumeSchema, temperature: float = 0.1) -> "types.GenerateContentConfig":
+    from google.genai import types
+
+    return types.GenerateContentConfig(
+        system_instruction=system_instruction,
+        temperature=temperature,
+        top_k=40,
+        response_mime_type='application/json',
+        response_schema=response_schema  # Pass Pydantic class directly for strict validation
+    )
+
+def cache_key(prompt: str, model: str, config: "types.GenerateContentConfig") -> str:
+    """Hash of everything that determines the generation: prompt, model, config and output schema."""
+    payload = {
+        "prompt": prompt,
+        "model": model,
+        "config": config.model_dump(mode="json", exclude={"response_schema"}, exclude_none=True),
+        "schema": config.response_schema.model_json_schema(),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+def apply_overrides(resume: ResumeSchema, is_student: bool = False, linkedin_url: str = None, email: str = None, phone: str = None) -> ResumeSchema:
+    # Enforce is_student from input, independent of LLM's interpretation
+    resume.is_student = is_student
     
+    # Enforce linkedin from input, independent of LLM's generation
+    if linkedin_url:
+        resume.personal_info.linkedin = linkedin_url
+
+    # Enforce email and phone if provided
+    if email:
+        resume.personal_info.email = email
+    if phone:
+        resume.personal_info.phone = phone
+    return resume
+
+# Hard single-page limits, shared by enforce_limits and the streaming section events
+MAX_EXPERIENCE = 3
+MAX_BULLETS = 3
+MAX_PROJECTS = 3
+MAX_HIGHLIGHTS = 2
+MAX_SKILLS = 4
+
+def enforce_limits(resume: ResumeSchema) -> ResumeSchema:
+    # --- HARD CONSTRAINT ENFORCEMENT ---
+    # Ensure single page by truncating lists if LLM ignores prompt
+    
+    # Max 3 Experience roles
+    if resume.experience:
+        resume.experience = resume.experience[:MAX_EXPERIENCE]
+        for item in resume.experience:
+            # Max 3 bullets per role
+            if item.bullets:
+                item.bullets = item.bullets[:MAX_BULLETS]
+
+    # Max 3 Projects
+    if resume.projects:
+        resume.projects = resume.projects[:MAX_PROJECTS]
+        # Note: Project description is a single string, so we trust the prompt for length.
+
+    # Max 2 Highlights
+    if resume.highlights:
+        resume.highlights = resume.highlights[:MAX_HIGHLIGHTS]
+
+    # Max 4 Skill Categories (Dense format)
+    if resume.skills:
+        resume.skills = resume.skills[:MAX_SKILLS]
+    return resume
+
+def limit_section(name: str, value, linkedin_url: str = None, email: str = None, phone: str = None):
+    """Same overrides/limits as apply_overrides + enforce_limits, for one raw (JSON) top-level section."""
+    if name == "personal_info" and isinstance(value, dict):
+        overrides = {"linkedin": linkedin_url, "email": email, "phone": phone}
+        value.update({k: v for k, v in overrides.items() if v})
+    elif name == "experience" and isinstance(value, list):
+        value = value[:MAX_EXPERIENCE]
+        for item in value:
+            if isinstance(item, dict) and item.get("bullets"):
+                item["bullets"] = item["bullets"][:MAX_BULLETS]
+    elif name == "projects" and isinstance(value, list):
+        value = value[:MAX_PROJECTS]
+    elif name == "highlights" and isinstance(value, list):
+        value = value[:MAX_HIGHLIGHTS]
+    elif name == "skills" and isinstance(value, list):
+        value = value[:MAX_SKILLS]
+    return value
+
+def _log_usage(usage, estimated_tokens: int):
+    """Per-request prompt/response token counts as reported by Gemini."""
+    if usage is None:
+        return
+    logger.info(
+        f"Gemini tokens: prompt={usage.prompt_token_count} response={usage.candidates_token_count} "
+        f"(estimated prompt+output {estimated_tokens})"
+    )
+
+async def _generate(prompt: str, config: "types.GenerateContentConfig", expected_output_tokens: int = None):
+    """One validated Gemini generation, parsed into config.response_schema (ResumeSchema by default)."""
+    schema = config.response_schema
+    estimated_tokens = estimate_tokens(config.system_instruction + prompt) + (expected_output_tokens or settings.LLM_EXPECTED_OUTPUT_TOKENS)
+
+    async def call(model: str):
+        # New SDK Async Call
+        response = await llm_gateway.call(
+            lambda: get_client().aio.models.generate_content(
+                model=model,
+                contents=prompt,
+                config=config
+            ),
+            estimated_tokens
+        )
+
+        _log_usage(getattr(response, "usage_metadata", None), estimated_tokens)
+
+        # Log raw response for debugging (only if enabled)
+        if settings.DEBUG:
+            logger.info(f"Gemini Response ({model}): {response.text}")
+
+        # Validated here rather than via response.parsed so validation shows up as its own stage,
+        # and so a hedge only wins with a result that validates
+        if not response.text:
+            raise ValueError("Empty response from Gemini")
+        with time_stage("llm_validate"):
+            return schema.model_validate_json(response.text)
+
+    # API errors are retried (with backoff) by the gateway; here we only retry bad structure
     retries = 3
     for attempt in range(retries):
         try:
-            # New SDK Async Call
-            response = await client.aio.models.generate_content(
-                model='gemini-2.5-flash',  # Updated to valid model version
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    system_instruction=SYSTEM_PROMPT,
-                    temperature=0.1,
-                    top_k=40,
-                    response_mime_type='application/json',
-                    response_schema=ResumeSchema  # Pass Pydantic class directly for strict validation
-                )
-            )
-
-            # Log raw response for debugging (only if enabled)
-            if settings.DEBUG:
-                logger.info(f"Gemini Response: {response.text}")
-            
-            # The new SDK automatically validates and parses the JSON into your Pydantic model
-            # Access it via response.parsed
-            if not response.parsed:
-                raise ValueError("Empty response or failed parsing from Gemini")
-            
-            # Enforce is_student from input, independent of LLM's interpretation
-            response.parsed.is_student = is_student
-            
-            # Enforce linkedin from input, independent of LLM's generation
-            if linkedin_url:
-                response.parsed.personal_info.linkedin = linkedin_url
-
-            # Enforce email and phone if provided
-            if email:
-                response.parsed.personal_info.email = email
-            if phone:
-                response.parsed.personal_info.phone = phone
-
-            # --- HARD CONSTRAINT ENFORCEMENT ---
-            # Ensure single page by truncating lists if LLM ignores prompt
-            
-            # Max 3 Experience roles
-            if response.parsed.experience:
-                response.parsed.experience = response.parsed.experience[:3]
-                for item in response.parsed.experience:
-                    # Max 3 bullets per role
-                    if item.bullets:
-                        item.bullets = item.bullets[:3]
-
-            # Max 3 Projects
-            if response.parsed.projects:
-                response.parsed.projects = response.parsed.projects[:3]
-                # Note: Project description is a single string, so we trust the prompt for length.
-
-            # Max 2 Highlights
-            if response.parsed.highlights:
-                response.parsed.highlights = response.parsed.highlights[:2]
-
-            # Max 4 Skill Categories (Dense format)
-            if response.parsed.skills:
-                response.parsed.skills = response.parsed.skills[:4]
-
-            return response.parsed
+            with time_stage("llm_request"):
+                return await hedged(call, MODEL_LADDER, settings.LLM_HEDGE_AFTER, _hedge_budget)
 
+        except HTTPException:
+            raise
         except (ValidationError, ValueError) as e:
             logger.error(f"Validation/Parsing Error (Attempt {attempt+1}): {e}")
+            if attempt < retries - 1:
+                RETRIES.labels("gemini_structure", "invalid").inc()
             if attempt == retries - 1:
                 raise HTTPException(status_code=500, detail=f"LLM structure failed: {str(e)}")
         except Exception as e:
-            logger.error(f"GenAI API Error (Attempt {attempt+1}): {e}")
-            if attempt == retries - 1:
-                raise HTTPException(status_code=500, detail=f"LLM generation failed: {str(e)}")
+            logger.error(f"GenAI API Error: {e}")
+            if is_rate_limited(e):
+                raise HTTPException(
+                    status_code=503,
+                    detail="LLM quota exhausted, please retry shortly",
+                    headers={"Retry-After": str(int(retry_hint(e) or 30))},
+                )
+            raise HTTPException(status_code=500, detail=f"LLM generation failed: {str(e)}")
     
-    raise HTTPException(status_code=500, detail="LLM generation failed after retries")
\ No newline at end of file
+    raise HTTPException(status_code=500, detail="LLM generation failed after retries")
+
+async def generate(prompt: str, config: "types.GenerateContentConfig", expected_output_tokens: int = None):
+    """
+    Uncached Gemini call, for requests where asking again should get a new answer
+    (e.g. /refine's "try again"). Returns a fresh config.response_schema instance.
+    """
+    return await _generate(prompt, config, expected_output_tokens)
+
+async def generate_cached(prompt: str, config: "types.GenerateContentConfig", expected_output_tokens: int = None):
+    """
+    Memoized, single-flight Gemini call. Returns a private copy of the validated
+    config.response_schema instance, so callers may mutate it freely.
+    """
+    key = cache_key(prompt, MODEL_NAME, config)
+
+    result = llm_cache.get(key)
+    if result is None:
+        result = await _inflight.run(key, lambda: _generate(prompt, config, expected_output_tokens))
+        llm_cache.set(key, result)
+    else:
+        logger.info("LLM cache hit")
+
+    return result.model_copy(deep=True)
+
+async def generate_resume(prompt: str) -> ResumeSchema:
+    """Whole-resume generation (before overrides/limits)."""
+    return await generate_cached(prompt, generation_config())
+
+async def analyze_profiles(github_data: str, manual_experience: list = [], manual_education: list = [], manual_highlights: list = [], is_student: bool = False, linkedin_url: str = None, email: str = None, phone: str = None) -> ResumeSchema:
+    prompt = build_prompt(github_data, manual_experience, manual_education, manual_highlights, is_student)
+    resume = await generate_resume(prompt)
+    with time_stage("llm_truncate"):
+        apply_overrides(resume, is_student, linkedin_url, email, phone)
+        return enforce_limits(resume)
+
+async def stream_profiles(github_data: str, manual_experience: list = [], manual_education: list = [], manual_highlights: list = [], is_student: bool = False, linkedin_url: str = None, email: str = None, phone: str = None):
+    """
+    Streaming variant of analyze_profiles. Yields ("section", name, value) as each top-level
+    ResumeSchema field completes, then ("resume", None, ResumeSchema) with overrides and limits applied.
+    """
+    prompt = build_prompt(github_data, manual_experience, manual_education, manual_highlights, is_student)
+    config = generation_config()
+    key = cache_key(prompt, MODEL_NAME, config)
+
+    resume = llm_cache.get(key)
+    if resume is not None:
+        resume = resume.model_copy(deep=True)
+        for name, value in resume.model_dump(mode="json").items():
+            if name != "is_student":
+                yield "section", name, limit_section(name, value, linkedin_url, email, phone)
+    else:
+        parser = TopLevelMemberParser()
+        estimated_tokens = estimate_tokens(SYSTEM_PROMPT + prompt) + settings.LLM_EXPECTED_OUTPUT_TOKENS
+
+        # One attempt only: a retry mid-stream would replay sections the client already has
+        try:
+            async with llm_gateway.slot(estimated_tokens):
+                started = time.perf_counter()
+                stream = await get_client().aio.models.generate_content_stream(
+                    model=MODEL_NAME,
+                    contents=prompt,
+                    config=config
+                )
+                usage = None
+                async for chunk in stream:
+                    usage = getattr(chunk, "usage_metadata", None) or usage
+                    for name, value in parser.feed(chunk.text or ""):
+                        if name != "is_student":
+                            yield "section", name, limit_section(name, value, linkedin_url, email, phone)
+                # Includes time the consumer spent between sections; close enough for a stream
+                STAGE_SECONDS.labels("llm_request").observe(time.perf_counter() - started)
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"GenAI API Error (stream): {e}")
+            if is_rate_limited(e):
+                raise HTTPException(
+                    status_code=503,
+                    detail="LLM quota exhausted, please retry shortly",
+                    headers={"Retry-After": str(int(retry_hint(e) or 30))},
+                )
+            raise HTTPException(status_code=500, detail=f"LLM generation failed: {str(e)}")
+
+        _log_usage(usage, estimated_tokens)
+        if settings.DEBUG:
+            logger.info(f"Gemini Response: {parser.buffer}")
+
+        try:
+            with time_stage("llm_validate"):
+                resume = ResumeSchema.model_validate_json(parser.buffer)
+        except ValidationError as e:
+            logger.error(f"Validation/Parsing Error (stream): {e}")
+            raise HTTPException(status_code=500, detail=f"LLM structure failed: {str(e)}")
+
+        llm_cache.set(key, resume.model_copy(deep=True))
+
+    with time_stage("llm_truncate"):
+        apply_overrides(resume, is_student, linkedin_url, email, phone)
+        resume = enforce_limits(resume)
+    yield "resume", None, resume
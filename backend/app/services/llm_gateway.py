@@ -0,0 +1,199 @@
+import asyncio
+import logging
+import math
+import random
+import re
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Optional
+import httpx
+from fastapi import HTTPException
+from app.core.admission import bounded_timeout, check_deadline, remaining
+from app.core.config import settings
+from app.core.metrics import RETRIES, track_in_flight
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# "retryDelay': '27s'" (google.rpc.RetryInfo) or "Please retry in 27.3s."
+_RETRY_HINT_PATTERNS = [
+    re.compile(r"retryDelay['\"]?\s*[:=]\s*['\"]?(\d+(?:\.\d+)?)s"),
+    re.compile(r"retry in (\d+(?:\.\d+)?)\s*s", re.IGNORECASE),
+]
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    code = getattr(error, "code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, (httpx.TransportError, asyncio.TimeoutError)):
+        return True
+    code = _status_code(error)
+    if code is not None:
+        return code in RETRYABLE_STATUS_CODES
+    return "RESOURCE_EXHAUSTED" in str(error) or "UNAVAILABLE" in str(error)
+
+
+def is_rate_limited(error: Exception) -> bool:
+    return _status_code(error) == 429 or "RESOURCE_EXHAUSTED" in str(error)
+
+
+def retry_reason(error: Exception) -> str:
+    """Low-cardinality label for the retry counter."""
+    if is_rate_limited(error):
+        return "rate_limited"
+    code = _status_code(error)
+    if code is not None:
+        return str(code)
+    if isinstance(error, (httpx.TransportError, asyncio.TimeoutError)):
+        return "transport"
+    return "unavailable"
+
+
+def retry_hint(error: Exception) -> Optional[float]:
+    """Server-suggested delay in seconds, if the error carries one."""
+    text = str(error)
+    for pattern in _RETRY_HINT_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return float(match.group(1))
+    return None
+
+
+class TokenBucket:
+    """Refills `per_minute` units evenly over a minute; capacity is one minute's worth."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        if self.capacity <= 0:
+            return 0.0
+        self._refill()
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.tokens) / self.rate)
+
+    def take(self, amount: float):
+        if self.capacity <= 0:
+            return
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+
+class LLMGateway:
+    """
+    Single choke point for Gemini calls:
+    - at most `max_in_flight` concurrent requests,
+    - requests/min and tokens/min token buckets,
+    - callers that can't get a slot within `acquire_timeout` fail fast with 503 + Retry-After,
+    - retryable errors back off exponentially with full jitter, honouring server retry hints.
+    """
+
+    def __init__(self, max_in_flight: int, requests_per_minute: float, tokens_per_minute: float,
+                 acquire_timeout: float, max_retries: int, backoff_base: float, backoff_max: float):
+        self.max_in_flight = max_in_flight
+        self.acquire_timeout = acquire_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        self._semaphore = None
+        self.in_flight = 0
+
+    def _overloaded(self, retry_after: float) -> HTTPException:
+        return HTTPException(
+            status_code=503,
+            detail="LLM capacity exhausted, please retry shortly",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+    @asynccontextmanager
+    async def slot(self, estimated_tokens: int):
+        # Created lazily so it binds to the running loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+
+        # Don't spend quota on a request whose client has already given up
+        check_deadline("llm")
+        acquire_timeout = bounded_timeout(self.acquire_timeout)
+        deadline = time.monotonic() + acquire_timeout
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=acquire_timeout)
+        except asyncio.TimeoutError:
+            check_deadline("llm")
+            raise self._overloaded(self.acquire_timeout)
+
+        try:
+            while True:
+                wait = max(self._requests.wait_time(1), self._tokens.wait_time(estimated_tokens))
+                if wait <= 0:
+                    break
+                if time.monotonic() + wait > deadline:
+                    check_deadline("llm")
+                    raise self._overloaded(wait)
+                await asyncio.sleep(wait)
+
+            self._requests.take(1)
+            self._tokens.take(estimated_tokens)
+            self.in_flight += 1
+            try:
+                with track_in_flight("gemini"):
+                    yield
+            finally:
+                self.in_flight -= 1
+        finally:
+            self._semaphore.release()
+
+    def backoff(self, attempt: int, error: Exception) -> float:
+        hint = retry_hint(error)
+        if hint is not None:
+            return min(hint, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def call(self, fn: Callable[[], Awaitable[Any]], estimated_tokens: int) -> Any:
+        """
+        Runs `fn` inside a slot, retrying retryable errors up to `max_retries` times
+        (0 = a single attempt). The last error is re-raised as-is.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self.slot(estimated_tokens):
+                    # A call still running when the request deadline passes is abandoned
+                    left = remaining()
+                    return await (fn() if left is None else asyncio.wait_for(fn(), timeout=max(left, 0)))
+            except HTTPException:
+                raise
+            except Exception as e:
+                check_deadline("llm")
+                if not is_retryable(e) or attempt == self.max_retries:
+                    raise
+                delay = self.backoff(attempt, e)
+                RETRIES.labels("gemini", retry_reason(e)).inc()
+                logger.warning(f"GenAI API Error (Attempt {attempt+1}), retrying in {delay:.1f}s: {e}")
+                await asyncio.sleep(bounded_timeout(delay))
+
+    def stats(self) -> dict:
+        return {"in_flight": self.in_flight, "max_in_flight": self.max_in_flight}
+
+
+llm_gateway = LLMGateway(
+    max_in_flight=settings.LLM_MAX_IN_FLIGHT,
+    requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+    tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+    acquire_timeout=settings.LLM_ACQUIRE_TIMEOUT,
+    max_retries=settings.LLM_MAX_RETRIES,
+    backoff_base=settings.LLM_BACKOFF_BASE,
+    backoff_max=settings.LLM_BACKOFF_MAX,
+)
@@ -1,19 +1,137 @@
-from weasyprint import HTML
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+import hashlib
+import io
+import logging
 import os
+import threading
+import time
+from typing import Dict, Optional
+from app.core.config import settings
+from app.core.metrics import time_stage
 from app.core.schemas import ResumeSchema
+from app.services.pdf_fit import FIT_LEVELS, fit_one_page
+
+logger = logging.getLogger(__name__)
 
 TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "templates")
-env = Environment(loader=FileSystemLoader(TEMPLATE_DIR))
-
-def generate_resume_pdf(resume_data: ResumeSchema) -> bytes:
-    template = env.get_template("resume.html")
-    
-    # Render HTML with data
-    html_content = template.render(r=resume_data)
-    
-    # Generate PDF using WeasyPrint
-    # WeasyPrint handles modern CSS (flexbox, etc.) much better than xhtml2pdf
-    pdf_bytes = HTML(string=html_content).write_pdf()
-        
-    return pdf_bytes
+TEMPLATE_FILES = ("resume.html", "resume.css")
+# Resume fields are user/LLM text and the HTML is also served to browsers (/preview): always escape
+env = Environment(loader=FileSystemLoader(TEMPLATE_DIR), autoescape=select_autoescape(["html"]))
+
+# Built once per process and shared by every render (see _render_assets)
+_template = None
+_font_config = None
+_stylesheet = None
+_fit_stylesheets = None
+_template_hash = None
+_inline_css = None
+
+# WeasyPrint output options per preset (?preset= on the PDF routes); unset options keep
+# WeasyPrint's defaults, which already subset fonts and compress streams
+PDF_PRESETS = {
+    # Defaults: cheapest to produce, what every render used before presets existed
+    "fast": {},
+    # Recompress and downsample images (fonts stay subset and unhinted, as by default)
+    "small": {"optimize_images": True, "jpeg_quality": 70, "dpi": 150},
+    # PDF/A-3b with complete, hinted fonts for long-term storage
+    "archival": {"pdf_variant": "pdf/a-3b", "full_fonts": True, "hinting": True},
+}
+
+# Fail at startup rather than on the first render that falls back to the default
+if settings.PDF_DEFAULT_PRESET not in PDF_PRESETS:
+    raise ValueError(f"PDF_DEFAULT_PRESET must be one of {', '.join(PDF_PRESETS)}, got '{settings.PDF_DEFAULT_PRESET}'")
+
+# Pango/fontconfig objects are not thread-safe; renders within one process are serialized
+_render_lock = threading.Lock()
+
+def template_hash() -> str:
+    """
+    Content hash of the resume template + stylesheets and the fitting setup,
+    so cached PDFs are invalidated when any of them change.
+    """
+    global _template_hash
+    if _template_hash is None:
+        digest = hashlib.sha256()
+        for name in TEMPLATE_FILES:
+            with open(os.path.join(TEMPLATE_DIR, name), "rb") as f:
+                digest.update(f.read())
+        if settings.PDF_FIT_ONE_PAGE:
+            digest.update("".join(FIT_LEVELS).encode("utf-8"))
+        _template_hash = digest.hexdigest()
+    return _template_hash
+
+def _render_assets():
+    global _template, _font_config, _stylesheet, _fit_stylesheets
+    if _stylesheet is None:
+        # WeasyPrint loads Pango/Cairo on import (hundreds of ms); deferred to the first render
+        from weasyprint import CSS
+        from weasyprint.text.fonts import FontConfiguration
+
+        _template = env.get_template("resume.html")
+        _font_config = FontConfiguration()
+        _fit_stylesheets = [CSS(string=css, font_config=_font_config) for css in FIT_LEVELS]
+        _stylesheet = CSS(filename=os.path.join(TEMPLATE_DIR, "resume.css"), font_config=_font_config)
+    return _template, _font_config, _stylesheet
+
+def render_html(resume_data: ResumeSchema) -> str:
+    """The resume as standalone HTML (stylesheet inlined) for browser previews; no WeasyPrint involved."""
+    global _inline_css
+    if _inline_css is None:
+        with open(os.path.join(TEMPLATE_DIR, "resume.css"), encoding="utf-8") as f:
+            _inline_css = f.read()
+    return env.get_template("resume.html").render(r=resume_data, inline_css=_inline_css)
+
+def write_resume_pdf(resume_data: ResumeSchema, target, timings: Optional[Dict[str, float]] = None, preset: str = settings.PDF_DEFAULT_PRESET):
+    """
+    Renders the resume as PDF into `target` (a filename or a writable binary file object)
+    with the WeasyPrint options of PDF_PRESETS[preset]. Per-stage durations (pdf_jinja,
+    pdf_parse, pdf_layout, pdf_write) go to `timings` when given, else straight to the stage histogram.
+    """
+    from weasyprint import HTML
+
+    # Image options apply while laying out, the rest while writing; like HTML.write_pdf, pass them to both
+    options = PDF_PRESETS[preset]
+
+    with _render_lock:
+        template, font_config, stylesheet = _render_assets()
+
+        def parse(resume: ResumeSchema):
+            # Render HTML with data; the string is dropped as soon as WeasyPrint has parsed it
+            with time_stage("pdf_jinja", timings):
+                html_content = template.render(r=resume)
+            with time_stage("pdf_parse", timings):
+                return HTML(string=html_content)
+
+        def layout(html, fit_level: int = 0):
+            # Layout and serialization are separate WeasyPrint steps so each can be timed
+            # WeasyPrint handles modern CSS (flexbox, etc.) much better than xhtml2pdf
+            with time_stage("pdf_layout", timings):
+                return html.render(stylesheets=[stylesheet, *_fit_stylesheets[:fit_level]], font_config=font_config, **options)
+
+        if settings.PDF_FIT_ONE_PAGE:
+            document = fit_one_page(resume_data, parse, layout)
+        else:
+            document = layout(parse(resume_data))
+
+        with time_stage("pdf_write", timings):
+            document.write_pdf(target, **options)
+        # The layout tree is by far the largest object of a render; free it before releasing the lock
+        del document
+
+def generate_resume_pdf(resume_data: ResumeSchema, timings: Optional[Dict[str, float]] = None, preset: str = settings.PDF_DEFAULT_PRESET) -> bytes:
+    """Renders the resume to PDF bytes (see write_resume_pdf)."""
+    buffer = io.BytesIO()
+    write_resume_pdf(resume_data, buffer, timings, preset)
+    return buffer.getvalue()
+
+def warm_up():
+    """
+    Parses the template/stylesheet, loads fonts and does one throwaway render
+    so the first real request doesn't pay for it.
+    """
+    from app.mock_data import MOCK_RESUMES
+
+    start = time.perf_counter()
+    # Timings are kept out of the stage histograms; a warm-up isn't a request
+    generate_resume_pdf(ResumeSchema.model_validate(MOCK_RESUMES["strong"]), timings={})
+    logger.info(f"PDF renderer warmed up in {(time.perf_counter() - start) * 1000:.0f}ms (pid {os.getpid()})")
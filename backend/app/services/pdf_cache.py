@@ -0,0 +1,199 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Optional
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.schemas import ResumeSchema
+from app.services.pdf import template_hash
+
+logger = logging.getLogger(__name__)
+
+
+def resume_hash(resume_data: ResumeSchema) -> str:
+    """Canonical hash of a validated resume (stable key order, no whitespace)."""
+    canonical = json.dumps(resume_data.model_dump(mode="json"), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class PDFCache:
+    """
+    Content-addressed cache for rendered PDFs.
+    - Memory tier: bounded LRU of PDF bytes.
+    - Disk tier (optional): one file per key under `directory`, oldest files evicted past `disk_max_bytes`.
+    """
+
+    def __init__(self, memory_items: int, directory: str = "", disk_max_bytes: int = 0):
+        self.memory = LRUCache(max_entries=memory_items)
+        self.directory = directory
+        self.disk_max_bytes = disk_max_bytes
+        self.disk_hits = 0
+        self.misses = 0
+        self._disk_bytes = None
+        # Disk writes run in worker threads; the byte count is shared between them
+        self._disk_lock = threading.Lock()
+
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def key_for(self, resume_data: ResumeSchema, preset: str = settings.PDF_DEFAULT_PRESET) -> str:
+        return self.key_for_hash(resume_hash(resume_data), preset)
+
+    def key_for_hash(self, content_hash: str, preset: str = settings.PDF_DEFAULT_PRESET) -> str:
+        """Cache key from a precomputed resume_hash(), e.g. one kept in the resume store."""
+        return hashlib.sha256(f"{content_hash}:{template_hash()}:{preset}".encode()).hexdigest()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        pdf_bytes = self.memory.get(key)
+        if pdf_bytes is not None:
+            return pdf_bytes
+
+        if self.directory:
+            pdf_bytes = await asyncio.to_thread(self._read_disk, key)
+            if pdf_bytes is not None:
+                self.disk_hits += 1
+                self.memory.set(key, pdf_bytes)
+                return pdf_bytes
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, pdf_bytes: bytes):
+        self.memory.set(key, pdf_bytes)
+        if self.directory:
+            await asyncio.to_thread(self._write_disk, key, pdf_bytes)
+
+    def spool_path(self) -> str:
+        """
+        Empty temp file for a render to write into (see adopt). It lives in the disk tier's
+        directory when there is one, so adopting it is a rename.
+        """
+        fd, path = tempfile.mkstemp(dir=self.directory or None, suffix=".tmp")
+        os.close(fd)
+        return path
+
+    async def adopt(self, key: str, path: str):
+        """
+        Caches the PDF rendered into `path` (from spool_path) and takes the file over; it is
+        gone from `path` afterwards, though already open handles keep reading it. The disk
+        tier moves it in place and the bytes only reach memory on a later hit; without a disk
+        tier the memory tier keeps a copy.
+        """
+        if self.directory:
+            await asyncio.to_thread(self._adopt_disk, key, path)
+        else:
+            self.memory.set(key, await asyncio.to_thread(self._take, path))
+
+
+        return {
+            "memory_entries": len(self.memory),
+            "memory_hits": self.memory.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "disk_bytes": self._disk_bytes or 0,
+        }
+
+    # --- Disk tier (runs in a thread) ---
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            # Bump mtime so eviction approximates LRU
+            os.utime(path)
+            return data
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.error(f"PDF cache read error: {e}")
+            return None
+
+    def _write_disk(self, key: str, pdf_bytes: bytes):
+        tmp_path = None
+        try:
+            # Unique temp name: concurrent writes of the same key never share a file
+            with tempfile.NamedTemporaryFile(dir=self.directory, suffix=".tmp", delete=False) as f:
+                tmp_path = f.name
+                f.write(pdf_bytes)
+            self._install(key, tmp_path)
+            tmp_path = None
+        except OSError as e:
+            logger.error(f"PDF cache write error: {e}")
+        finally:
+            if tmp_path:
+                self._remove(tmp_path)
+
+    def _adopt_disk(self, key: str, tmp_path: str):
+        try:
+            self._install(key, tmp_path)
+        except OSError as e:
+            logger.error(f"PDF cache write error: {e}")
+            self._remove(tmp_path)
+
+    def _install(self, key: str, tmp_path: str):
+        """Moves a finished temp file (same directory) into place as `key`'s entry."""
+        path = self._path(key)
+        size = os.path.getsize(tmp_path)
+        with self._disk_lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(size for _, _, size in self._scan_disk())
+            existed = os.path.exists(path)
+            os.replace(tmp_path, path)
+            if not existed:
+                self._disk_bytes += size
+            if self._disk_bytes > self.disk_max_bytes:
+                self._evict_disk()
+
+    def _take(self, path: str) -> bytes:
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        finally:
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _scan_disk(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".pdf"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, name, st.st_size))
+        return entries
+
+    def _evict_disk(self):
+        entries = sorted(self._scan_disk())
+        total = sum(size for _, _, size in entries)
+        for _, name, size in entries:
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+                total -= size
+            except FileNotFoundError:
+                pass
+        self._disk_bytes = total
+
+
+pdf_cache = PDFCache(
+    memory_items=settings.PDF_CACHE_MEMORY_ITEMS,
+    directory=settings.PDF_CACHE_DIR,
+    disk_max_bytes=settings.PDF_CACHE_DISK_MAX_MB * 1024 * 1024,
+)
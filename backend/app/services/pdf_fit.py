@@ -0,0 +1,167 @@
+"""
+Single-page fitting for the resume PDF, done at render time instead of asking Gemini again.
+
+1. Lay out the resume as-is. One page: done.
+2. Re-lay out the same parsed HTML with progressively tighter stylesheets (spacing, then
+   type size), never below FIT_LEVELS' floor of 9.5pt.
+3. Still overflowing: drop content in priority order (see drop_lowest_priority) at the
+   tightest level, binary-searching for the smallest number of drops that fits.
+"""
+import logging
+from typing import Callable, List
+from app.core.schemas import ResumeSchema
+
+logger = logging.getLogger(__name__)
+
+# Applied cumulatively after resume.css: level N renders with FIT_LEVELS[:N].
+# !important is needed where the template sets spacing inline.
+FIT_LEVELS = (
+    # 1: tighter vertical rhythm
+    """
+    @page { margin: 15mm 18mm; }
+    .header { padding-bottom: 6px; margin-bottom: 10px; }
+    .section { margin-bottom: 8px; }
+    .section-title { margin-bottom: 4px; }
+    .section > div { margin-bottom: 3px !important; }
+    li { margin-bottom: 0; }
+    """,
+    # 2: slightly smaller type
+    """
+    body { font-size: 10.5pt; line-height: 1.25; }
+    h1 { font-size: 16pt; }
+    .section-title { font-size: 11pt; }
+    """,
+    # 3: smallest type we accept, narrow margins
+    """
+    @page { margin: 12mm 14mm; }
+    body { font-size: 9.5pt; line-height: 1.2; }
+    h1 { font-size: 15pt; }
+    .section-title { font-size: 10.5pt; }
+    .contact-info { font-size: 9pt; }
+    """,
+)
+
+# Past this much overflow (in pages) tighter CSS alone won't get us back to one page
+MAX_COMPACTION_OVERFLOW = 0.25
+
+
+# Empty elements at the start and end of resume.html; their positions (Page.anchors,
+# WeasyPrint's public API for element ids) tell how much of the last page is used
+FIT_START_ANCHOR = "fit-start"
+FIT_END_ANCHOR = "fit-end"
+
+
+def overflow(document) -> float:
+    """
+    How far past one page the layout runs, in pages (0 when it fits).
+    Measured from the end anchor on the last page; falls back to whole pages.
+    """
+    pages = len(document.pages)
+    if pages <= 1:
+        return 0.0
+    start = document.pages[0].anchors.get(FIT_START_ANCHOR)
+    end = document.pages[-1].anchors.get(FIT_END_ANCHOR)
+    # Anchors are (x, y) or, in newer WeasyPrint, (x1, y1, x2, y2) from the page's top left
+    top = start[1] if start else 0
+    # Vertical page margins are symmetric, so the content area is the page less twice the top one
+    content_height = document.pages[-1].height - 2 * top
+    if end is None or content_height <= 0:
+        return float(pages - 1)
+    used = end[1] - top
+    return pages - 2 + min(1.0, max(0.0, used / content_height))
+
+
+def drop_lowest_priority(resume: ResumeSchema) -> bool:
+    """
+    Removes the single lowest-priority item in place; False when nothing is left to drop.
+    Order: extra highlights, bullets beyond two per role (oldest roles first), projects
+    beyond two, bullets beyond one, projects beyond one, remaining highlights, older roles.
+    """
+    def trim_bullets(keep: int) -> bool:
+        longest = max((len(job.bullets) for job in resume.experience), default=0)
+        if longest <= keep:
+            return False
+        # Latest role in the list (usually the oldest) with the most bullets loses its last one
+        job = [job for job in resume.experience if len(job.bullets) == longest][-1]
+        job.bullets.pop()
+        return True
+
+    if resume.highlights and len(resume.highlights) > 1:
+        resume.highlights.pop()
+        return True
+    if trim_bullets(2):
+        return True
+    if len(resume.projects) > 2:
+        resume.projects.pop()
+        return True
+    if trim_bullets(1):
+        return True
+    if len(resume.projects) > 1:
+        resume.projects.pop()
+        return True
+    if resume.highlights:
+        resume.highlights.pop()
+        return True
+    if len(resume.experience) > 1:
+        resume.experience.pop()
+        return True
+    return False
+
+
+def reductions(resume: ResumeSchema) -> List[ResumeSchema]:
+    """Successively smaller copies of `resume`, one drop_lowest_priority() apart."""
+    steps = []
+    current = resume.model_copy(deep=True)
+    while drop_lowest_priority(current):
+        steps.append(current.model_copy(deep=True))
+    return steps
+
+
+def fit_one_page(resume: ResumeSchema, parse: Callable[[ResumeSchema], object], layout: Callable[[object, int], object]):
+    """
+    Returns the first layout that fits on one page (or the smallest possible one).
+    `parse(resume)` builds a WeasyPrint HTML object; `layout(html, level)` renders it with
+    FIT_LEVELS[:level]. A parsed HTML object is reused across compaction levels.
+    """
+    html = parse(resume)
+    document = layout(html, 0)
+    if len(document.pages) == 1:
+        return document
+
+    over = overflow(document)
+    tightest = len(FIT_LEVELS)
+    levels = range(1, tightest + 1) if over <= MAX_COMPACTION_OVERFLOW else [tightest]
+    for level in levels:
+        # Drop the previous attempt first so two layout trees are never alive at once
+        document = None
+        document = layout(html, level)
+        if len(document.pages) == 1:
+            logger.info(f"Fitted resume to one page with compaction level {level} (overflow {over:.2f} pages)")
+            return document
+
+    # Page count only falls as content is dropped, so binary-search the shortest reduction that fits
+    steps = reductions(resume)
+    if not steps:
+        logger.warning(f"Resume overflows one page ({over:.2f} pages) with nothing left to drop")
+        return document
+    html = document = None
+
+    # Only the best fitting layout is kept alive; layout trees are large
+    best = layout(parse(steps[-1]), tightest)
+    if len(best.pages) > 1:
+        logger.warning(f"Resume still overflows one page after dropping {len(steps)} items")
+        return best
+
+    lo, hi = 0, len(steps) - 1
+    layouts = 1
+    while lo < hi:
+        mid = (lo + hi) // 2
+        document = layout(parse(steps[mid]), tightest)
+        layouts += 1
+        if len(document.pages) == 1:
+            best, hi = document, mid
+        else:
+            lo = mid + 1
+        document = None
+    logger.info(f"Fitted resume to one page by dropping {lo + 1} low-priority items ({layouts} extra layouts)")
+    return best
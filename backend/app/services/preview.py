@@ -0,0 +1,71 @@
+import asyncio
+import hashlib
+import io
+import logging
+from typing import Callable
+from app.core.cache import LRUCache, SingleFlight
+from app.core.config import settings
+from app.core.schemas import ResumeSchema
+from app.services.pdf import render_html
+from app.services.pdf_cache import pdf_cache
+from app.services.render_pool import render_pool
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_FORMATS = {"html": "text/html; charset=utf-8", "png": "image/png"}
+
+# Rendered previews by preview_key(); identical concurrent requests (debounced edits
+# arriving from several tabs, retries) share one render
+preview_cache = LRUCache(max_entries=settings.PREVIEW_CACHE_ITEMS)
+_inflight = SingleFlight("preview")
+
+
+def png_available() -> bool:
+    try:
+        import pypdfium2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def preview_key(pdf_key: str, fmt: str, width: int) -> str:
+    """Derived from the PDF cache key, so it already covers resume content and template."""
+    size = width if fmt == "png" else 0
+    return hashlib.sha256(f"{pdf_key}:{fmt}:{size}".encode()).hexdigest()
+
+
+def pdf_page_png(pdf_bytes: bytes, width: int) -> bytes:
+    """Rasterizes page one of the PDF to a PNG `width` pixels wide."""
+    import pypdfium2 as pdfium
+
+    document = pdfium.PdfDocument(pdf_bytes)
+    try:
+        page = document[0]
+        bitmap = page.render(scale=width / page.get_width())
+        buffer = io.BytesIO()
+        bitmap.to_pil().save(buffer, format="PNG")
+        return buffer.getvalue()
+    finally:
+        document.close()
+
+
+async def _render(pdf_key: str, load_resume: Callable[[], ResumeSchema], fmt: str, width: int) -> bytes:
+    if fmt == "html":
+        # Jinja only: well under a millisecond, fine on the event loop
+        return render_html(load_resume()).encode("utf-8")
+
+    # The PNG is page one of the real PDF (fitting included), via the shared PDF cache
+    pdf_bytes = await pdf_cache.get(pdf_key)
+    if pdf_bytes is None:
+        pdf_bytes = await render_pool.render(load_resume())
+        await pdf_cache.set(pdf_key, pdf_bytes)
+    return await asyncio.to_thread(pdf_page_png, pdf_bytes, width)
+
+
+async def render_preview(pdf_key: str, load_resume: Callable[[], ResumeSchema], fmt: str, width: int) -> bytes:
+    key = preview_key(pdf_key, fmt, width)
+    content = preview_cache.get(key)
+    if content is None:
+        content = await _inflight.run(key, lambda: _render(pdf_key, load_resume, fmt, width))
+        preview_cache.set(key, content)
+    return content
@@ -0,0 +1,202 @@
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Dict, Optional, Tuple
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# (function, file, first line) from outermost to innermost frame
+Frame = Tuple[str, str, int]
+Stack = Tuple[Frame, ...]
+
+PROFILE_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+def should_profile(header: Optional[str]) -> bool:
+    """True when profiling is enabled and the request asked for it (X-Profile) or was sampled."""
+    if not settings.PROFILING_ENABLED:
+        return False
+    if header and header.lower() in ("1", "true", "yes"):
+        return True
+    return random.random() < settings.PROFILING_SAMPLE_RATE
+
+
+def _section(frame) -> Optional[str]:
+    """data-section of the box a WeasyPrint layout frame is working on, if any."""
+    if "weasyprint" not in frame.f_code.co_filename:
+        return None
+    # Only the layout/draw functions that take a `box` argument are inspected
+    if "box" not in frame.f_code.co_varnames[:frame.f_code.co_argcount]:
+        return None
+    element = getattr(frame.f_locals.get("box"), "element", None)
+    getter = getattr(element, "get", None)
+    return getter("data-section") if getter else None
+
+
+def _stack(frame) -> Stack:
+    frames = []
+    while frame is not None:
+        code = frame.f_code
+        frames.append(((code.co_name, code.co_filename, code.co_firstlineno), frame))
+        frame = frame.f_back
+    frames.reverse()
+
+    # The outermost box carrying data-section (see templates/resume.html) names the section;
+    # a pseudo-frame is inserted right below it so flame graphs split layout cost per section
+    stack = []
+    section_found = False
+    for key, f in frames:
+        stack.append(key)
+        if not section_found:
+            section = _section(f)
+            if section:
+                stack.append((f"[section: {section}]", "", 0))
+                section_found = True
+    return tuple(stack)
+
+
+class SamplingProfiler:
+    """
+    Wall-clock sampler for one thread: every `interval` seconds a background thread records
+    the target thread's stack. Time spent waiting (sockets, locks) shows up as well.
+    Samples are weighted by the time since the previous one (seconds): the sampler needs the
+    GIL, so under a busy target it ticks at the interpreter switch interval, not `interval`.
+    """
+
+    def __init__(self, interval: float, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.samples: Counter = Counter()
+        self.started = None
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            if frame is not None:
+                self.samples[_stack(frame)] += now - last
+            last = now
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self.started
+        return self.samples
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def to_speedscope(name: str, samples: Dict[Stack, float]) -> dict:
+    """Sampled profile in speedscope's file format (https://www.speedscope.app), weights in seconds."""
+    frame_index: Dict[Frame, int] = {}
+    frames, stacks, weights = [], [], []
+    for stack, seconds in samples.items():
+        indexes = []
+        for frame in stack:
+            if frame not in frame_index:
+                frame_index[frame] = len(frames)
+                fn, file, line = frame
+                frames.append({"name": fn, "file": file, "line": line} if file else {"name": fn})
+            indexes.append(frame_index[frame])
+        stacks.append(indexes)
+        weights.append(seconds)
+
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": name,
+            "unit": "seconds",
+            "startValue": 0,
+            "endValue": sum(weights),
+            "samples": stacks,
+            "weights": weights,
+        }],
+        "name": name,
+        "exporter": "resumegenius",
+    }
+
+
+def to_collapsed(samples: Dict[Stack, float]) -> str:
+    """Brendan Gregg's collapsed-stack format ("a;b;c weight") for flamegraph.pl, weights in microseconds."""
+    lines = []
+    for stack, seconds in samples.items():
+        names = [f"{fn} ({os.path.basename(file)}:{line})" if file else fn for fn, file, line in stack]
+        lines.append(f"{';'.join(names)} {round(seconds * 1e6)}")
+    return "\n".join(lines) + "\n"
+
+
+class ProfileStore:
+    """Keeps the newest `max_files` profiles as <id>.speedscope.json + <id>.folded under `directory`."""
+
+    def __init__(self, directory: str, max_files: int):
+        self.directory = directory
+        self.max_files = max_files
+        self._lock = threading.Lock()
+
+    def path(self, profile_id: str, fmt: str = "speedscope") -> Optional[str]:
+        if not PROFILE_ID.match(profile_id):
+            return None
+        suffix = ".speedscope.json" if fmt == "speedscope" else ".folded"
+        path = os.path.join(self.directory, profile_id + suffix)
+        return path if os.path.exists(path) else None
+
+    def save(self, name: str, samples: Dict[Stack, float]) -> str:
+        profile_id = uuid.uuid4().hex
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            self._write(profile_id + ".speedscope.json", json.dumps(to_speedscope(name, samples)))
+            self._write(profile_id + ".folded", to_collapsed(samples))
+            self._prune()
+        logger.info(f"Saved profile {profile_id} ({name}, {len(samples)} stacks, {sum(samples.values()) * 1000:.0f}ms sampled)")
+        return profile_id
+
+    def _write(self, filename: str, content: str):
+        path = os.path.join(self.directory, filename)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(content)
+        os.replace(tmp, path)
+
+    def _prune(self):
+        entries = [e for e in os.scandir(self.directory) if e.name.endswith(".speedscope.json")]
+        if len(entries) <= self.max_files:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[:len(entries) - self.max_files]:
+            profile_id = entry.name[:-len(".speedscope.json")]
+            for suffix in (".speedscope.json", ".folded"):
+                try:
+                    os.remove(os.path.join(self.directory, profile_id + suffix))
+                except FileNotFoundError:
+                    pass
+
+
+profile_store = ProfileStore(settings.PROFILE_DIR, settings.PROFILE_MAX_FILES)
+
+
+def profiling_interval() -> float:
+    return max(settings.PROFILING_INTERVAL_MS, 0.1) / 1000
@@ -0,0 +1,82 @@
+import logging
+import re
+from difflib import SequenceMatcher
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+# "- name (Language): 12 stars. Updated: 2024-05-01. Description [Link: https://...]" (see github._format_summary)
+REPO_LINE = re.compile(
+    r"^- (?P<name>.+?) \((?P<language>[^)]*)\): (?P<stars>\d+) stars\. "
+    r"Updated: (?P<updated>[^.]*)\. (?P<desc>.*) \[Link: (?P<url>[^\]]*)\]$"
+)
+
+MAX_REPO_DESC_CHARS = 200
+NEAR_DUPLICATE_RATIO = 0.9
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token); good enough for budgeting."""
+    return max(1, len(text) // 4)
+
+
+def clip(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    return text[:max(0, max_chars - 3)].rstrip() + "..."
+
+
+def _normalize(desc: str) -> str:
+    return re.sub(r"\W+", " ", desc.lower()).strip()
+
+
+def _is_near_duplicate(desc: str, kept: List[str]) -> bool:
+    norm = _normalize(desc)
+    return any(norm == k or SequenceMatcher(None, norm, k).ratio() >= NEAR_DUPLICATE_RATIO for k in kept)
+
+
+def trim_github_summary(github_data: str, budget: int) -> str:
+    """
+    Fits the GitHub summary into `budget` tokens: profile lines first, then repos by stars and
+    recency, skipping repos whose description nearly duplicates one already kept.
+    Text that isn't in the github service format is simply clipped.
+    """
+    if not github_data or budget <= 0:
+        return ""
+
+    header, repos = [], []
+    for line in github_data.split("\n"):
+        match = REPO_LINE.match(line)
+        if match:
+            repos.append(match)
+        else:
+            header.append(line)
+
+    if not repos:
+        return clip(github_data, budget * 4)
+
+    repos.sort(key=lambda m: (int(m["stars"]), m["updated"]), reverse=True)
+
+    lines = list(header)
+    used = estimate_tokens("\n".join(lines))
+    if used > budget:
+        return clip("\n".join(lines), budget * 4)
+
+    kept_descs = []
+    for match in repos:
+        desc = match["desc"]
+        if desc and desc not in ("None", "No description"):
+            if _is_near_duplicate(desc, kept_descs):
+                continue
+            kept_descs.append(_normalize(desc))
+        line = (
+            f"- {match['name']} ({match['language']}): {match['stars']} stars. "
+            f"Updated: {match['updated']}. {clip(desc, MAX_REPO_DESC_CHARS)} [Link: {match['url']}]"
+        )
+        cost = estimate_tokens(line)
+        if used + cost > budget:
+            break
+        lines.append(line)
+        used += cost
+
+    return "\n".join(lines)
@@ -0,0 +1,117 @@
+import json
+import logging
+import re
+from functools import lru_cache
+from typing import List, Optional, Tuple, Type
+from fastapi import HTTPException
+from pydantic import BaseModel, create_model
+from app.core.config import settings
+from app.core.metrics import time_stage
+from app.core.schemas import EducationItem, ExperienceItem, ProjectItem, ResumeSchema
+from app.services.llm import generate, generation_config, limit_section
+from app.services.prompt import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Refinable sections and the type of one item in them; personal_info is user-supplied fact
+SECTION_ITEM_TYPES = {
+    "summary": None,
+    "highlights": str,
+    "skills": str,
+    "experience": ExperienceItem,
+    "projects": ProjectItem,
+    "education": EducationItem,
+}
+
+PATH_PATTERN = re.compile(r"^(?P<section>[a-z_]+)(?:\[(?P<index>\d+)\])?$")
+
+# A section or item is a small fraction of a whole resume's output
+REFINE_EXPECTED_OUTPUT_TOKENS = 300
+
+REFINE_SYSTEM_PROMPT = """
+You are an expert Resume Writer editing ONE part of an existing single-page resume.
+Rewrite only the TARGET value and return it as {"value": ...} matching the schema.
+
+RULES:
+1. **Active Voice:** Strong action verbs. No fluff or generic adjectives.
+2. **Truth:** Keep every fact (companies, dates, technologies, numbers). Do NOT invent metrics.
+3. **Length:** Same or shorter than the current value. Summary MAX 50 words; MAX 3 bullets per role.
+4. Follow the user's instructions when given.
+"""
+
+
+def parse_path(path: str) -> Tuple[str, Optional[int]]:
+    """'summary' -> ('summary', None); 'experience[1]' -> ('experience', 1)."""
+    match = PATH_PATTERN.match(path.strip())
+    if not match or match["section"] not in SECTION_ITEM_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported path '{path}'. Use one of {', '.join(SECTION_ITEM_TYPES)}, optionally with [index]")
+    section, index = match["section"], match["index"]
+    if index is not None and SECTION_ITEM_TYPES[section] is None:
+        raise HTTPException(status_code=400, detail=f"'{section}' is not a list")
+    return section, None if index is None else int(index)
+
+
+@lru_cache(maxsize=None)
+def output_schema(section: str, item: bool) -> Type[BaseModel]:
+    """{"value": <sub-schema>} wrapper, e.g. ExperienceItem for experience[i], List[str] for skills."""
+    item_type = SECTION_ITEM_TYPES[section]
+    if item_type is None:
+        value_type = str
+    else:
+        value_type = item_type if item else List[item_type]
+    suffix = "Item" if item else ""
+    return create_model(f"Refined{section.title()}{suffix}", value=(value_type, ...))
+
+
+def _context(resume: ResumeSchema, section: str) -> str:
+    """Just enough of the rest of the resume to keep the rewrite consistent."""
+    lines = [f"Candidate: {resume.personal_info.full_name}" + (" (student)" if resume.is_student else "")]
+    if section != "experience" and resume.experience:
+        lines.append("Roles: " + "; ".join(f"{job.role} at {job.company}" for job in resume.experience))
+    if section != "skills" and resume.skills:
+        lines.append("Skills: " + "; ".join(resume.skills))
+    return "\n".join(lines)
+
+
+def build_refine_prompt(resume: ResumeSchema, path: str, section: str, current, instructions: Optional[str] = None) -> str:
+    return f"""
+    CONTEXT:
+    {_context(resume, section)}
+
+    TARGET ({path}):
+    {json.dumps(current, ensure_ascii=False)}
+
+    INSTRUCTIONS:
+    {instructions or "Improve clarity and impact."}
+    """
+
+
+async def refine_resume(resume: ResumeSchema, path: str, instructions: Optional[str] = None, temperature: Optional[float] = None) -> ResumeSchema:
+    """
+    Regenerates one section (or one item of a list section) and merges it back.
+    Only that section's hard limits are re-applied; the rest of the resume is untouched.
+    Sampled at `temperature` (REFINE_TEMPERATURE by default) so each refine gives a new variant.
+    """
+    section, index = parse_path(path)
+    data = resume.model_dump(mode="json")
+    if index is not None and index >= len(data[section] or []):
+        raise HTTPException(status_code=400, detail=f"{path} is out of range ({len(data[section] or [])} items)")
+    current = data[section] if index is None else data[section][index]
+
+    schema = output_schema(section, index is not None)
+    prompt = build_refine_prompt(resume, path, section, current, instructions)
+    if temperature is None:
+        temperature = settings.REFINE_TEMPERATURE
+    config = generation_config(system_instruction=REFINE_SYSTEM_PROMPT, response_schema=schema, temperature=temperature)
+    logger.info(f"Refining {path}: prompt ~{estimate_tokens(REFINE_SYSTEM_PROMPT + prompt)} tokens")
+    # Not memoized: refining the same part again is a request for a different rewrite
+    result = await generate(prompt, config, REFINE_EXPECTED_OUTPUT_TOKENS)
+
+    with time_stage("llm_truncate"):
+        value = result.model_dump(mode="json")["value"]
+        if index is None:
+            data[section] = value
+        else:
+            data[section][index] = value
+        data[section] = limit_section(section, data[section])
+        return ResumeSchema.model_validate(data)
@@ -0,0 +1,319 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Optional
+from concurrent.futures.process import BrokenProcessPool
+from fastapi import HTTPException
+from app.core.admission import bounded_timeout, check_deadline
+from app.core.config import settings
+from app.core.metrics import PDF_RENDER_MEMORY_BYTES, PDF_SIZE_BYTES, observe_stages, time_stage, track_in_flight
+from app.core.schemas import ResumeSchema
+from app.services.pdf import generate_resume_pdf, warm_up, write_resume_pdf
+from app.services.profiling import SamplingProfiler, profiling_interval
+
+logger = logging.getLogger(__name__)
+
+# Exit status of a worker stopped by its render watchdog (EX_SOFTWARE)
+WATCHDOG_EXIT_CODE = 70
+# How often a worker checks its render's RSS and running time
+WATCHDOG_POLL_INTERVAL = 0.02
+
+# Outcome of this process's warm-up (set by the pool initializer, read by _worker_ready)
+_warmed_up = False
+
+
+def _warm_up_worker() -> bool:
+    # A failed warm-up must not break the pool; it's reported through is_warm() (/ready)
+    # and the first real render will surface the error
+    global _warmed_up
+    try:
+        warm_up()
+        _warmed_up = True
+    except Exception as e:
+        logger.error(f"PDF renderer warm-up failed: {e}")
+        _warmed_up = False
+    return _warmed_up
+
+
+def _worker_ready() -> bool:
+    """Submitted once per worker at start: spawns it, and reports whether its warm-up worked."""
+    return _warmed_up
+
+
+def _status_bytes(field: str) -> Optional[int]:
+    """A kB field of /proc/self/status (VmRSS, VmHWM, VmData) in bytes; None off Linux."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(f"{field}:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _kill_marker() -> str:
+    """Per-render path a worker writes the reason ("memory", "timeout") to right before its watchdog stops it."""
+    return os.path.join(tempfile.gettempdir(), f"resumegenius-kill-{uuid.uuid4().hex}")
+
+
+def _pop_kill_marker(path: str) -> Optional[str]:
+    """The reason left in a kill marker, removing it; None if the render wasn't stopped."""
+    try:
+        with open(path) as f:
+            reason = f.read()
+        os.remove(path)
+        return reason
+    except OSError:
+        return None
+
+
+@contextmanager
+def _render_budget(limit_mb: int, time_limit: float = 0, kill_marker: Optional[str] = None):
+    """
+    Measures and caps the memory and running time of one render in a worker process.
+    The dict it yields gets "peak": growth of the RSS high-water mark over the block.
+
+    The caps are a watchdog thread: past `limit_mb` of RSS growth or `time_limit` seconds it
+    writes the reason to `kill_marker` and exits the worker on the spot. Layout memory is
+    mostly allocated by Pango/Cairo/GLib, where a failed allocation aborts the process rather
+    than raising MemoryError, and a layout can't be interrupted from Python either; the
+    marker is how the pool tells either stop apart from a crash.
+    No-op outside worker processes, where the RSS belongs to the whole server.
+    """
+    usage = {}
+    if multiprocessing.parent_process() is None:
+        yield usage
+        return
+
+    start = _status_bytes("VmRSS")
+    try:
+        # Resets VmHWM to the current RSS (Linux >= 4.0)
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        start = None
+
+    done = threading.Event()
+    started_at = time.monotonic()
+
+    def stop(reason: str, message: str):
+        logger.error(f"{message}, stopping worker (pid {os.getpid()})")
+        if kill_marker:
+            with open(kill_marker, "w") as f:
+                f.write(reason)
+        os._exit(WATCHDOG_EXIT_CODE)
+
+    def watch():
+        while not done.wait(WATCHDOG_POLL_INTERVAL):
+            rss = _status_bytes("VmRSS") if limit_mb and start is not None else None
+            if rss is not None and rss - start > limit_mb * 1024 * 1024:
+                stop("memory", f"PDF render went over {limit_mb}MB")
+            if time_limit and time.monotonic() - started_at > time_limit:
+                stop("timeout", f"PDF render still running after {time_limit}s")
+
+    if (limit_mb and start is not None) or time_limit:
+        threading.Thread(target=watch, name="render-watchdog", daemon=True).start()
+    try:
+        yield usage
+    finally:
+        done.set()
+        peak = _status_bytes("VmHWM")
+        if start is not None and peak is not None:
+            usage["peak"] = max(0, peak - start)
+
+
+def _render_job(resume_data: ResumeSchema, profile: bool = False, preset: str = settings.PDF_DEFAULT_PRESET, kill_marker: Optional[str] = None, target: Optional[str] = None, time_limit: float = 0):
+    # Stage timings, peak memory (and samples, when profiling) travel back with the PDF;
+    # worker processes don't export metrics or write profiles themselves.
+    # With a `target` path the PDF goes straight to that file and only None comes back.
+    timings = {}
+    samples = None
+
+    def render():
+        if target:
+            return write_resume_pdf(resume_data, target, timings, preset)
+        return generate_resume_pdf(resume_data, timings, preset)
+
+    with _render_budget(settings.PDF_RENDER_MAX_MB, time_limit, kill_marker) as memory:
+        if not profile:
+            pdf_bytes = render()
+        else:
+            with SamplingProfiler(profiling_interval()) as profiler:
+                pdf_bytes = render()
+            samples = dict(profiler.samples)
+    return pdf_bytes, timings, samples, memory.get("peak")
+
+
+class RenderPool:
+    """
+    Runs WeasyPrint renders in worker processes so a layout never blocks the event loop.
+    - `workers` processes render in parallel, `queue_size` more jobs may wait for a slot.
+      A slot is held until its render has actually finished, even if the caller gave up on it;
+      a render still running after `job_timeout` has its worker stopped (504).
+    - The executor is replaced after `max_jobs_per_worker` renders per worker to cap WeasyPrint
+      memory growth (max_tasks_per_child can deadlock spawn pools on Python 3.11).
+    - One render may allocate at most PDF_RENDER_MAX_MB in its worker; past that it fails with 413.
+    """
+
+    def __init__(self, workers: int, queue_size: int, job_timeout: float, max_jobs_per_worker: int):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.job_timeout = job_timeout
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self._executor = None
+        self._executor_jobs = 0
+        self._retiring = set()
+        self._slots = None
+        self._warm_ups = []
+
+    def start(self):
+        # Slots bound running + queued jobs; anything beyond that is rejected immediately
+        self._slots = asyncio.Semaphore(max(self.workers, 1) + self.queue_size)
+        if self.workers > 0:
+            self._executor = self._new_executor()
+            # Workers spawn on demand; a no-op per worker brings them all up (and warms them) now
+            self._warm_ups = [self._executor.submit(_worker_ready) for _ in range(self.workers)]
+            logger.info(f"PDF render pool started with {self.workers} workers")
+        else:
+            self._warm_ups = [asyncio.create_task(asyncio.to_thread(_warm_up_worker))]
+
+    def is_warm(self) -> bool:
+        """True once every worker has imported WeasyPrint and its throwaway render succeeded."""
+        return bool(self._warm_ups) and all(
+            f.done() and not f.cancelled() and f.exception() is None and f.result()
+            for f in self._warm_ups
+        )
+
+    async def stop(self):
+        executor, self._executor = self._executor, None
+        if executor:
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+        if self._retiring:
+            await asyncio.gather(*self._retiring, return_exceptions=True)
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # Spawned, not forked: workers must not inherit the server's event loop and sockets
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_up_worker,
+        )
+
+    def _replace_executor(self, old: ProcessPoolExecutor):
+        """
+        Swaps in a fresh executor unless `old` was already replaced (concurrent failures
+        swap once). The old one finishes its running renders and shuts down in the background.
+        """
+        if self._executor is not old:
+            return
+        self._executor = self._new_executor()
+        self._executor_jobs = 0
+        shutdown = asyncio.ensure_future(asyncio.to_thread(old.shutdown, wait=True))
+        self._retiring.add(shutdown)
+        shutdown.add_done_callback(self._retiring.discard)
+
+    def _job_done(self, job: asyncio.Future):
+        self._slots.release()
+        # Mark the outcome as retrieved even when the caller stopped waiting (timeout, disconnect)
+        if not job.cancelled():
+            job.exception()
+
+    def _abandoned_job_done(self, job: asyncio.Future, executor: Optional[ProcessPoolExecutor], kill_marker: str):
+        """Cleans up after a render its caller stopped waiting for, e.g. one its watchdog stopped."""
+        _pop_kill_marker(kill_marker)
+        if executor and not job.cancelled() and isinstance(job.exception(), BrokenProcessPool):
+            self._replace_executor(executor)
+
+    def _submit(self, resume_data: ResumeSchema, profile: bool, preset: str, kill_marker: str, target: Optional[str]):
+        loop = asyncio.get_running_loop()
+        if not self._executor:
+            return None, asyncio.ensure_future(asyncio.to_thread(_render_job, resume_data, profile, preset, None, target))
+
+        if self.max_jobs_per_worker and self._executor_jobs >= self.max_jobs_per_worker * self.workers:
+            logger.info(f"Recycling PDF render workers after {self._executor_jobs} renders")
+            self._replace_executor(self._executor)
+        self._executor_jobs += 1
+        executor = self._executor
+        return executor, loop.run_in_executor(executor, _render_job, resume_data, profile, preset, kill_marker, target, self.job_timeout)
+
+    async def render(self, resume_data: ResumeSchema, profile: Optional[dict] = None, preset: str = settings.PDF_DEFAULT_PRESET, target: Optional[str] = None) -> Optional[bytes]:
+        """
+        Renders a PDF with one of pdf.PDF_PRESETS. Pass a dict as `profile` to have it filled
+        with the render's stack samples. With `target` (a file path) the worker writes the PDF
+        there and None is returned, so the bytes never pass through this process.
+        """
+        with track_in_flight("pdf"), time_stage("pdf_total"):
+            pdf_bytes, timings, samples, peak_memory = await self._render(resume_data, profile is not None, preset, target)
+        observe_stages(timings)
+        PDF_SIZE_BYTES.labels(preset).observe(os.path.getsize(target) if target else len(pdf_bytes))
+        if peak_memory is not None:
+            PDF_RENDER_MEMORY_BYTES.observe(peak_memory)
+        if profile is not None:
+            profile.update(samples)
+        return pdf_bytes
+
+    async def _render(self, resume_data: ResumeSchema, profile: bool, preset: str, target: Optional[str] = None):
+        # No point laying out a PDF for a client that has already given up
+        check_deadline("pdf")
+        if self._slots is None:
+            # Pool not started (scripts, tests): still keep the render off the event loop
+            return await asyncio.to_thread(_render_job, resume_data, profile, preset, None, target)
+
+        if self._slots.locked():
+            raise HTTPException(
+                status_code=503,
+                detail="PDF renderer is busy, please retry shortly",
+                headers={"Retry-After": "5"},
+            )
+
+        # A worker crash breaks every render in flight on its pool; the one its watchdog stopped
+        # gets a 413 or 504, the others are retried once on the fresh workers
+        for attempt in (1, 2):
+            kill_marker = _kill_marker()
+            await self._slots.acquire()
+            try:
+                executor, job = self._submit(resume_data, profile, preset, kill_marker, target)
+            except BaseException:
+                self._slots.release()
+                raise
+            # Released when the render itself ends, not when this caller stops waiting for it
+            job.add_done_callback(self._job_done)
+
+            try:
+                return await asyncio.wait_for(asyncio.shield(job), timeout=bounded_timeout(self.job_timeout))
+            except asyncio.TimeoutError:
+                check_deadline("pdf")
+                # The render itself goes on until its worker's watchdog stops it at job_timeout
+                logger.error(f"PDF render timed out after {self.job_timeout}s")
+                raise HTTPException(status_code=504, detail="PDF generation timed out")
+            except BrokenProcessPool:
+                self._replace_executor(executor)
+                reason = _pop_kill_marker(kill_marker)
+                if reason == "memory":
+                    logger.error(f"PDF render exceeded its {settings.PDF_RENDER_MAX_MB}MB memory limit, restarting workers")
+                    raise HTTPException(status_code=413, detail="Resume is too large to render")
+                if reason == "timeout":
+                    logger.error(f"PDF render stopped after {self.job_timeout}s, restarting workers")
+                    raise HTTPException(status_code=504, detail="PDF generation timed out")
+                logger.error(f"PDF render pool crashed (attempt {attempt}), restarting workers")
+                check_deadline("pdf")
+            finally:
+                if not job.done():
+                    job.add_done_callback(lambda job, executor=executor, path=kill_marker: self._abandoned_job_done(job, executor, path))
+        raise HTTPException(status_code=500, detail="PDF generation failed: render worker crashed")
+
+
+render_pool = RenderPool(
+    workers=settings.PDF_WORKERS,
+    queue_size=settings.PDF_QUEUE_SIZE,
+    job_timeout=settings.PDF_JOB_TIMEOUT,
+    max_jobs_per_worker=settings.PDF_MAX_JOBS_PER_WORKER,
+)
@@ -0,0 +1,102 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Optional, Tuple
+from app.core.config import settings
+from app.core.schemas import ResumeSchema
+from app.services.pdf_cache import resume_hash
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS resumes (
+    id TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    data TEXT NOT NULL,              -- compact ResumeSchema JSON
+    content_hash TEXT NOT NULL,      -- resume_hash(), stable render-cache key
+    created_at REAL NOT NULL,
+    PRIMARY KEY (id, version)
+);
+"""
+
+
+class ResumeStore:
+    """
+    Versioned resumes in SQLite: every save of an id appends a new version, and only the
+    latest `max_versions` of each id are kept. Stored JSON was validated on the way in,
+    so reads hand it back without re-validating.
+    """
+
+    def __init__(self, path: str, max_versions: int = 0):
+        self.path = path
+        self.max_versions = max_versions
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        if self._conn:
+            self._conn.close()
+            self._conn = None
+
+    def _save(self, resume_id: str, resume: ResumeSchema) -> Tuple[str, int]:
+        data = resume.model_dump_json(exclude_none=True)
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(version) FROM resumes WHERE id = ?", (resume_id,)).fetchone()
+            version = (row[0] or 0) + 1
+            self._conn.execute(
+                "INSERT INTO resumes (id, version, data, content_hash, created_at) VALUES (?, ?, ?, ?, ?)",
+                (resume_id, version, data, resume_hash(resume), time.time()),
+            )
+            if self.max_versions > 0:
+                self._conn.execute(
+                    "DELETE FROM resumes WHERE id = ? AND version <= ?", (resume_id, version - self.max_versions)
+                )
+            self._conn.commit()
+        return resume_id, version
+
+    def _exists(self, resume_id: str) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM resumes WHERE id = ? LIMIT 1", (resume_id,)).fetchone() is not None
+
+    def _get(self, resume_id: str, version: Optional[int]) -> Optional[sqlite3.Row]:
+        with self._lock:
+            if version is None:
+                return self._conn.execute(
+                    "SELECT * FROM resumes WHERE id = ? ORDER BY version DESC LIMIT 1", (resume_id,)
+                ).fetchone()
+            return self._conn.execute(
+                "SELECT * FROM resumes WHERE id = ? AND version = ?", (resume_id, version)
+            ).fetchone()
+
+    # --- Async API (SQLite work runs in a thread) ---
+
+    async def create(self, resume: ResumeSchema) -> Tuple[str, int]:
+        return await asyncio.to_thread(self._save, uuid.uuid4().hex, resume)
+
+    async def add_version(self, resume_id: str, resume: ResumeSchema) -> Optional[Tuple[str, int]]:
+        if not await asyncio.to_thread(self._exists, resume_id):
+            return None
+        return await asyncio.to_thread(self._save, resume_id, resume)
+
+    async def get(self, resume_id: str, version: Optional[int] = None) -> Optional[sqlite3.Row]:
+        return await asyncio.to_thread(self._get, resume_id, version)
+
+    async def start(self):
+        await asyncio.to_thread(self.open)
+
+    async def stop(self):
+        await asyncio.to_thread(self.close)
+
+
+resume_store = ResumeStore(settings.RESUMES_DB_PATH, settings.RESUMES_MAX_VERSIONS)
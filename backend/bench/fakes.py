@@ -0,0 +1,169 @@
+"""
+In-process stand-ins for the GitHub API and Gemini, built from MOCK_PROFILES / MOCK_RESUMES.
+Both take a mean latency (seconds, +/-25% jitter) and an error rate, so load tests need no network or API key.
+"""
+import asyncio
+import json
+import random
+import re
+import types
+from typing import Dict, List, Optional
+import httpx
+from app.core.schemas import ResumeSchema
+from app.mock_data import MOCK_PROFILES, MOCK_RESUMES
+
+# 1. "distributed-kv-store" (Go) - A high-performance eventual consistency KV store. 2.4k stars.
+_MOCK_REPO_LINE = re.compile(r'\d+\.\s+"(?P<name>[^"]+)"\s+\((?P<language>[^)]+)\)\s+-\s+(?P<desc>.*?)(?:\s+(?P<stars>[\d.]+k?) stars\.)?$')
+
+
+def _parse_stars(value: Optional[str]) -> int:
+    if not value:
+        return 0
+    return int(float(value[:-1]) * 1000) if value.endswith("k") else int(value)
+
+
+def mock_username(profile: str) -> str:
+    match = re.search(r"User:\s*(\S+)", MOCK_PROFILES[profile]["github"])
+    return match.group(1) if match else f"bench-{profile}"
+
+
+def _mock_repos(profile: str) -> List[dict]:
+    username = mock_username(profile)
+    repos = []
+    for line in MOCK_PROFILES[profile]["github"].splitlines():
+        match = _MOCK_REPO_LINE.match(line.strip())
+        if match:
+            repos.append({
+                "name": match["name"],
+                "language": match["language"],
+                "description": match["desc"].rstrip("."),
+                "stargazers_count": _parse_stars(match["stars"]),
+                "fork": False,
+                "html_url": f"https://github.com/{username}/{match['name']}",
+                "updated_at": "2024-06-01T00:00:00Z",
+            })
+    return repos
+
+
+async def _delay(latency: float):
+    if latency > 0:
+        await asyncio.sleep(random.uniform(0.75, 1.25) * latency)
+
+
+class FakeGitHub(httpx.AsyncBaseTransport):
+    """Serves /users/{u}, /users/{u}/repos and /graphql for the MOCK_PROFILES users."""
+
+    def __init__(self, latency: float = 0.05, error_rate: float = 0.0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = 0
+        self.users: Dict[str, str] = {mock_username(p).lower(): p for p in MOCK_PROFILES}
+
+    def _user(self, profile: str) -> dict:
+        return {
+            "login": mock_username(profile),
+            "name": MOCK_RESUMES[profile]["personal_info"]["full_name"],
+            "bio": None,
+            "public_repos": len(_mock_repos(profile)),
+            "followers": 10,
+        }
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        await _delay(self.latency)
+        if random.random() < self.error_rate:
+            return httpx.Response(503, json={"message": "Service Unavailable"})
+
+        headers = {"X-RateLimit-Remaining": "5000", "X-RateLimit-Limit": "5000", "X-RateLimit-Reset": "0"}
+        path = request.url.path
+
+        if path == "/graphql":
+            login = json.loads(request.content)["variables"]["login"].lower()
+            profile = self.users.get(login)
+            if profile is None:
+                return httpx.Response(200, headers=headers, json={"data": {"user": None}, "errors": [{"type": "NOT_FOUND"}]})
+            user = self._user(profile)
+            repos = _mock_repos(profile)
+            return httpx.Response(200, headers=headers, json={"data": {"user": {
+                "login": user["login"],
+                "name": user["name"],
+                "bio": user["bio"],
+                "followers": {"totalCount": user["followers"]},
+                "contributionsCollection": {"contributionCalendar": {"totalContributions": 365}},
+                "repositories": {
+                    "totalCount": len(repos),
+                    "pageInfo": {"hasNextPage": False, "endCursor": None},
+                    "nodes": [{
+                        "name": r["name"],
+                        "description": r["description"],
+                        "url": r["html_url"],
+                        "isFork": r["fork"],
+                        "stargazerCount": r["stargazers_count"],
+                        "updatedAt": r["updated_at"],
+                        "primaryLanguage": {"name": r["language"]},
+                    } for r in repos],
+                },
+            }}})
+
+        parts = path.strip("/").split("/")
+        profile = self.users.get(parts[1].lower()) if len(parts) >= 2 and parts[0] == "users" else None
+        if profile is None:
+            return httpx.Response(404, headers=headers, json={"message": "Not Found"})
+        if len(parts) == 2:
+            return httpx.Response(200, headers=headers, json=self._user(profile))
+        page = int(request.url.params.get("page", "1"))
+        return httpx.Response(200, headers=headers, json=_mock_repos(profile) if page == 1 else [])
+
+
+class FakeGeminiError(Exception):
+    def __init__(self, code: int, message: str):
+        self.code = code
+        super().__init__(f"{code} {message}")
+
+
+class _FakeModels:
+    def __init__(self, owner: "FakeGemini"):
+        self.owner = owner
+
+    def _resume_for(self, prompt: str) -> ResumeSchema:
+        for profile in MOCK_PROFILES:
+            if mock_username(profile) in prompt:
+                return ResumeSchema.model_validate(MOCK_RESUMES[profile])
+        return ResumeSchema.model_validate(MOCK_RESUMES["weak"])
+
+    def _usage(self, prompt: str, text: str):
+        return types.SimpleNamespace(prompt_token_count=len(prompt) // 4, candidates_token_count=len(text) // 4)
+
+    async def _start(self, prompt: str) -> ResumeSchema:
+        self.owner.calls += 1
+        await _delay(self.owner.latency)
+        if random.random() < self.owner.error_rate:
+            raise FakeGeminiError(503, "UNAVAILABLE")
+        return self._resume_for(prompt)
+
+    async def generate_content(self, model, contents, config=None):
+        resume = await self._start(contents)
+        text = resume.model_dump_json()
+        return types.SimpleNamespace(parsed=resume, text=text, usage_metadata=self._usage(contents, text))
+
+    async def generate_content_stream(self, model, contents, config=None):
+        resume = await self._start(contents)
+        text = resume.model_dump_json()
+        usage = self._usage(contents, text)
+
+        async def chunks():
+            size = max(1, len(text) // 8)
+            for i in range(0, len(text), size):
+                yield types.SimpleNamespace(text=text[i:i + size], usage_metadata=usage)
+
+        return chunks()
+
+
+class FakeGemini:
+    """Duck-types the bits of genai.Client used by app/services/llm.py (client.aio.models.*)."""
+
+    def __init__(self, latency: float = 1.0, error_rate: float = 0.0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.calls = 0
+        self.aio = types.SimpleNamespace(models=_FakeModels(self))
@@ -0,0 +1,236 @@
+"""
+Offline load test: drives /analyze and /generate_pdf in-process against the GitHub and Gemini
+stand-ins in bench/fakes.py, then reports throughput and p50/p95/p99 latency per endpoint and
+per stage (github / llm / pdf). Results are written as JSON for comparison across commits.
+
+Usage (from backend/):
+  python -m bench.load --requests 200 --concurrency 16 --gemini-latency 1.5 --github-latency 0.1
+  python -m bench.load --endpoints generate_pdf --requests 100 --concurrency 8
+
+Caches (LLM, GitHub, PDF) and the Gemini rate limits are disabled unless --cache / --rate-limits are given,
+so every request exercises the full path.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List
+
+# Ensure backend is in path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100 * len(ordered))))
+    return ordered[rank - 1]
+
+
+def summarize(latencies: List[float], errors: int = 0, wall: float = 0.0) -> dict:
+    summary = {
+        "count": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(max(latencies, default=0) * 1000, 2),
+    }
+    if wall:
+        summary["errors"] = errors
+        summary["wall_s"] = round(wall, 3)
+        summary["throughput_rps"] = round(len(latencies) / wall, 2)
+    return summary
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def configure_environment(args):
+    """Settings are read from the environment at import time, so this must run before importing app."""
+    scratch = tempfile.mkdtemp(prefix="bench-")
+    os.environ.setdefault("JOBS_DB_PATH", os.path.join(scratch, "jobs.db"))
+    os.environ.setdefault("RESUMES_DB_PATH", os.path.join(scratch, "resumes.db"))
+    os.environ.setdefault("GEMINI_API_KEY", "bench")
+    if not args.rate_limits:
+        os.environ["LLM_REQUESTS_PER_MINUTE"] = "0"
+        os.environ["LLM_TOKENS_PER_MINUTE"] = "0"
+        os.environ["LLM_MAX_IN_FLIGHT"] = str(max(args.concurrency, 1))
+    if not args.cache:
+        os.environ["LLM_CACHE_MAX_ENTRIES"] = "0"
+        os.environ["GITHUB_CACHE_MAX_ENTRIES"] = "0"
+        os.environ["GITHUB_PREFETCH_MAX_ENTRIES"] = "0"
+        os.environ["PDF_CACHE_MEMORY_ITEMS"] = "0"
+        os.environ["PDF_CACHE_DIR"] = ""
+
+
+def instrument_stages(stage_timings: Dict[str, List[float]]):
+    """Wraps the pipeline stages so each call's duration is recorded."""
+    from app.services import analysis
+    from app.services.render_pool import render_pool
+
+    def timed(stage, fn):
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                stage_timings[stage].append(time.perf_counter() - start)
+        return wrapper
+
+    analysis.fetch_github_for_request = timed("github", analysis.fetch_github_for_request)
+    analysis.generate_for_request = timed("llm", analysis.generate_for_request)
+    render_pool.render = timed("pdf", render_pool.render)
+
+
+def build_payloads(endpoint: str) -> List[dict]:
+    from app.mock_data import MOCK_PROFILES, MOCK_RESUMES
+    from bench.fakes import mock_username
+
+    if endpoint == "generate_pdf":
+        return list(MOCK_RESUMES.values())
+
+    payloads = []
+    for profile, data in MOCK_PROFILES.items():
+        payloads.append({
+            "github_url": f"https://github.com/{mock_username(profile)}",
+            "manual_experience": [{
+                "company": "LinkedIn",
+                "role": "Profile",
+                "duration": "-",
+                "description": " ".join(data["linkedin"].split()),
+            }],
+        })
+    return payloads
+
+
+def unique_payload(endpoint: str, payload: dict, index: int) -> dict:
+    """Makes each /analyze prompt distinct so single-flight coalescing doesn't hide Gemini calls."""
+    if endpoint != "analyze":
+        return payload
+    payload = json.loads(json.dumps(payload))
+    payload["manual_experience"][0]["duration"] = f"#{index}"
+    return payload
+
+
+async def drive(client, endpoint: str, total: int, concurrency: int, unique: bool) -> dict:
+    payloads = build_payloads(endpoint)
+    latencies: List[float] = []
+    status_counts: Dict[int, int] = defaultdict(int)
+    errors = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index, errors
+        while next_index < total:
+            index = next_index
+            next_index += 1
+            payload = payloads[index % len(payloads)]
+            if unique:
+                payload = unique_payload(endpoint, payload, index)
+            start = time.perf_counter()
+            try:
+                resp = await client.post(f"/api/v1/{endpoint}", json=payload)
+                status_counts[resp.status_code] += 1
+                if resp.status_code != 200:
+                    errors += 1
+            except Exception:
+                status_counts[0] += 1
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result = summarize(latencies, errors, time.perf_counter() - wall_start)
+    result["status_codes"] = dict(status_counts)
+    return result
+
+
+async def run(args) -> dict:
+    import httpx
+    from app.main import app
+    from app.services import github, llm
+    from bench.fakes import FakeGemini, FakeGitHub
+
+    fake_github = FakeGitHub(latency=args.github_latency, error_rate=args.github_error_rate)
+    fake_gemini = FakeGemini(latency=args.gemini_latency, error_rate=args.gemini_error_rate)
+    # The lifespan keeps an already-installed GitHub client
+    github._client = httpx.AsyncClient(transport=fake_github)
+    llm._client = fake_gemini
+
+    stage_timings: Dict[str, List[float]] = defaultdict(list)
+    instrument_stages(stage_timings)
+
+    report = {
+        "revision": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": vars(args),
+        "endpoints": {},
+        "stages": {},
+    }
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for endpoint in args.endpoints:
+                print(f"Driving /{endpoint}: {args.requests} requests at concurrency {args.concurrency}...")
+                report["endpoints"][endpoint] = await drive(client, endpoint, args.requests, args.concurrency, unique=not args.cache)
+
+    report["stages"] = {stage: summarize(values) for stage, values in stage_timings.items()}
+    report["fakes"] = {"github_requests": fake_github.requests, "gemini_calls": fake_gemini.calls}
+    return report
+
+
+def print_report(report: dict):
+    print(f"\nRevision {report['revision']} @ {report['timestamp']}")
+    print(f"{'endpoint':<14} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for name, r in report["endpoints"].items():
+        print(f"{name:<14} {r['throughput_rps']:>8} {r['p50_ms']:>9} {r['p95_ms']:>9} {r['p99_ms']:>9} {r['errors']:>7}")
+    print(f"\n{'stage':<14} {'count':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, r in report["stages"].items():
+        print(f"{name:<14} {r['count']:>8} {r['p50_ms']:>9} {r['p95_ms']:>9} {r['p99_ms']:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoints", nargs="+", default=["analyze", "generate_pdf"], choices=["analyze", "generate_pdf"])
+    parser.add_argument("--requests", type=int, default=100, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--github-latency", type=float, default=0.1, help="mean seconds per GitHub call")
+    parser.add_argument("--github-error-rate", type=float, default=0.0)
+    parser.add_argument("--gemini-latency", type=float, default=1.0, help="mean seconds per Gemini call")
+    parser.add_argument("--gemini-error-rate", type=float, default=0.0)
+    parser.add_argument("--cache", action="store_true", help="keep the LLM/GitHub/PDF caches enabled")
+    parser.add_argument("--rate-limits", action="store_true", help="keep the configured Gemini rate limits")
+    parser.add_argument("--out", help="result JSON path (default: bench/results/<timestamp>_<revision>.json)")
+    args = parser.parse_args()
+
+    configure_environment(args)
+    report = asyncio.run(run(args))
+    print_report(report)
+
+    out = args.out
+    if not out:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        out = os.path.join(RESULTS_DIR, f"{stamp}_{report['revision']}.json")
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Per-render PDF timings for the MOCK_RESUMES profiles.
+
+  before: inline <style> re-parsed and a fresh FontConfiguration on every render (old behaviour)
+  after:  shared pre-parsed stylesheet + FontConfiguration (app/services/pdf.py)
+  +fit:   after, plus one-page fitting (PDF_FIT_ONE_PAGE), reported separately since it
+          may lay a resume out several times
+
+
+Usage: python bench_pdf.py [runs]
+"""
+import os
+import sys
+import time
+import statistics
+
+# Ensure backend is in path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from weasyprint import HTML
+from app.core.config import settings
+from app.core.schemas import ResumeSchema
+from app.mock_data import MOCK_RESUMES
+from app.services import pdf
+
+
+def render_before(resume: ResumeSchema) -> bytes:
+    with open(os.path.join(pdf.TEMPLATE_DIR, "resume.css")) as f:
+        css = f.read()
+    html_content = pdf.env.get_template("resume.html").render(r=resume)
+    html_content = html_content.replace("</head>", f"<style>{css}</style></head>", 1)
+    return HTML(string=html_content).write_pdf()
+
+
+def time_renders(render, resume, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        render(resume)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    # First-ever render in this process (fonts, stylesheet, template compile)
+    start = time.perf_counter()
+    pdf.warm_up()
+    print(f"Cold first render (warm-up): {(time.perf_counter() - start) * 1000:.1f}ms\n")
+
+    fit_one_page = settings.PDF_FIT_ONE_PAGE
+    print(f"{'profile':<8} {'before (ms)':>12} {'after (ms)':>12} {'speedup':>8} {'+fit (ms)':>10}")
+    for name, data in MOCK_RESUMES.items():
+        resume = ResumeSchema.model_validate(data)
+        before = statistics.median(time_renders(render_before, resume, runs))
+        # Like "before", a single layout: only the caching differs
+        settings.PDF_FIT_ONE_PAGE = False
+        after = statistics.median(time_renders(pdf.generate_resume_pdf, resume, runs))
+        settings.PDF_FIT_ONE_PAGE = True
+        fitted = statistics.median(time_renders(pdf.generate_resume_pdf, resume, runs))
+        settings.PDF_FIT_ONE_PAGE = fit_one_page
+        print(f"{name:<8} {before:>12.1f} {after:>12.1f} {before / after:>7.2f}x {fitted:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
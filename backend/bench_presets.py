@@ -0,0 +1,46 @@
+"""
+PDF size and render time per output preset (app/services/pdf.py PDF_PRESETS)
+for the MOCK_RESUMES profiles.
+
+Usage: python bench_presets.py [runs]
+"""
+import os
+import sys
+import time
+import statistics
+
+# Ensure backend is in path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.schemas import ResumeSchema
+from app.mock_data import MOCK_RESUMES
+from app.services import pdf
+
+
+def time_preset(resume: ResumeSchema, preset: str, runs: int):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        pdf_bytes = pdf.generate_resume_pdf(resume, timings={}, preset=preset)
+        timings.append((time.perf_counter() - start) * 1000)
+    return len(pdf_bytes), statistics.median(timings)
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    # Keep fonts, stylesheet and template loading out of the first preset's numbers
+    pdf.warm_up()
+
+    print(f"{'profile':<8} {'preset':<9} {'bytes':>9} {'vs fast':>8} {'render (ms)':>12}")
+    for name, data in MOCK_RESUMES.items():
+        resume = ResumeSchema.model_validate(data)
+        baseline = None
+        for preset in pdf.PDF_PRESETS:
+            size, ms = time_preset(resume, preset, runs)
+            baseline = baseline or size
+            print(f"{name:<8} {preset:<9} {size:>9,} {size / baseline:>7.2f}x {ms:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
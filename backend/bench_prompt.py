@@ -0,0 +1,36 @@
+"""
+Prompt size per MOCK_PROFILES profile, unbudgeted vs. PROMPT_TOKEN_BUDGET.
+Input tokens drive Gemini latency and cost; pair with the 'Gemini tokens' log lines for real counts.
+
+Usage: python bench_prompt.py [budget]
+"""
+import os
+import sys
+
+# Ensure backend is in path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.config import settings
+from app.core.schemas import ManualExperienceItem
+from app.mock_data import MOCK_PROFILES
+from app.services.llm import build_prompt
+from app.services.prompt import estimate_tokens
+
+
+def main():
+    budget = int(sys.argv[1]) if len(sys.argv) > 1 else settings.PROMPT_TOKEN_BUDGET
+
+    print(f"{'profile':<8} {'unbudgeted':>11} {'budget ' + str(budget):>12}")
+    for name, data in MOCK_PROFILES.items():
+        # LinkedIn text stands in for a verbose manual experience entry
+        manual = [ManualExperienceItem(company="LinkedIn", role="Profile", duration="-", description=data["linkedin"])]
+
+        settings.PROMPT_TOKEN_BUDGET = 0
+        raw = estimate_tokens(build_prompt(data["github"], manual))
+        settings.PROMPT_TOKEN_BUDGET = budget
+        trimmed = estimate_tokens(build_prompt(data["github"], manual))
+        print(f"{name:<8} {raw:>11} {trimmed:>12}")
+
+
+if __name__ == "__main__":
+    main()
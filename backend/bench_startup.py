@@ -0,0 +1,85 @@
+"""
+Cold-start timings: `import app.main` in a fresh interpreter, and the time from launching
+uvicorn until `/` answers 200 (first request served) and until `/ready` answers 200 (warm).
+
+Usage: python bench_startup.py [runs]
+"""
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+
+
+def measure_import() -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _status(url: str) -> int:
+    try:
+        with urllib.request.urlopen(url, timeout=1) as resp:
+            return resp.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except OSError:
+        return 0
+
+
+def measure_server(timeout: float = 60):
+    """Seconds from process launch to the first 200 on `/` and on `/ready` (None if not reached)."""
+    port = _free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    first_ok = ready = None
+    try:
+        while time.perf_counter() - start < timeout and ready is None:
+            if first_ok is None and _status(f"http://127.0.0.1:{port}/") == 200:
+                first_ok = time.perf_counter() - start
+            if first_ok is not None and _status(f"http://127.0.0.1:{port}/ready") == 200:
+                ready = time.perf_counter() - start
+            time.sleep(0.02)
+    finally:
+        proc.terminate()
+        proc.wait()
+    return first_ok, ready
+
+
+def _ms(values):
+    values = [v for v in values if v is not None]
+    return f"{statistics.median(values) * 1000:8.0f}ms" if values else "     n/a"
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    imports = [measure_import() for _ in range(runs)]
+    servers = [measure_server() for _ in range(runs)]
+
+    print(f"median of {runs} runs")
+    print(f"import app.main          {_ms(imports)}")
+    print(f"launch -> first 200 (/)  {_ms([s[0] for s in servers])}")
+    print(f"launch -> ready (/ready) {_ms([s[1] for s in servers])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@ import sys
 from app.mock_data import MOCK_PROFILES
 from app.services.llm import analyze_profiles
 from app.services.pdf import generate_resume_pdf
-from app.core.schemas import ResumeSchema
+from app.core.schemas import ResumeSchema, ManualExperienceItem
 
 # Add parent dir to path to allow imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -29,7 +29,9 @@ async def test_profile(name, data):
             print("Please set GEMINI_API_KEY to test LLM generation.")
             return
             
-        resume_schema = await analyze_profiles(data["linkedin"], data["github"])
+        # LinkedIn text goes in as a manual experience entry, GitHub text as the raw GitHub summary
+        manual = [ManualExperienceItem(company="LinkedIn", role="Profile", duration="-", description=data["linkedin"])]
+        resume_schema = await analyze_profiles(data["github"], manual)
         
         json_path = os.path.join(OUTPUT_DIR, f"{name}.json")
         with open(json_path, "w") as f:
@@ -0,0 +1,10 @@
+import os
+import sys
+
+# Settings are read at import time: keep the tests off real keys and the data/ databases
+os.environ.setdefault("GEMINI_API_KEY", "test")
+os.environ.setdefault("USE_REAL_GITHUB", "False")
+os.environ.setdefault("PDF_CACHE_DIR", "")
+
+# Ensure backend is in path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,53 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.admission import AdmissionControlMiddleware, RouteGroup
+from app.main import app as main_app
+
+
+def main_groups():
+    middleware = next(m for m in main_app.user_middleware if m.cls is AdmissionControlMiddleware)
+    return {group.name: group for group in middleware.kwargs["groups"]}
+
+
+@pytest.mark.parametrize("path", [
+    "/api/v1/generate_pdf",
+    "/api/v1/preview",
+    "/api/v1/resumes/abc123/pdf",
+    "/api/v1/resumes/abc123/preview",
+])
+def test_render_routes_are_in_the_pdf_group(path):
+    assert main_groups()["pdf"].matches(path)
+
+
+@pytest.mark.parametrize("path", ["/api/v1/resumes/abc123", "/api/v1/resumes", "/api/v1/jobs/abc123/pdf"])
+def test_other_routes_are_not(path):
+    assert not main_groups()["pdf"].matches(path)
+
+
+async def test_saturated_pdf_group_sheds_previews():
+    # The production patterns, with room for a single request and no queue
+    patterns = [p.pattern for p in main_groups()["pdf"].patterns]
+    group = RouteGroup("pdf", patterns, concurrency=1, queue=0, max_queue_wait=1)
+    started, release = asyncio.Event(), asyncio.Event()
+
+    async def slow_app(scope, receive, send):
+        started.set()
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    transport = httpx.ASGITransport(app=AdmissionControlMiddleware(slow_app, groups=[group]))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        render = asyncio.ensure_future(client.post("/api/v1/generate_pdf"))
+        await started.wait()
+
+        for method, path in (("POST", "/api/v1/preview"), ("GET", "/api/v1/resumes/abc123/preview")):
+            shed = await client.request(method, path)
+            assert shed.status_code == 503
+            assert "Retry-After" in shed.headers
+
+        release.set()
+        assert (await render).status_code == 200
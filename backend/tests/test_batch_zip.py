@@ -0,0 +1,80 @@
+import asyncio
+import io
+import json
+import zipfile
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import endpoints
+from app.core.schemas import AnalyzeRequest
+from app.services import batch
+
+ITEMS = [AnalyzeRequest() for _ in range(3)]
+
+
+@pytest.fixture
+def spools(monkeypatch):
+    """Every temp file build_zip opens."""
+    opened = []
+    original = batch.tempfile.SpooledTemporaryFile
+
+    def spooled(*args, **kwargs):
+        opened.append(original(*args, **kwargs))
+        return opened[-1]
+
+    monkeypatch.setattr(batch.tempfile, "SpooledTemporaryFile", spooled)
+    return opened
+
+
+@pytest.fixture
+def written(spools, monkeypatch):
+    """Yields two PDFs and one failure; records how far the zip got after each PDF."""
+    sizes = []
+
+    async def run_batch(items, render_pdf=False):
+        for index in (2, 0):
+            yield {"index": index, "status": "ok"}, b"%PDF-1.7 " + bytes([index]) * 1000
+            sizes.append(spools[0].tell())
+        yield {"index": 1, "status": "error", "status_code": 502, "error": "LLM down"}, None
+
+    monkeypatch.setattr(batch, "run_batch", run_batch)
+    return sizes
+
+
+async def test_pdfs_written_as_they_complete(written):
+    archive = await batch.build_zip(ITEMS)
+    try:
+        # Each PDF was in the zip before the next result came in
+        assert written[0] > 1000 and written[1] > written[0] + 1000
+        with zipfile.ZipFile(archive) as z:
+            assert z.namelist() == ["resume_002.pdf", "resume_000.pdf", "results.ndjson"]
+            assert z.read("resume_000.pdf") == b"%PDF-1.7 " + bytes([0]) * 1000
+            lines = [json.loads(line) for line in z.read("results.ndjson").decode().splitlines()]
+            assert [line["index"] for line in lines] == [2, 0, 1]
+    finally:
+        archive.close()
+
+
+async def test_spool_closed_on_failure(spools, monkeypatch):
+    async def run_batch(items, render_pdf=False):
+        yield {"index": 0, "status": "ok"}, b"%PDF-1.7"
+        raise asyncio.CancelledError
+
+    monkeypatch.setattr(batch, "run_batch", run_batch)
+    with pytest.raises(asyncio.CancelledError):
+        await batch.build_zip(ITEMS)
+    assert spools[0].closed
+
+
+def test_endpoint_streams_zip(written, spools):
+    app = FastAPI()
+    app.include_router(endpoints.router)
+    with TestClient(app) as client:
+        response = client.post("/analyze_batch", json={"items": [{}, {}, {}], "render_pdf": True})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    with zipfile.ZipFile(io.BytesIO(response.content)) as z:
+        assert sorted(z.namelist()) == ["results.ndjson", "resume_000.pdf", "resume_002.pdf"]
+    assert spools[0].closed
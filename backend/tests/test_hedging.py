@@ -0,0 +1,193 @@
+import asyncio
+
+import pytest
+
+from app.services.hedging import HedgeBudget, hedged
+
+# Long enough that only the test's own events decide which call finishes first
+NEVER = 60
+
+
+class GatedBudget(HedgeBudget):
+    """Sets `decided` once hedged() has asked for a hedge, so calls can wait for that point."""
+
+    def __init__(self, ratio: float, window: int = 1000):
+        super().__init__(ratio, window)
+        self.decided = asyncio.Event()
+
+    def try_acquire(self) -> bool:
+        allowed = super().try_acquire()
+        self.decided.set()
+        return allowed
+
+
+class Calls:
+    """call(model) for hedged(): the n-th call runs behaviours[n]."""
+
+    def __init__(self, *behaviours):
+        self.behaviours = list(behaviours)
+        self.models = []
+        self.cancelled = []
+
+    async def __call__(self, model: str):
+        index = len(self.models)
+        self.models.append(model)
+        try:
+            return await self.behaviours[index]()
+        except asyncio.CancelledError:
+            self.cancelled.append(index)
+            raise
+
+
+def after(event: asyncio.Event, result=None, error: Exception = None):
+    async def behaviour():
+        await event.wait()
+        if error:
+            raise error
+        return result
+    return behaviour
+
+
+def hang():
+    return after(asyncio.Event())
+
+
+def immediately(result=None, error: Exception = None):
+    return after(_set_event(), result, error)
+
+
+async def settle():
+    """hedged() cancels the losing call on its way out; the call sees it on its next step."""
+    await asyncio.sleep(0)
+
+
+def _set_event() -> asyncio.Event:
+    event = asyncio.Event()
+    event.set()
+    return event
+
+
+async def test_fast_primary_is_not_hedged():
+    budget = GatedBudget(ratio=1)
+    calls = Calls(immediately("primary"))
+    assert await hedged(calls, ["a", "b"], 0.01, budget) == "primary"
+    assert calls.models == ["a"]
+    assert budget.hedges == 0
+    assert not budget.decided.is_set()
+
+
+async def test_hedging_disabled():
+    budget = GatedBudget(ratio=1)
+    calls = Calls(after(budget.decided, "primary"))
+    task = asyncio.ensure_future(hedged(calls, ["a", "b"], 0, budget))
+    done, _ = await asyncio.wait({task}, timeout=0.1)
+    assert not done
+    assert calls.models == ["a"]
+    task.cancel()
+
+
+async def test_hedge_wins_and_primary_is_cancelled():
+    budget = GatedBudget(ratio=1)
+    calls = Calls(hang(), immediately("hedge"))
+    assert await hedged(calls, ["a", "b"], 0.01, budget) == "hedge"
+    await settle()
+    assert calls.models == ["a", "b"]
+    assert calls.cancelled == [0]
+    assert budget.hedges == 1
+
+
+async def test_primary_wins_and_hedge_is_cancelled():
+    budget = GatedBudget(ratio=1)
+    hedge_started = asyncio.Event()
+
+    async def hedge():
+        hedge_started.set()
+        await asyncio.sleep(NEVER)
+
+    calls = Calls(after(hedge_started, "primary"), hedge)
+    assert await hedged(calls, ["a", "b"], 0.01, budget) == "primary"
+    await settle()
+    assert calls.models == ["a", "b"]
+    assert calls.cancelled == [1]
+
+
+async def test_single_model_ladder_hedges_with_the_primary_model():
+    calls = Calls(hang(), immediately("second try"))
+    assert await hedged(calls, ["a"], 0.01, GatedBudget(ratio=1)) == "second try"
+    assert calls.models == ["a", "a"]
+
+
+async def test_exhausted_budget_waits_for_the_primary():
+    budget = GatedBudget(ratio=0)
+    calls = Calls(after(budget.decided, "primary"))
+    assert await hedged(calls, ["a", "b"], 0.01, budget) == "primary"
+    assert calls.models == ["a"]
+    assert budget.hedges == 0
+
+
+async def test_failed_primary_falls_back_to_hedge():
+    budget = GatedBudget(ratio=1)
+    hedge_started = asyncio.Event()
+
+    async def hedge():
+        hedge_started.set()
+        await asyncio.sleep(0)
+        return "hedge"
+
+    calls = Calls(after(hedge_started, error=ValueError("primary failed")), hedge)
+    assert await hedged(calls, ["a", "b"], 0.01, budget) == "hedge"
+    await settle()
+    assert calls.cancelled == []
+
+
+async def test_both_failing_raises_the_primary_error():
+    budget = GatedBudget(ratio=1)
+    hedge_started = asyncio.Event()
+
+    async def hedge():
+        hedge_started.set()
+        raise RuntimeError("hedge")
+
+    calls = Calls(after(hedge_started, error=ValueError("primary")), hedge)
+    with pytest.raises(ValueError, match="primary"):
+        await hedged(calls, ["a", "b"], 0.01, budget)
+
+
+async def test_cancelling_the_caller_cancels_both_calls():
+    calls = Calls(hang(), hang())
+    budget = GatedBudget(ratio=1)
+    task = asyncio.ensure_future(hedged(calls, ["a", "b"], 0.01, budget))
+    await budget.decided.wait()
+    while len(calls.models) < 2:
+        await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert sorted(calls.cancelled) == [0, 1]
+
+
+def test_budget_ratio():
+    budget = HedgeBudget(ratio=0.1)
+    for _ in range(9):
+        budget.record_call()
+    assert not budget.try_acquire()
+    budget.record_call()
+    assert budget.try_acquire()
+    assert not budget.try_acquire()
+    for _ in range(10):
+        budget.record_call()
+    assert budget.try_acquire()
+    assert budget.hedges == 2
+
+
+def test_budget_decays_over_the_window():
+    budget = HedgeBudget(ratio=0.5, window=10)
+    for _ in range(8):
+        budget.record_call()
+    assert all(budget.try_acquire() for _ in range(4))
+    assert not budget.try_acquire()
+    budget.record_call()
+    budget.record_call()
+    # Window reached: both counts halved, the ratio between them kept
+    assert (budget.calls, budget.hedges) == (5, 2)
+    assert not budget.try_acquire()
@@ -0,0 +1,99 @@
+import asyncio
+import sqlite3
+import time
+
+import pytest
+
+from app.core.schemas import AnalyzeRequest, ResumeSchema
+from app.mock_data import MOCK_RESUMES
+from app.services import jobs
+from app.services.jobs import JobQueue, JobStore
+
+RESUME = ResumeSchema.model_validate(MOCK_RESUMES["strong"])
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """Stands in for GitHub, Gemini and the render pool."""
+    async def fetch_github(request):
+        return "github summary"
+
+    async def generate(request, github_data):
+        return RESUME.model_copy(deep=True)
+
+    async def render(resume):
+        return b"%PDF-1.7"
+
+    monkeypatch.setattr(jobs, "fetch_github_for_request", fetch_github)
+    monkeypatch.setattr(jobs, "generate_for_request", generate)
+    monkeypatch.setattr(jobs.render_pool, "render", render)
+
+
+@pytest.fixture
+async def queue(tmp_path, pipeline):
+    queue = JobQueue(JobStore(str(tmp_path / "jobs.db")), workers=1, poll_interval=0.01, retention_hours=0,
+                     heartbeat_interval=3600, stale_after=60)
+    yield queue
+    await queue.stop()
+
+
+async def wait_finished(queue: JobQueue, *job_ids: str, timeout: float = 5) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        rows = {job_id: await queue.get(job_id) for job_id in job_ids}
+        if all(row["status"] in ("done", "failed") for row in rows.values()):
+            return {job_id: row["status"] for job_id, row in rows.items()}
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"jobs still running: { {job_id: row['status'] for job_id, row in rows.items()} }")
+
+
+async def test_poison_request_fails_and_worker_continues(queue):
+    await asyncio.to_thread(queue.store.open)
+    poison = await asyncio.to_thread(queue.store.submit, '{"is_student": "nope"}')
+    await asyncio.to_thread(queue.store.close)
+
+    await queue.start()
+    good = await queue.submit(AnalyzeRequest())
+    statuses = await wait_finished(queue, poison, good)
+
+    assert statuses == {poison: "failed", good: "done"}
+    assert (await queue.get(poison))["error"].startswith("Invalid job request")
+    assert all(not task.done() for task in queue._tasks)
+
+
+async def test_database_errors_do_not_kill_the_worker(queue, monkeypatch):
+    await queue.start()
+    claim = queue.store.claim
+    failures = []
+
+    def flaky_claim(owner):
+        if len(failures) < 2:
+            failures.append(1)
+            raise sqlite3.OperationalError("database is locked")
+        return claim(owner)
+
+    monkeypatch.setattr(queue.store, "claim", flaky_claim)
+    job_id = await queue.submit(AnalyzeRequest())
+    assert await wait_finished(queue, job_id) == {job_id: "done"}
+    assert len(failures) == 2
+
+
+async def test_job_lost_by_its_worker_goes_stale(queue, monkeypatch):
+    await queue.start()
+
+    def broken_write(*args):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    # Neither the result nor the failure can be recorded
+    monkeypatch.setattr(queue.store, "complete", broken_write)
+    monkeypatch.setattr(queue.store, "fail", broken_write)
+    job_id = await queue.submit(AnalyzeRequest())
+    deadline = time.monotonic() + 5
+    while (await queue.get(job_id))["status"] != "running" or queue._running:
+        assert time.monotonic() < deadline
+        await asyncio.sleep(0.01)
+
+    # The worker no longer tracks the job, so heartbeats leave it to go stale and be requeued
+    assert await asyncio.to_thread(queue.store.heartbeat, queue.owner, tuple(queue._running)) == 0
+    assert await asyncio.to_thread(queue.store.requeue_stale, time.time() + 1) == 1
+    assert all(not task.done() for task in queue._tasks)
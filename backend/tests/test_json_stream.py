@@ -0,0 +1,87 @@
+import json
+
+import pytest
+
+from app.services.json_stream import TopLevelMemberParser
+
+DOCUMENT = {
+    "summary": 'Builds "fast" things, e.g. {a, b} and [c]; path C:\\tmp\\new',
+    "highlights": ["One, two", "Ünïcödé — ✓", "emoji 🚀 and \u2028 separator"],
+    "experience": [
+        {"role": "Engineer", "company": "Acme, Inc.", "bullets": ["Cut p99 by 40%", "Led {team}"]},
+        {"role": "Intern", "company": "Beta", "bullets": [], "meta": {"remote": True, "years": [2020, 2021]}},
+    ],
+    "is_student": False,
+    "gpa": None,
+    "score": 3.5,
+}
+
+
+def feed_all(parser: TopLevelMemberParser, chunks):
+    members = []
+    for chunk in chunks:
+        members.extend(parser.feed(chunk))
+    return members
+
+
+@pytest.mark.parametrize("ensure_ascii", [True, False])
+def test_whole_document(ensure_ascii):
+    text = json.dumps(DOCUMENT, ensure_ascii=ensure_ascii)
+    parser = TopLevelMemberParser()
+    assert feed_all(parser, [text]) == list(DOCUMENT.items())
+    assert parser.done
+
+
+@pytest.mark.parametrize("ensure_ascii", [True, False])
+def test_every_split_point(ensure_ascii):
+    # Splits land inside strings, between a backslash and what it escapes, inside \uXXXX
+    # escapes and surrogate pairs, and around nested braces
+    text = json.dumps(DOCUMENT, ensure_ascii=ensure_ascii)
+    for split in range(1, len(text)):
+        parser = TopLevelMemberParser()
+        assert feed_all(parser, [text[:split], text[split:]]) == list(DOCUMENT.items()), split
+
+
+def test_one_character_at_a_time():
+    text = json.dumps(DOCUMENT, indent=2)
+    assert feed_all(TopLevelMemberParser(), text) == list(DOCUMENT.items())
+
+
+def test_member_reported_when_complete():
+    parser = TopLevelMemberParser()
+    assert parser.feed('{"summary": "a, b') == []
+    assert parser.feed('", "skills": ["x"') == [("summary", "a, b")]
+    assert parser.feed("]") == []
+    assert parser.feed("}") == [("skills", ["x"])]
+    assert parser.done
+
+
+def test_escaped_quotes_and_backslashes():
+    value = 'ends with backslash \\", then \\\\ and "quoted"'
+    text = json.dumps({"a": value, "b": "\\"})
+    for split in range(1, len(text)):
+        members = feed_all(TopLevelMemberParser(), [text[:split], text[split:]])
+        assert members == [("a", value), ("b", "\\")]
+
+
+def test_nested_objects_close_only_at_top_level():
+    parser = TopLevelMemberParser()
+    assert parser.feed('{"a": {"b": {"c": 1}, "d": [1, {"e": 2}]}') == []
+    assert parser.feed(', "f": 3}') == [("a", {"b": {"c": 1}, "d": [1, {"e": 2}]}), ("f", 3)]
+
+
+def test_stops_after_the_object():
+    parser = TopLevelMemberParser()
+    assert parser.feed('{"a": 1} trailing {"b": 2}') == [("a", 1)]
+    assert parser.done
+    assert parser.feed(', "c": 3}') == []
+
+
+def test_empty_object():
+    parser = TopLevelMemberParser()
+    assert parser.feed("{}") == []
+    assert parser.done
+
+
+def test_malformed_member_is_skipped():
+    assert TopLevelMemberParser().feed('{"a": nope, "b": 2}') == [("b", 2)]
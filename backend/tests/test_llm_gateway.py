@@ -0,0 +1,48 @@
+import httpx
+import pytest
+
+from app.services.llm_gateway import LLMGateway
+
+
+def gateway(max_retries: int) -> LLMGateway:
+    return LLMGateway(max_in_flight=2, requests_per_minute=0, tokens_per_minute=0, acquire_timeout=1,
+                      max_retries=max_retries, backoff_base=0, backoff_max=0)
+
+
+def flaky(failures: int):
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise httpx.ConnectError("connection refused")
+        return "ok"
+
+    return fn, calls
+
+
+@pytest.mark.parametrize("max_retries", [0, 1, 3])
+async def test_retries_then_succeeds(max_retries):
+    fn, calls = flaky(max_retries)
+    assert await gateway(max_retries).call(fn, 10) == "ok"
+    assert len(calls) == max_retries + 1
+
+
+@pytest.mark.parametrize("max_retries", [0, 2])
+async def test_raises_last_error_when_out_of_retries(max_retries):
+    fn, calls = flaky(max_retries + 1)
+    with pytest.raises(httpx.ConnectError):
+        await gateway(max_retries).call(fn, 10)
+    assert len(calls) == max_retries + 1
+
+
+async def test_non_retryable_error_is_not_retried():
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        await gateway(3).call(fn, 10)
+    assert len(calls) == 1
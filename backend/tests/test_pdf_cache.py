@@ -0,0 +1,121 @@
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.api import endpoints
+from app.core.schemas import ResumeSchema
+from app.mock_data import MOCK_RESUMES
+from app.services.pdf_cache import PDFCache
+
+RESUME = ResumeSchema.model_validate(MOCK_RESUMES["strong"])
+PDF = b"%PDF-1.7 cached"
+
+
+def test_concurrent_disk_writes(tmp_path):
+    cache = PDFCache(memory_items=0, directory=str(tmp_path), disk_max_bytes=10**6)
+    writes = [(f"key{i % 4}", bytes([i % 4]) * 1000) for i in range(64)]
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda w: cache._write_disk(*w), writes))
+
+    names = sorted(os.listdir(tmp_path))
+    assert names == [f"key{i}.pdf" for i in range(4)]
+    assert cache._disk_bytes == 4000
+    for i in range(4):
+        assert cache._read_disk(f"key{i}") == bytes([i]) * 1000
+
+
+def test_disk_eviction(tmp_path):
+    cache = PDFCache(memory_items=0, directory=str(tmp_path), disk_max_bytes=2500)
+    for i in range(4):
+        cache._write_disk(f"key{i}", b"x" * 1000)
+    assert cache._disk_bytes <= 2500
+    assert len(os.listdir(tmp_path)) == 2
+
+
+@pytest.fixture
+def client(monkeypatch):
+    cache = PDFCache(memory_items=8)
+    cache.memory.set(cache.key_for(RESUME), PDF)
+    monkeypatch.setattr(endpoints, "pdf_cache", cache)
+    app = FastAPI()
+    app.include_router(endpoints.router)
+    return TestClient(app), f'"{cache.key_for(RESUME)}"'
+
+
+def test_post_ignores_if_none_match(client):
+    client, etag = client
+    resp = client.post("/generate_pdf", json=RESUME.model_dump(mode="json"), headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.content == PDF
+    assert resp.headers["etag"] == etag
+
+
+def test_preview_post_ignores_if_none_match(client):
+    client, _ = client
+    resp = client.post("/preview", json=RESUME.model_dump(mode="json"), headers={"If-None-Match": "*"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/html")
+
+
+@pytest.fixture
+def render_calls(monkeypatch):
+    calls = []
+
+    async def render(resume, profile=None, preset=None, target=None):
+        calls.append(target)
+        assert target is not None
+        with open(target, "wb") as f:
+            f.write(PDF)
+
+    monkeypatch.setattr(endpoints.render_pool, "render", render)
+    return calls
+
+
+@pytest.mark.parametrize("disk_tier", [False, True])
+def test_render_is_streamed_from_the_spool_file(tmp_path, monkeypatch, render_calls, disk_tier):
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path / "tmp"))
+    os.makedirs(tempfile.tempdir)
+    cache = PDFCache(memory_items=8, directory=str(tmp_path / "cache") if disk_tier else "", disk_max_bytes=10**6)
+    monkeypatch.setattr(endpoints, "pdf_cache", cache)
+    app = FastAPI()
+    app.include_router(endpoints.router)
+    client = TestClient(app)
+
+    first = client.post("/generate_pdf", json=RESUME.model_dump(mode="json"))
+    assert first.status_code == 200
+    assert first.content == PDF
+    assert first.headers["content-length"] == str(len(PDF))
+    assert len(render_calls) == 1
+
+    key = cache.key_for(RESUME)
+    if disk_tier:
+        # Moved into the disk tier, not read into memory
+        assert os.listdir(tmp_path / "cache") == [f"{key}.pdf"]
+        assert cache.memory.peek(key) is None
+    else:
+        assert cache.memory.peek(key) == PDF
+    assert os.listdir(tempfile.tempdir) == []
+
+    second = client.post("/generate_pdf", json=RESUME.model_dump(mode="json"), headers={"Range": "bytes=0-3"})
+    assert second.status_code == 200
+    assert second.content == PDF
+    assert len(render_calls) == 1
+
+
+def test_failed_render_removes_the_spool_file(tmp_path, monkeypatch):
+    cache = PDFCache(memory_items=8, directory=str(tmp_path), disk_max_bytes=10**6)
+    monkeypatch.setattr(endpoints, "pdf_cache", cache)
+
+    async def render(resume, profile=None, preset=None, target=None):
+        raise HTTPException(status_code=504, detail="PDF generation timed out")
+
+    monkeypatch.setattr(endpoints.render_pool, "render", render)
+    app = FastAPI()
+    app.include_router(endpoints.router)
+    resp = TestClient(app).post("/generate_pdf", json=RESUME.model_dump(mode="json"))
+    assert resp.status_code == 504
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,172 @@
+import math
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.schemas import ResumeSchema
+from app.services.pdf_fit import FIT_END_ANCHOR, FIT_LEVELS, FIT_START_ANCHOR, drop_lowest_priority, fit_one_page, overflow, reductions
+
+PAGE_HEIGHT = 1000
+MARGIN = 50
+LINES_PER_PAGE = 90  # content height / 10
+
+
+def make_resume(roles=3, bullets=4, projects=4, highlights=3) -> ResumeSchema:
+    return ResumeSchema(
+        personal_info={"full_name": "Test Person"},
+        summary="Summary",
+        highlights=[f"highlight {i}" for i in range(highlights)],
+        experience=[
+            {"company": f"Company {r}", "role": "Engineer", "duration": "2020", "bullets": [f"role {r} bullet {b}" for b in range(bullets)]}
+            for r in range(roles)
+        ],
+        projects=[{"name": f"Project {p}", "technologies": ["Python"], "description": "Desc"} for p in range(projects)],
+        education=[],
+        skills=["Python"],
+    )
+
+
+def lines(resume: ResumeSchema) -> int:
+    return 2 + len(resume.highlights or []) + sum(1 + len(job.bullets) for job in resume.experience) + len(resume.projects)
+
+
+def document(used_lines: float):
+    """Stand-in for a WeasyPrint Document: pages with the fit anchors where resume.html puts them."""
+    count = max(1, math.ceil(used_lines / LINES_PER_PAGE))
+    pages = [SimpleNamespace(height=PAGE_HEIGHT, anchors={}) for _ in range(count)]
+    pages[0].anchors[FIT_START_ANCHOR] = (0, MARGIN, 0, MARGIN)
+    end_y = MARGIN + (used_lines - (count - 1) * LINES_PER_PAGE) * 10
+    pages[-1].anchors[FIT_END_ANCHOR] = (0, end_y, 0, end_y)
+    return SimpleNamespace(pages=pages)
+
+
+class StubRenderer:
+    """
+    parse/layout for fit_one_page; each compaction level fits 10% more lines.
+    `fixed` lines stand for content that is never dropped.
+    """
+
+    def __init__(self, fixed: int = 0):
+        self.fixed = fixed
+        self.parsed = []
+        self.layouts = []
+
+    def parse(self, resume):
+        self.parsed.append(resume)
+        return resume
+
+    def layout(self, resume, level):
+        self.layouts.append((lines(resume), level))
+        return document((self.fixed + lines(resume)) / (1 + 0.1 * level))
+
+
+def test_overflow():
+    assert overflow(document(50)) == 0.0
+    assert overflow(document(90 + 45)) == pytest.approx(0.5)
+    assert overflow(document(180 + 9)) == pytest.approx(1.1)
+
+
+def test_overflow_without_anchors_counts_whole_pages():
+    doc = document(135)
+    for page in doc.pages:
+        page.anchors.clear()
+    assert overflow(doc) == 1.0
+
+
+def test_fits_without_changes():
+    renderer = StubRenderer()
+    resume = make_resume(roles=1, bullets=2, projects=1, highlights=1)
+    doc = fit_one_page(resume, renderer.parse, renderer.layout)
+    assert len(doc.pages) == 1
+    assert renderer.layouts == [(lines(resume), 0)]
+
+
+def test_small_overflow_is_compacted_level_by_level():
+    resume = make_resume(roles=1, bullets=2, projects=1, highlights=1)
+    # 100 lines, 10% over: fits at level 2 (1.2 x 90 = 108 lines) without dropping anything
+    renderer = StubRenderer(fixed=100 - lines(resume))
+    doc = fit_one_page(resume, renderer.parse, renderer.layout)
+    assert len(doc.pages) == 1
+    assert [level for _, level in renderer.layouts] == [0, 1, 2]
+    assert renderer.parsed == [resume]
+
+
+def test_large_overflow_skips_to_tightest_then_binary_searches():
+    renderer = StubRenderer()
+    resume = make_resume(roles=6, bullets=20, projects=10, highlights=10)
+    tightest = len(FIT_LEVELS)
+    capacity = LINES_PER_PAGE * (1 + 0.1 * tightest)
+    steps = reductions(resume)
+    # Fewest drops that fit at the tightest level
+    needed = next(i for i, step in enumerate(steps) if lines(step) <= capacity) + 1
+
+    doc = fit_one_page(resume, renderer.parse, renderer.layout)
+
+    assert len(doc.pages) == 1
+    levels = [level for _, level in renderer.layouts]
+    assert levels[:2] == [0, tightest]
+    assert set(levels[2:]) == {tightest}
+    # Binary search: the most reduced layout, then about log2(steps) more
+    assert len(levels) - 2 <= 1 + math.ceil(math.log2(len(steps)))
+    chosen = [n for n, level in renderer.layouts[2:] if n <= capacity]
+    assert max(chosen) == lines(steps[needed - 1])
+
+
+def test_gives_up_with_the_smallest_layout():
+    renderer = StubRenderer(fixed=500)
+    resume = make_resume()
+    steps = reductions(resume)
+    doc = fit_one_page(resume, renderer.parse, renderer.layout)
+    assert len(doc.pages) > 1
+    # No binary search once even the most reduced resume overflows
+    assert renderer.layouts == [(lines(resume), 0), (lines(resume), len(FIT_LEVELS)), (lines(steps[-1]), len(FIT_LEVELS))]
+
+
+def test_drop_order():
+    resume = make_resume(roles=2, bullets=3, projects=3, highlights=2)
+    dropped = []
+    while True:
+        before = resume.model_copy(deep=True)
+        if not drop_lowest_priority(resume):
+            break
+        if len(resume.highlights) < len(before.highlights):
+            dropped.append("highlight")
+        elif len(resume.projects) < len(before.projects):
+            dropped.append("project")
+        elif len(resume.experience) < len(before.experience):
+            dropped.append("role")
+        else:
+            role = next(i for i, (a, b) in enumerate(zip(before.experience, resume.experience)) if len(a.bullets) != len(b.bullets))
+            dropped.append(f"bullet {role}")
+
+    assert dropped == [
+        "highlight",                # extra highlights, keeping one
+        "bullet 1", "bullet 0",     # bullets beyond two, oldest role first
+        "project",                  # projects beyond two
+        "bullet 1", "bullet 0",     # bullets beyond one
+        "project",                  # projects beyond one
+        "highlight",                # the last highlight
+        "role",                     # older roles, keeping the latest
+    ]
+    assert len(resume.experience) == 1
+    assert resume.experience[0].company == "Company 0"
+    assert len(resume.experience[0].bullets) == 1
+    assert len(resume.projects) == 1
+    assert resume.highlights == []
+
+
+def test_reductions_do_not_touch_the_input():
+    resume = make_resume()
+    steps = reductions(resume)
+    assert resume == make_resume()
+    sizes = [lines(resume)] + [lines(step) for step in steps]
+    assert all(a > b for a, b in zip(sizes, sizes[1:]))
+    assert not drop_lowest_priority(steps[-1].model_copy(deep=True))
+
+
+def test_template_has_fit_anchors():
+    from app.services.pdf import render_html
+
+    html = render_html(make_resume())
+    assert html.index(f'id="{FIT_START_ANCHOR}"') < html.index("<h1>Test Person") < html.index(f'id="{FIT_END_ANCHOR}"')
+    assert html.index("Project 3") < html.index(f'id="{FIT_END_ANCHOR}"')
@@ -0,0 +1,18 @@
+import os
+import subprocess
+import sys
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_pdf(preset: str) -> subprocess.CompletedProcess:
+    # Settings are read once per process, so each default needs a fresh interpreter
+    env = {**os.environ, "PDF_DEFAULT_PRESET": preset}
+    return subprocess.run([sys.executable, "-c", "import app.services.pdf"], cwd=BACKEND, env=env, capture_output=True, text=True)
+
+
+def test_default_preset_is_validated():
+    assert import_pdf("small").returncode == 0
+    result = import_pdf("tiny")
+    assert result.returncode != 0
+    assert "PDF_DEFAULT_PRESET must be one of fast, small, archival" in result.stderr
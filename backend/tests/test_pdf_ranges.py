@@ -0,0 +1,120 @@
+import tempfile
+
+import pytest
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.testclient import TestClient
+from typing import Optional
+
+from app.api.endpoints import PDF_CHUNK_SIZE, _byte_range, _pdf_stream
+
+PDF = bytes(range(256)) * ((PDF_CHUNK_SIZE * 2 + 1000) // 256)
+ETAG = '"abc123"'
+
+app = FastAPI()
+
+
+opened = []
+
+
+@app.get("/pdf")
+async def pdf(source: str, range: Optional[str] = Header(None), if_range: Optional[str] = Header(None)):
+    if source == "bytes":
+        return _pdf_stream(PDF, {"ETag": ETAG}, range, if_range)
+    # A rendered spool file: unlinked, only the open handle is left
+    pdf_file = tempfile.TemporaryFile()
+    pdf_file.write(PDF)
+    opened.append(pdf_file)
+    return _pdf_stream(pdf_file, {"ETag": ETAG}, range, if_range)
+
+
+@pytest.fixture(params=["bytes", "file"])
+def fetch(request):
+    client = TestClient(app)
+    opened.clear()
+
+    def get(headers=None):
+        return client.get("/pdf", params={"source": request.param}, headers=headers or {})
+
+    yield get
+    # Files are closed once sent, or right away on a 416
+    assert all(f.closed for f in opened)
+
+
+@pytest.mark.parametrize("header,expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 999)),
+    ("bytes=-100", (900, 999)),
+    ("bytes=-5000", (0, 999)),
+    ("bytes=900-5000", (900, 999)),
+    (None, None),
+    ("bytes=0-9,20-29", None),
+    ("items=0-9", None),
+    ("bytes=abc-", None),
+    ("bytes=50-10", None),
+])
+def test_byte_range(header, expected):
+    assert _byte_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=5000-6000", "bytes=-0"])
+def test_byte_range_unsatisfiable(header):
+    with pytest.raises(HTTPException) as e:
+        _byte_range(header, 1000)
+    assert e.value.status_code == 416
+    assert e.value.headers["Content-Range"] == "bytes */1000"
+
+
+def test_full_body(fetch):
+    resp = fetch()
+    assert resp.status_code == 200
+    assert resp.content == PDF
+    assert resp.headers["content-length"] == str(len(PDF))
+    assert resp.headers["accept-ranges"] == "bytes"
+    assert "content-range" not in resp.headers
+
+
+def test_range_across_chunks(fetch):
+    start, end = PDF_CHUNK_SIZE - 10, PDF_CHUNK_SIZE + 10
+    resp = fetch({"Range": f"bytes={start}-{end}"})
+    assert resp.status_code == 206
+    assert resp.content == PDF[start:end + 1]
+    assert resp.headers["content-range"] == f"bytes {start}-{end}/{len(PDF)}"
+    assert resp.headers["content-length"] == str(end - start + 1)
+
+
+def test_open_ended_range(fetch):
+    resp = fetch({"Range": "bytes=1000-"})
+    assert resp.status_code == 206
+    assert resp.content == PDF[1000:]
+    assert resp.headers["content-range"] == f"bytes 1000-{len(PDF) - 1}/{len(PDF)}"
+
+
+def test_suffix_range(fetch):
+    resp = fetch({"Range": "bytes=-500"})
+    assert resp.status_code == 206
+    assert resp.content == PDF[-500:]
+    assert resp.headers["content-range"] == f"bytes {len(PDF) - 500}-{len(PDF) - 1}/{len(PDF)}"
+
+
+def test_unsatisfiable_range(fetch):
+    resp = fetch({"Range": f"bytes={len(PDF)}-"})
+    assert resp.status_code == 416
+    assert resp.headers["content-range"] == f"bytes */{len(PDF)}"
+
+
+def test_multi_range_sends_whole_body(fetch):
+    resp = fetch({"Range": "bytes=0-9,100-109"})
+    assert resp.status_code == 200
+    assert resp.content == PDF
+
+
+def test_if_range_matching_etag(fetch):
+    resp = fetch({"Range": "bytes=0-9", "If-Range": ETAG})
+    assert resp.status_code == 206
+    assert resp.content == PDF[:10]
+
+
+def test_if_range_stale_etag_sends_whole_body(fetch):
+    resp = fetch({"Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert resp.status_code == 200
+    assert resp.content == PDF
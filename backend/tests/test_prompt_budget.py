@@ -0,0 +1,71 @@
+import logging
+
+import pytest
+
+from app.core.config import settings
+from app.core.schemas import EducationItem, ManualExperienceItem
+from app.mock_data import MOCK_PROFILES
+from app.services.llm import build_prompt
+from app.services.prompt import estimate_tokens
+
+GITHUB = MOCK_PROFILES["strong"]["github"]
+
+
+def manual_input(entries: int = 6, chars: int = 2000):
+    experience = [ManualExperienceItem(company=f"Company {i}", role="Engineer", duration="2020-2022", description="Shipped things. " * (chars // 16)) for i in range(entries)]
+    education = [EducationItem(institution=f"University {i}", degree="BSc", duration="2016-2020", coursework=["Algorithms"] * 50) for i in range(2)]
+    highlights = [f"Highlight {i}: " + "impact " * 100 for i in range(entries)]
+    return experience, education, highlights
+
+
+@pytest.fixture
+def budget(monkeypatch):
+    def set_budget(tokens: int):
+        monkeypatch.setattr(settings, "PROMPT_TOKEN_BUDGET", tokens)
+        return tokens
+    return set_budget
+
+
+@pytest.mark.parametrize("tokens", [250, 300, 400, 600, 1000, 2000])
+@pytest.mark.parametrize("is_student", [False, True])
+def test_oversized_manual_input_fits_budget(budget, tokens, is_student):
+    budget(tokens)
+    experience, education, highlights = manual_input()
+    prompt = build_prompt(GITHUB, experience, education, highlights, is_student)
+    assert estimate_tokens(prompt) <= tokens
+
+
+def test_small_input_is_untouched(budget):
+    budget(3000)
+    experience, education, highlights = manual_input(entries=1, chars=100)
+    prompt = build_prompt(GITHUB, experience, education, highlights)
+    assert experience[0].description in prompt
+    assert "..." not in prompt
+
+
+def test_lowest_priority_entries_go_first(budget):
+    budget(400)
+    experience, education, highlights = manual_input()
+    prompt = build_prompt("", experience, education, highlights)
+    assert "Company 0" in prompt
+    assert "Highlight 5" not in prompt
+    # The caller's lists are left alone
+    assert len(highlights) == 6 and len(experience) == 6
+
+
+def test_students_keep_education_over_experience(budget):
+    budget(300)
+    experience, education, highlights = manual_input()
+    student = build_prompt("", experience, education, highlights, is_student=True)
+    professional = build_prompt("", experience, education, highlights)
+    assert "University 0" in student and "Company 1" not in student
+    assert "Company 0" in professional and "University 0" not in professional
+
+
+def test_unfittable_budget_warns(budget, caplog):
+    budget(20)
+    experience, education, highlights = manual_input()
+    with caplog.at_level(logging.WARNING, logger="app.services.llm"):
+        prompt = build_prompt(GITHUB, experience, education, highlights)
+    assert "Company" not in prompt and "University" not in prompt
+    assert any("over the 20 token budget" in record.message for record in caplog.records)
@@ -0,0 +1,78 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import endpoints
+from app.core.schemas import ResumeSchema
+from app.mock_data import MOCK_RESUMES
+from app.services import refine
+from app.services.resume_store import ResumeStore
+
+RESUME = ResumeSchema.model_validate(MOCK_RESUMES["strong"]).model_dump(mode="json")
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    store = ResumeStore(str(tmp_path / "resumes.db"))
+    store.open()
+    monkeypatch.setattr(endpoints, "resume_store", store)
+
+    calls = []
+
+    async def generate(prompt, config, expected_output_tokens=None):
+        calls.append(config)
+        return config.response_schema(value=f"Rewrite {len(calls)}")
+
+    monkeypatch.setattr(refine, "generate", generate)
+    app = FastAPI()
+    app.include_router(endpoints.router)
+    yield TestClient(app), calls
+    store.close()
+
+
+def test_refine_is_not_memoized(client):
+    client, calls = client
+    body = {"resume": RESUME, "path": "summary"}
+    first = client.post("/refine", json=body)
+    second = client.post("/refine", json=body)
+    assert first.status_code == second.status_code == 200
+    assert len(calls) == 2
+    assert first.json()["summary"] == "Rewrite 1"
+    assert second.json()["summary"] == "Rewrite 2"
+
+
+def test_refine_stored_resume(client):
+    client, _ = client
+    created = client.post("/resumes", json=RESUME).json()
+    resp = client.post("/refine", json={"resume_id": created["id"], "path": "summary"})
+    assert resp.status_code == 200
+    assert resp.headers["x-resume-version"] == "2"
+
+
+def test_refine_empty_resume_id(client):
+    client, calls = client
+    resp = client.post("/refine", json={"resume_id": "", "path": "summary"})
+    assert resp.status_code == 422
+    assert calls == []
+
+
+def test_refine_unknown_resume_id(client):
+    client, calls = client
+    resp = client.post("/refine", json={"resume_id": "missing", "path": "summary"})
+    assert resp.status_code == 404
+    assert calls == []
+
+
+def test_refine_needs_exactly_one_source(client):
+    client, _ = client
+    assert client.post("/refine", json={"path": "summary"}).status_code == 400
+    assert client.post("/refine", json={"resume": RESUME, "resume_id": "x", "path": "summary"}).status_code == 400
+
+
+def test_refine_temperature(client, monkeypatch):
+    client, calls = client
+    monkeypatch.setattr(refine.settings, "REFINE_TEMPERATURE", 0.9)
+    assert client.post("/refine", json={"resume": RESUME, "path": "summary"}).status_code == 200
+    assert client.post("/refine", json={"resume": RESUME, "path": "summary", "temperature": 0.3}).status_code == 200
+    assert [config.temperature for config in calls] == [0.9, 0.3]
+    assert client.post("/refine", json={"resume": RESUME, "path": "summary", "temperature": 5}).status_code == 422